@@ -0,0 +1,54 @@
+"""Script to switch the job-owned foreign keys to ON DELETE CASCADE."""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.sql import text
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (table, column, referred table)
+CASCADE_FOREIGN_KEYS = [
+    ("candidates", "job_id", "jobs"),
+    ("interview_categories", "job_id", "jobs"),
+    ("interview_questions", "job_id", "jobs"),
+    ("interview_questions", "category_id", "interview_categories"),
+    ("job_pipeline_stats", "job_id", "jobs"),
+]
+
+def add_cascade_foreign_keys():
+    """Recreate the foreign keys with ON DELETE CASCADE (PostgreSQL)."""
+    if engine.dialect.name != "postgresql":
+        # SQLite can't alter constraints; recreate the database from the models instead
+        logger.warning("Only PostgreSQL is supported; recreate SQLite databases to pick up the cascades")
+        return
+    
+    db = SessionLocal()
+    try:
+        inspector = inspect(engine)
+        for table, column, referred_table in CASCADE_FOREIGN_KEYS:
+            foreign_keys = [
+                fk for fk in inspector.get_foreign_keys(table)
+                if fk["constrained_columns"] == [column] and fk["referred_table"] == referred_table
+            ]
+            if any((fk.get("options") or {}).get("ondelete", "").upper() == "CASCADE" for fk in foreign_keys):
+                logger.info(f"{table}.{column} already cascades")
+                continue
+            
+            logger.info(f"Recreating {table}.{column} -> {referred_table}.id with ON DELETE CASCADE")
+            for fk in foreign_keys:
+                db.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{fk["name"]}"'))
+            db.execute(text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+                f"FOREIGN KEY ({column}) REFERENCES {referred_table} (id) ON DELETE CASCADE"
+            ))
+        db.commit()
+        logger.info("Foreign keys updated successfully")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error updating foreign keys: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_cascade_foreign_keys()
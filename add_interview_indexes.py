@@ -0,0 +1,29 @@
+"""Script to add the interview calendar indexes to existing databases."""
+import logging
+
+from app import models
+from app.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INTERVIEW_INDEXES = {
+    "ix_candidates_interview_date",
+    "ix_candidates_job_id_interview_date",
+    "ix_jobs_assigned_to",
+}
+
+def add_interview_indexes():
+    """Create the partial interview_date indexes and the jobs.assigned_to index."""
+    tables = [models.Candidate.__table__, models.Job.__table__]
+    try:
+        for table in tables:
+            for index in table.indexes:
+                if index.name in INTERVIEW_INDEXES:
+                    index.create(bind=engine, checkfirst=True)
+                    logger.info(f"Index {index.name} is in place")
+    except Exception as e:
+        logger.error(f"Error adding interview indexes: {e}")
+
+if __name__ == "__main__":
+    add_interview_indexes()
@@ -0,0 +1,51 @@
+"""Script to add the position column (order within the category) to interview questions."""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.sql import text
+from app import models
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUESTION_TABLES = ["interview_questions", "interview_questions_archive"]
+
+def add_question_positions():
+    """Add position INTEGER NOT NULL DEFAULT 0, number existing questions by ID and index it."""
+    db = SessionLocal()
+    try:
+        inspector = inspect(engine)
+        for table in QUESTION_TABLES:
+            if not inspector.has_table(table):
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            if "position" in columns:
+                logger.info(f"position column already exists on {table}")
+                continue
+
+            logger.info(f"Adding position column to {table} table")
+            db.execute(text(f"ALTER TABLE {table} ADD COLUMN position INTEGER NOT NULL DEFAULT 0"))
+            # Keep the order clients saw so far (by ID), numbered 0..n-1 per category
+            db.execute(text(f"""
+                UPDATE {table} SET position = ranked.position
+                FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY category_id ORDER BY id) - 1 AS position
+                    FROM {table}
+                ) ranked
+                WHERE {table}.id = ranked.id
+            """))
+        db.commit()
+
+        for index in models.InterviewQuestion.__table__.indexes:
+            if index.name == "ix_interview_questions_category_id_position":
+                index.create(bind=engine, checkfirst=True)
+                logger.info(f"Index {index.name} is in place")
+        logger.info("Question positions are in place")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error adding question positions: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_question_positions()
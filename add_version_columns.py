@@ -0,0 +1,34 @@
+"""Script to add the optimistic-concurrency version column to jobs, candidates and interview_questions."""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.sql import text
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VERSIONED_TABLES = ["jobs", "candidates", "interview_questions"]
+
+def add_version_columns():
+    """Add version INTEGER NOT NULL DEFAULT 1 where it is missing."""
+    db = SessionLocal()
+    try:
+        inspector = inspect(engine)
+        for table in VERSIONED_TABLES:
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            if "version" in columns:
+                logger.info(f"version column already exists on {table}")
+                continue
+            
+            logger.info(f"Adding version column to {table} table")
+            db.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+        db.commit()
+        logger.info("Version columns are in place")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error adding version columns: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_version_columns()
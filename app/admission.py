@@ -0,0 +1,141 @@
+"""Admission control: per-route-class concurrency limits with bounded queues.
+
+Requests are sorted into classes (``auth`` for bcrypt-heavy logins and
+signups, ``export`` for the unpaginated exports, ``read`` and ``write`` for
+everything else). Each class runs at most ``concurrency`` requests at once;
+up to ``queue`` more wait for a slot, each for at most ``queue_timeout``
+seconds. Anything beyond that is turned away immediately instead of piling
+up in the worker and dragging every other route down with it:
+
+- ``auth`` answers ``429 Too Many Requests`` (a login burst is throttled),
+- the other classes answer ``503 Service Unavailable``,
+
+both with a ``Retry-After`` header. Counters per class are exposed through
+``AdmissionController.metrics()`` (``GET /metrics/admission``). Limits and
+counters are per worker process.
+"""
+import asyncio
+from typing import Dict, Optional
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Never queued or shed: health check, docs and the metrics themselves
+EXEMPT_PATHS = ("/", "/docs", "/redoc", "/openapi.json", "/metrics/admission", "/metrics/events",
+                "/metrics/cache")
+# Long-lived event streams would hold a slot for as long as they are open
+# (they are capped by EVENTS_MAX_SUBSCRIBERS instead)
+EXEMPT_PREFIXES = ("/api/events",)
+
+def classify(method: str, path: str) -> str:
+    """Route class of a request."""
+    if path.startswith("/api/auth/"):
+        return "auth"
+    if path.endswith("/export"):
+        return "export"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+class RouteClassLimiter:
+    def __init__(self, name: str, concurrency: int, queue: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.status_code = 429 if name == "auth" else 503
+        self._semaphore: Optional[asyncio.Semaphore] = None  # created on the serving event loop
+
+        self.active = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.rejected_total = 0  # queue full
+        self.timed_out_total = 0  # waited longer than queue_timeout
+        self.max_queued = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the bounded queue if needed. False means shed."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            if self.queued >= self.queue:
+                self.rejected_total += 1
+                return False
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.timed_out_total += 1
+                return False
+            finally:
+                self.queued -= 1
+
+        self.active += 1
+        self.admitted_total += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    def metrics(self) -> dict:
+        return {
+            "concurrency_limit": self.concurrency,
+            "queue_limit": self.queue,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "timed_out_total": self.timed_out_total,
+            "shed_total": self.rejected_total + self.timed_out_total,
+        }
+
+class AdmissionController:
+    def __init__(self, limits: Dict[str, dict]):
+        self.limiters = {name: RouteClassLimiter(name, **settings) for name, settings in limits.items()}
+
+    def metrics(self) -> dict:
+        return {name: limiter.metrics() for name, limiter in self.limiters.items()}
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS
+                or scope["path"].startswith(EXEMPT_PREFIXES)):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.controller.limiters.get(classify(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            await self._reject(limiter, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, limiter: RouteClassLimiter, send: Send) -> None:
+        body = orjson.dumps({"detail": "Server is busy, please retry later"})
+        await send({
+            "type": "http.response.start",
+            "status": limiter.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(limiter.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
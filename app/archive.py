@@ -0,0 +1,79 @@
+"""Moving closed jobs out of the hot tables.
+
+Closed jobs whose end date (or creation date, if they have none) is older
+than ``ARCHIVE_AFTER_DAYS`` are copied, together with their candidates,
+interview categories, questions and status history, into the ``*_archive``
+tables and then deleted from the hot tables (the children go through
+``ON DELETE CASCADE``).
+
+Each job moves in its own transaction, so a run can stop at any point and
+the next one simply picks up the jobs that are still eligible. Archived
+records are read through the ``include_archived`` flag of the read
+endpoints; they are never modified.
+"""
+import logging
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import cache, events, models
+from .config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Hot model -> archive model, in copy order (parents before children)
+ARCHIVED_MODELS = [
+    (models.Job, models.ArchivedJob),
+    (models.InterviewCategory, models.ArchivedInterviewCategory),
+    (models.InterviewQuestion, models.ArchivedInterviewQuestion),
+    (models.Candidate, models.ArchivedCandidate),
+    (models.CandidateStatusEvent, models.ArchivedCandidateStatusEvent),
+]
+
+def archive_cutoff(older_than_days: int = ARCHIVE_AFTER_DAYS) -> date:
+    return date.today() - timedelta(days=older_than_days)
+
+def archivable_job_ids(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                       limit: Optional[int] = ARCHIVE_BATCH_SIZE) -> List[int]:
+    """IDs of closed jobs that ended before the cutoff, oldest first."""
+    job = models.Job
+    ended = func.coalesce(job.end_date, job.date_created)
+    stmt = (
+        select(job.id)
+        .where(job.status == models.JobStatus.CLOSED.value, ended < archive_cutoff(older_than_days))
+        .order_by(ended, job.id)
+        .limit(limit)
+    )
+    return list(db.scalars(stmt))
+
+def archive_job(db: Session, job_id: int):
+    """Copy one job and its children to the archive tables and delete them. Does not commit."""
+    for hot_model, archive_model in ARCHIVED_MODELS:
+        columns = [column.name for column in hot_model.__table__.columns]
+        owner = hot_model.id if hot_model is models.Job else hot_model.job_id
+        db.execute(
+            insert(archive_model).from_select(
+                columns, select(*hot_model.__table__.columns).where(owner == job_id)
+            )
+        )
+    # Candidates, status history, interview plan and pipeline rollup follow via ON DELETE CASCADE
+    db.execute(delete(models.Job).where(models.Job.id == job_id))
+    events.publish(db, "job.deleted", job_id)
+    cache.invalidate_job(db, job_id)
+
+def archive_batch(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                  batch_size: int = ARCHIVE_BATCH_SIZE) -> List[int]:
+    """Archive up to ``batch_size`` eligible jobs, committing after each one."""
+    archived = []
+    for job_id in archivable_job_ids(db, older_than_days=older_than_days, limit=batch_size):
+        try:
+            archive_job(db, job_id)
+            db.commit()
+            archived.append(job_id)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error archiving job {job_id}: {e}")
+            raise
+    return archived
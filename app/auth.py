@@ -1,30 +1,104 @@
+import logging
+import timeit
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
 
-from . import models, schemas
-from .database import get_db
-from .config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from . import cache, models, schemas
+from .database import get_db, SessionLocal
+from .config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, BCRYPT_ROUNDS
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# bcrypt cost bounds: each extra round doubles the hashing time
+DEFAULT_BCRYPT_ROUNDS = 12
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+def make_pwd_context(rounds: int) -> CryptContext:
+    # Hashes below the current cost are "deprecated": rehashed after the next login
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds, bcrypt__min_rounds=rounds)
+
+pwd_context = make_pwd_context(BCRYPT_ROUNDS or DEFAULT_BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+def set_bcrypt_rounds(rounds: int):
+    """Hash new passwords (and rehash weaker ones on login) with this cost."""
+    global pwd_context
+    pwd_context = make_pwd_context(rounds)
+
+def bcrypt_rounds() -> int:
+    return pwd_context.to_dict()["bcrypt__rounds"]
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = MIN_BCRYPT_ROUNDS,
+                            max_rounds: int = MAX_BCRYPT_ROUNDS) -> int:
+    """
+    Highest bcrypt cost whose verify takes at most ``target_ms`` on this
+    machine, but never less than ``min_rounds``. One cost is timed and the
+    others extrapolated, since each round doubles the work.
+    """
+    handler = bcrypt.using(rounds=min_rounds)
+    sample = handler.hash("calibration")
+    seconds = min(timeit.repeat(lambda: handler.verify("calibration", sample), number=1, repeat=3))
+    rounds = min_rounds
+    while rounds < max_rounds and seconds * 2 * 1000 <= target_ms:
+        rounds += 1
+        seconds *= 2
+    logger.info(f"bcrypt cost {rounds}: ~{seconds * 1000:.0f} ms per verify (target {target_ms:.0f} ms)")
+    return rounds
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+def rehash_password(user_id: int, password: str, old_hash: str):
+    """
+    Store the password hashed at the current cost. Runs after the login
+    response; skipped if the password was changed in the meantime.
+    """
+    new_hash = get_password_hash(password)
+    db = SessionLocal()
+    try:
+        username = db.scalar(
+            update(models.User)
+            .where(models.User.id == user_id, models.User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+            .returning(models.User.username)
+        )
+        if username is not None:
+            cache.invalidate(db, cache.USER, user_id)
+            cache.invalidate(db, cache.USERNAME, username)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rehashing the password of user {user_id}: {e}")
+    finally:
+        db.close()
+
+# Built once: every login and authenticated request looks a user up by name
+_USER_BY_USERNAME = select(models.User).where(models.User.username == bindparam("username"))
+
 def get_user(db: Session, username: str):
-    return db.query(models.User).filter(models.User.username == username).first()
+    return cache.get_or_load(
+        db, cache.USERNAME, username,
+        lambda: db.scalars(_USER_BY_USERNAME, {"username": username}).first()
+    )
 
 def authenticate_user(db: Session, username: str, password: str):
     user = get_user(db, username)
     if not user:
+        pwd_context.dummy_verify()  # as slow as a wrong password, so usernames can't be probed
         return False
     if not verify_password(password, user.hashed_password):
         return False
@@ -0,0 +1,288 @@
+"""Read-through cache for hot, rarely changing reference data.
+
+Jobs, users (by ID and by username), the hiring manager list and each job's
+interview categories are read on almost every request (``get_current_user``
+alone looks the user up every time) but change only through a handful of
+write paths. ``get_or_load`` wraps those ``crud``/``auth`` readers: a hit
+skips the query, a miss runs it and keeps the result.
+
+Entries are detached copies holding only column values; a hit is merged into
+the caller's session without a query (``load=False``), so relationships
+still lazy-load from the database and the instance behaves like a freshly
+queried one. ``None`` results (not found) are never cached.
+
+Invalidation is driven by the write paths, which call ``invalidate`` inside
+their transaction:
+
+- the keys are dropped from this worker's cache right after the commit, so
+  a worker always reads its own writes (a rollback invalidates nothing);
+- one ``cache.invalidate`` event listing them is published in the same
+  transaction. On PostgreSQL it travels with ``pg_notify`` and every
+  worker's ``PgListener`` drops the keys too; on other databases it goes to
+  the local broker (the single-node stand-in). These events are internal
+  and never reach SSE clients. A truncated event or a listener reconnect
+  (``resync``) clears the whole cache.
+
+A load that raced an invalidation of its namespace is not stored, so a
+value read before a concurrent commit can't outlive it. Entries also expire
+after ``CACHE_TTL`` seconds, which bounds staleness when change events are
+off (``EVENTS_ENABLED=false``) or a write bypassed the app. The backend is
+chosen with ``CACHE_BACKEND``: ``memory`` (per-worker LRU with TTL, at most
+``CACHE_MAX_ENTRIES`` entries) or ``none``. Hit, miss, invalidation and
+eviction counts per namespace are served at ``GET /metrics/cache``.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import events
+from .config import CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_TTL
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_cache_invalidations"
+
+# Cached namespaces
+JOB = "job"
+JOB_CATEGORIES = "job_categories"
+USER = "user"
+USERNAME = "username"
+HIRING_MANAGERS = "hiring_managers"
+
+# Marks "every key of the namespace" in invalidations
+ALL = "*"
+
+class _Stats:
+    __slots__ = ("hits", "misses", "invalidations", "evictions", "entries")
+
+    def __init__(self):
+        self.hits = self.misses = self.invalidations = self.evictions = self.entries = 0
+
+class MemoryCache:
+    """Per-worker LRU with a TTL; safe to use from several threads."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, object]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._stats: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, namespace: str) -> _Stats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = _Stats()
+        return stats
+
+    def _drop(self, key: Tuple[str, Hashable]):
+        del self._entries[key]
+        self._stats_for(key[0]).entries -= 1
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable):
+        """Cached value, or None on a miss."""
+        with self._lock:
+            stats = self._stats_for(namespace)
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] < time.monotonic():
+                self._drop((namespace, key))
+                entry = None
+            if entry is None:
+                stats.misses += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            stats.hits += 1
+            return entry[1]
+
+    def set(self, namespace: str, key: Hashable, value, generation: int):
+        """Store ``value`` unless the namespace was invalidated since ``generation`` was read."""
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return
+            if (namespace, key) not in self._entries:
+                self._stats_for(namespace).entries += 1
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                stats = self._stats_for(oldest[0])
+                stats.entries -= 1
+                stats.evictions += 1
+
+    def invalidate(self, namespace: str, key: Hashable = ALL):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._stats_for(namespace).invalidations += 1
+            if key != ALL:
+                if (namespace, key) in self._entries:
+                    self._drop((namespace, key))
+                return
+            for cached in [cached for cached in self._entries if cached[0] == namespace]:
+                self._drop(cached)
+
+    def clear(self):
+        with self._lock:
+            for namespace in list(self._stats):
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                self._stats[namespace].invalidations += 1
+                self._stats[namespace].entries = 0
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                namespace: {
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "hit_ratio": round(stats.hits / (stats.hits + stats.misses), 4) if stats.hits + stats.misses else None,
+                    "invalidations": stats.invalidations,
+                    "evictions": stats.evictions,
+                    "entries": stats.entries,
+                }
+                for namespace, stats in sorted(self._stats.items())
+            }
+
+class NullCache:
+    """Caching switched off: every read goes to the database."""
+
+    def generation(self, namespace: str) -> int:
+        return 0
+
+    def get(self, namespace: str, key: Hashable):
+        return None
+
+    def set(self, namespace: str, key: Hashable, value, generation: int):
+        pass
+
+    def invalidate(self, namespace: str, key: Hashable = ALL):
+        pass
+
+    def clear(self):
+        pass
+
+    def metrics(self) -> dict:
+        return {}
+
+BACKENDS = {"memory": MemoryCache, "none": NullCache}
+
+def _create_backend(name: str):
+    if name not in BACKENDS:
+        logger.error(f"Unknown CACHE_BACKEND {name!r}, caching is off")
+        return NullCache()
+    return BACKENDS[name]()
+
+backend = _create_backend(CACHE_BACKEND)
+
+def _detached_copy(instance):
+    """Copy of a loaded instance with its column values only, detached from any session."""
+    mapper = inspect(instance).mapper
+    copy = mapper.class_manager.new_instance()
+    for attribute in mapper.column_attrs:
+        set_committed_value(copy, attribute.key, getattr(instance, attribute.key))
+    make_transient_to_detached(copy)
+    return copy
+
+def _attach(db: Session, copy):
+    """The instance for ``copy`` in ``db``: the one already there, or a merged one (no query)."""
+    identity_key = inspect(copy).key
+    instance = db.identity_map.get(identity_key)
+    if instance is not None:
+        return instance
+    return db.merge(copy, load=False)
+
+def _store(db: Session, namespace: str, key: Hashable, result, generation: int):
+    pending = db.info.get(_PENDING_KEY, {})
+    if (namespace, key) in pending or (namespace, ALL) in pending:
+        return  # read inside a transaction that changed it and hasn't committed
+    if isinstance(result, list):
+        backend.set(namespace, key, [_detached_copy(instance) for instance in result], generation)
+    else:
+        backend.set(namespace, key, _detached_copy(result), generation)
+
+def get_or_load(db: Session, namespace: str, key: Hashable, loader: Callable[[], object]):
+    """
+    Result of ``loader()`` (an instance, a list of instances or None),
+    served from the cache when possible.
+    """
+    cached = backend.get(namespace, key)
+    if cached is not None:
+        if isinstance(cached, list):
+            return [_attach(db, copy) for copy in cached]
+        return _attach(db, cached)
+
+    generation = backend.generation(namespace)
+    result = loader()
+    if result is not None:
+        _store(db, namespace, key, result, generation)
+    return result
+
+def get_many_or_load(db: Session, namespace: str, keys: Iterable[Hashable],
+                     loader: Callable[[List[Hashable]], Iterable[object]]) -> Dict[Hashable, object]:
+    """
+    Instances by primary key for ``keys``: cached ones from the cache, the
+    rest with one ``loader(missing_keys)`` call. Keys not found are left out.
+    """
+    found = {}
+    missing = []
+    for key in keys:
+        cached = backend.get(namespace, key)
+        if cached is not None:
+            found[key] = _attach(db, cached)
+        else:
+            missing.append(key)
+    if missing:
+        generation = backend.generation(namespace)
+        for instance in loader(missing):
+            key = inspect(instance).identity[0]
+            found[key] = instance
+            _store(db, namespace, key, instance, generation)
+    return found
+
+def invalidate(db: Session, namespace: str, key: Hashable = ALL):
+    """Drop a cached key (or the whole namespace) once ``db``'s transaction commits, in every worker."""
+    db.info.setdefault(_PENDING_KEY, {})[(namespace, key)] = None
+
+def invalidate_job(db: Session, job_id: int):
+    """``invalidate`` a deleted (or archived) job and its interview categories."""
+    invalidate(db, JOB, job_id)
+    invalidate(db, JOB_CATEGORIES, job_id)
+
+@event.listens_for(SessionLocal, "before_commit")
+def _publish_pending(session: Session):
+    # One event per transaction, sent with (and only if) its commit
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        events.publish(session, "cache.invalidate", None, internal=True, keys=[list(key) for key in pending])
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_committed(session: Session):
+    for namespace, key in session.info.pop(_PENDING_KEY, ()):
+        backend.invalidate(namespace, key)
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+def _discard_pending(session: Session, transaction):
+    # Rolled back (or closed) without commit
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+def _on_event(event_data: dict):
+    if event_data["type"] == "cache.invalidate":
+        if event_data.get("truncated"):
+            backend.clear()
+            return
+        for namespace, key in event_data["keys"]:
+            backend.invalidate(namespace, key)
+    elif event_data["type"] == "resync":
+        backend.clear()  # invalidations may have been missed
+
+events.broker.add_listener(_on_event)
@@ -0,0 +1,53 @@
+"""Optimistic concurrency for jobs, candidates and interview questions.
+
+Each of these rows carries a ``version`` counter that every update bumps.
+Responses expose it as an ``ETag`` header (``"<version>"``) so the response
+schemas stay unchanged. A client that sends the ETag back in ``If-Match``
+only overwrites the row if nobody else changed it in the meantime; a stale
+write gets ``409 Conflict`` with the current ETag. Without ``If-Match`` the
+update is unconditional, as before.
+"""
+from typing import Optional
+
+from fastapi import Header, HTTPException, Response, status
+
+class VersionConflictError(Exception):
+    """The row was changed since the version the client last saw."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Row is at version {current_version}")
+        self.current_version = current_version
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+def set_etag(response: Response, obj) -> None:
+    """Put the version of ``obj`` in the response's ETag header."""
+    if obj is not None:
+        response.headers["ETag"] = etag(obj.version)
+
+def if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    FastAPI dependency: the version from an ``If-Match`` header, or None
+    when the header is missing or ``*`` (unconditional update).
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match must be an ETag returned by the API"
+        )
+
+def conflict(error: VersionConflictError, name: str) -> HTTPException:
+    """409 response for a stale write, carrying the current ETag."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{name} was modified by someone else; reload it and try again",
+        headers={"ETag": etag(error.current_version)}
+    )
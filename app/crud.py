@@ -1,28 +1,166 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, delete, insert, inspect, select, update, func, case, cast, literal, literal_column, union_all, Text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
-from . import models, schemas, auth
-from typing import Optional
+from . import models, schemas, auth, pipeline_stats, status_history, events, dedup, cache
+from .concurrency import VersionConflictError
+from .config import DEDUP_ENABLED
+from typing import Dict, List, Optional, Sequence
+
+def _unique_ids(ids: Sequence[int]) -> List[int]:
+    """Drop repeated IDs, keeping the first occurrence's position."""
+    return list(dict.fromkeys(ids))
+
+def _order_by_ids(ids: Sequence[int], items, key):
+    """Put fetched items in requested order; also return the IDs not found."""
+    by_id = {key(item): item for item in items}
+    return [by_id[item_id] for item_id in ids if item_id in by_id], [item_id for item_id in ids if item_id not in by_id]
+
+# Hot single-row lookups, built once at import. Each call only binds its
+# parameters (the compiled SQL comes from the engine's statement cache), so
+# the per-call cost of building and cache-keying a fresh ORM query is gone;
+# see benchmarks/lookups.py.
+_USER_BY_ID = select(models.User).where(models.User.id == bindparam("id"))
+_HIRING_MANAGERS = select(models.User).where(models.User.role == "Hiring Manager")
+_JOB_BY_ID = select(models.Job).where(models.Job.id == bindparam("id"))
+_CATEGORY_BY_ID = select(models.InterviewCategory).where(models.InterviewCategory.id == bindparam("id"))
+_CATEGORIES_BY_JOB = select(models.InterviewCategory).where(models.InterviewCategory.job_id == bindparam("job_id"))
+_QUESTION_BY_ID = select(models.InterviewQuestion).where(models.InterviewQuestion.id == bindparam("id"))
+_CANDIDATE_BY_ID = select(models.Candidate).where(models.Candidate.id == bindparam("id"))
+_CANDIDATE_BY_EMAIL = select(models.Candidate).join(models.Candidate.person).options(
+    contains_eager(models.Candidate.person)
+).where(models.Person.email == bindparam("email"), models.Candidate.job_id == bindparam("job_id"))
+
+def _get_by_id(db: Session, model, stmt, row_id: int):
+    """
+    Like ``db.get``: the session's copy if it has one that is still loaded,
+    else ``stmt`` bound to ``row_id`` (which also refreshes an expired copy,
+    or returns None if the row was deleted meanwhile).
+    """
+    instance = db.identity_map.get(db.identity_key(model, row_id))
+    if instance is not None and not inspect(instance).expired:
+        return instance
+    loaded = db.execute(stmt, {"id": row_id}).scalars().first()
+    if loaded is None and instance is not None:
+        db.expunge(instance)  # deleted elsewhere; don't keep the stale copy around
+    return loaded
+
+def get_rows_by_ids(db: Session, model, fields: Sequence[str], ids: Sequence[int]):
+    """
+    Fetch row tuples of ``fields`` for many primary keys with one IN query.
+    Returns (rows in requested order, missing IDs). ``fields`` must include "id".
+    """
+    ids = _unique_ids(ids)
+    columns = [getattr(model, field) for field in fields]
+    rows = db.execute(select(*columns).where(model.id.in_(ids))).all()
+    id_index = list(fields).index("id")
+    return _order_by_ids(ids, rows, key=lambda row: row[id_index])
+
+def _candidate_select(fields: Sequence[str], model=models.Candidate, join_person: bool = False):
+    """
+    SELECT of candidate response fields. Profile fields are read from the
+    person, which is joined only when one of them (or ``join_person``) is needed.
+    """
+    columns = [getattr(models.Person if field in models.PERSON_FIELDS else model, field) for field in fields]
+    stmt = select(*columns).select_from(model)
+    if join_person or any(field in models.PERSON_FIELDS for field in fields):
+        stmt = stmt.join(models.Person, models.Person.id == model.person_id)
+    return stmt
+
+def get_candidate_rows_by_ids(db: Session, fields: Sequence[str], ids: Sequence[int]):
+    """``get_rows_by_ids`` for candidates (profile fields come from their person)."""
+    ids = _unique_ids(ids)
+    rows = db.execute(_candidate_select(fields).where(models.Candidate.id.in_(ids))).all()
+    id_index = list(fields).index("id")
+    return _order_by_ids(ids, rows, key=lambda row: row[id_index])
+
+def _versioned_update(db: Session, model, row_id: int, values: dict, expected_version: Optional[int] = None,
+                      old_columns: Sequence[str] = (), retries: int = 3):
+    """
+    Update one row with a single UPDATE ... RETURNING that also bumps its version.
+
+    ``old_columns`` are returned with their pre-update values, for callers
+    that maintain rollups. On PostgreSQL they come from a self-join in the
+    same statement; SQLite can't return columns of an UPDATE ... FROM table,
+    so there they are read first and the UPDATE is guarded by the version
+    that was read. Without ``expected_version`` the last attempt drops that
+    guard, so an unconditional update never ends in a conflict. Returns
+    ``(row, old_values)``, or ``(None, None)`` if the row doesn't exist.
+    Raises VersionConflictError if ``expected_version`` is stale. Does not
+    commit.
+    """
+    base = (
+        update(model)
+        .values(**values, version=model.version + 1)
+        .execution_options(synchronize_session="fetch")
+    )
+    if expected_version is not None:
+        base = base.where(model.version == expected_version)
+    self_join = old_columns and db.get_bind().dialect.name == "postgresql"
+
+    for attempt in range(retries):
+        guarded = expected_version is not None or attempt < retries - 1
+        old_values = ()
+        if self_join and guarded:
+            old = model.__table__.alias("old")
+            stmt = base.where(model.id == old.c.id, old.c.id == row_id, model.version == old.c.version).returning(
+                model, *[old.c[column].label(f"old_{column}") for column in old_columns]
+            )
+        elif old_columns:
+            previous = db.execute(
+                select(model.version, *[getattr(model, column) for column in old_columns]).where(model.id == row_id)
+            ).first()
+            if previous is None:
+                return None, None
+            old_values = tuple(previous[1:])
+            stmt = base.where(model.id == row_id)
+            if guarded:
+                stmt = stmt.where(model.version == previous.version)
+            stmt = stmt.returning(model)
+        else:
+            stmt = base.where(model.id == row_id).returning(model)
+
+        result = db.execute(stmt).first()
+        if result is not None:
+            # Detach so the commit doesn't expire (and later re-SELECT) what RETURNING loaded
+            db.expunge(result[0])
+            return result[0], tuple(result[1:]) or old_values
+
+        current_version = db.scalar(select(model.version).where(model.id == row_id))
+        if current_version is None:
+            return None, None
+        if expected_version is not None and current_version != expected_version:
+            raise VersionConflictError(current_version)
+        # An unconditional update raced a concurrent write; go again
+    raise VersionConflictError(current_version)
 
 # User CRUD operations
 def create_user(db: Session, user: schemas.UserCreate):
     hashed_password = auth.get_password_hash(user.password)
     db_user = models.User(username=user.username, hashed_password=hashed_password, role=user.role)
     db.add(db_user)
+    cache.invalidate(db, cache.HIRING_MANAGERS)
     db.commit()
     db.refresh(db_user)
     return db_user
 
 def get_user(db: Session, user_id: int):
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return cache.get_or_load(db, cache.USER, user_id, lambda: _get_by_id(db, models.User, _USER_BY_ID, user_id))
 
 def get_user_by_username(db: Session, username: str):
-    return db.query(models.User).filter(models.User.username == username).first()
+    return auth.get_user(db, username)
 
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.User).offset(skip).limit(limit).all()
 
 def get_hiring_managers(db: Session):
-    return db.query(models.User).filter(models.User.role == "Hiring Manager").all()
+    return cache.get_or_load(
+        db, cache.HIRING_MANAGERS, None,
+        lambda: db.scalars(_HIRING_MANAGERS).all()
+    )
 
 # Job CRUD operations
 def create_job(db: Session, job: schemas.JobCreate):
@@ -38,7 +176,10 @@ def create_job(db: Session, job: schemas.JobCreate):
         department=job.department
         # date_created is handled by the server_default
     )
+    db_job.pipeline_stats = models.JobPipelineStats()
     db.add(db_job)
+    db.flush()
+    events.publish(db, "job.created", db_job.id, status=db_job.status)
     db.commit()
     db.refresh(db_job)
     
@@ -48,37 +189,109 @@ def create_job(db: Session, job: schemas.JobCreate):
     return db_job
 
 def get_job(db: Session, job_id: int):
-    return db.query(models.Job).filter(models.Job.id == job_id).first()
+    return cache.get_or_load(db, cache.JOB, job_id, lambda: _get_by_id(db, models.Job, _JOB_BY_ID, job_id))
 
-def get_jobs(db: Session, skip: int = 0, limit: int = 100, status: str = None, title: str = None):
-    query = db.query(models.Job)
+def get_jobs_by_ids(db: Session, job_ids: Sequence[int]) -> Dict[int, models.Job]:
+    """Jobs by ID for many IDs: cached ones from the cache, the rest with one IN query."""
+    return cache.get_many_or_load(
+        db, cache.JOB, _unique_ids(job_ids),
+        lambda missing: db.query(models.Job).filter(models.Job.id.in_(missing)).all()
+    )
+
+def _job_filters(status: str = None, title: str = None, model=models.Job):
+    filters = []
     
     if status:
-        query = query.filter(models.Job.status == status)
+        filters.append(model.status == status)
     
     if title:
-        query = query.filter(models.Job.title.ilike(f"%{title}%"))
+        filters.append(model.title.ilike(f"%{title}%"))
     
+    return filters
+
+def get_jobs(db: Session, skip: int = 0, limit: int = 100, status: str = None, title: str = None):
+    query = db.query(models.Job).filter(*_job_filters(status=status, title=title))
     return query.offset(skip).limit(limit).all()
 
+def get_job_rows(
+    db: Session,
+    fields: Sequence[str],
+    skip: int = 0,
+    limit: int = 100,
+    status: str = None,
+    title: str = None,
+    include_archived: bool = False
+):
+    """
+    Like get_jobs, but return plain row tuples of the given columns.
+    With ``include_archived`` archived jobs are included, ordered by ID.
+    """
+    if include_archived:
+        stmt = union_all(*[
+            select(*[getattr(model, field) for field in fields]).where(*_job_filters(status, title, model=model))
+            for model in (models.Job, models.ArchivedJob)
+        ])
+        return db.execute(stmt.order_by("id").offset(skip).limit(limit)).all()
+    
+    columns = [getattr(models.Job, field) for field in fields]
+    stmt = select(*columns).where(*_job_filters(status=status, title=title)).offset(skip).limit(limit)
+    return db.execute(stmt).all()
+
+def iter_job_row_batches(
+    db: Session,
+    fields: Sequence[str],
+    status: str = None,
+    title: str = None,
+    batch_size: int = 1000
+):
+    """Stream all matching jobs as batches of row tuples (for exports)."""
+    columns = [getattr(models.Job, field) for field in fields]
+    stmt = (
+        select(*columns)
+        .where(*_job_filters(status=status, title=title))
+        .order_by(models.Job.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in db.execute(stmt).partitions():
+        yield batch
+
+def get_archived_job(db: Session, job_id: int):
+    """Get an archived job by ID (read-only)."""
+    return db.get(models.ArchivedJob, job_id)
+
 def get_jobs_by_manager(db: Session, manager_id: int, skip: int = 0, limit: int = 100):
     """Get jobs assigned to a specific manager."""
     return db.query(models.Job).filter(models.Job.assigned_to == manager_id).offset(skip).limit(limit).all()
 
-def update_job(db: Session, job_id: int, job_update: schemas.JobUpdate):
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    if db_job:
-        update_data = job_update.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_job, key, value)
-        db.commit()
-        db.refresh(db_job)
+def get_job_rows_by_manager(db: Session, manager_id: int, fields: Sequence[str], skip: int = 0, limit: int = 100):
+    """Like get_jobs_by_manager, but return plain row tuples of the given columns."""
+    columns = [getattr(models.Job, field) for field in fields]
+    stmt = select(*columns).where(models.Job.assigned_to == manager_id).offset(skip).limit(limit)
+    return db.execute(stmt).all()
+
+def update_job(db: Session, job_id: int, job_update: schemas.JobUpdate, expected_version: Optional[int] = None):
+    """
+    Update a job in one UPDATE ... RETURNING. Returns None if the job doesn't
+    exist; raises VersionConflictError if ``expected_version`` is stale.
+    """
+    update_data = job_update.dict(exclude_unset=True)
+    db_job, _ = _versioned_update(db, models.Job, job_id, update_data, expected_version=expected_version)
+    if db_job is not None:
+        events.publish(db, "job.updated", job_id, version=db_job.version, fields=sorted(update_data))
+        cache.invalidate(db, cache.JOB, job_id)
+    db.commit()
     return db_job
 
 def delete_job(db: Session, job_id: int):
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    """
+    Delete a job. Candidates, interview categories and questions and the
+    pipeline rollup are removed by ON DELETE CASCADE without being loaded.
+    """
+    db_job = db.get(models.Job, job_id)
     if db_job:
         db.delete(db_job)
+        events.publish(db, "job.deleted", job_id)
+        cache.invalidate_job(db, job_id)
         db.commit()
     return db_job
 
@@ -86,6 +299,7 @@ def delete_job(db: Session, job_id: int):
 def create_interview_category(db: Session, category: schemas.InterviewCategoryCreate):
     db_category = models.InterviewCategory(**category.dict())
     db.add(db_category)
+    cache.invalidate(db, cache.JOB_CATEGORIES, db_category.job_id)
     db.commit()
     db.refresh(db_category)
     return db_category
@@ -95,54 +309,189 @@ def get_interview_categories(db: Session, skip: int = 0, limit: int = 100):
 
 def get_interview_categories_by_job(db: Session, job_id: int):
     """Get all interview categories for a specific job."""
-    return db.query(models.InterviewCategory).filter(models.InterviewCategory.job_id == job_id).all()
+    return cache.get_or_load(
+        db, cache.JOB_CATEGORIES, job_id,
+        lambda: db.scalars(_CATEGORIES_BY_JOB, {"job_id": job_id}).all()
+    )
+
+def get_archived_interview_categories_by_job(db: Session, job_id: int):
+    """Get the interview categories (with questions) of an archived job."""
+    return db.query(models.ArchivedInterviewCategory).filter(
+        models.ArchivedInterviewCategory.job_id == job_id
+    ).order_by(models.ArchivedInterviewCategory.id).all()
 
 def get_interview_category(db: Session, category_id: int):
-    return db.query(models.InterviewCategory).filter(models.InterviewCategory.id == category_id).first()
+    """Get an interview category by its ID (no query if this session already loaded it)."""
+    return _get_by_id(db, models.InterviewCategory, _CATEGORY_BY_ID, category_id)
+
+# Database-side JSON rendering of the category -> questions tree.
+# The database builds the response document (json_build_object/json_agg on
+# Postgres, json_object/json_group_array on SQLite), so no ORM objects or
+# Pydantic models are created. Keys follow schemas.InterviewCategory and
+# schemas.InterviewQuestion, including their job_id None -> 0 validators.
+
+def _json_object(dialect: str, **fields):
+    build = func.json_build_object if dialect == "postgresql" else func.json_object
+    args = []
+    for key, value in fields.items():
+        args.extend([literal(key, Text), value])
+    return build(*args)
+
+def _json_bool(dialect: str, column):
+    if dialect == "postgresql":
+        return func.coalesce(column, False)
+    # SQLite stores booleans as 0/1; emit real JSON true/false
+    return func.json(case((column, "true"), else_="false"))
+
+def _json_array(dialect: str, document, order_by: Sequence, filters, correlate=None):
+    """Scalar subquery aggregating ``document`` rows into a JSON array ("[]" if none)."""
+    if dialect == "postgresql":
+        aggregated = func.coalesce(
+            func.json_agg(aggregate_order_by(document, *order_by)),
+            literal_column("'[]'::json")
+        )
+        return select(aggregated).where(*filters).scalar_subquery()
+
+    # SQLite aggregates in input order, so order inside a derived table
+    ordered = select(document.label("doc")).where(*filters).order_by(*order_by)
+    if correlate is not None:
+        ordered = ordered.correlate(correlate)
+    ordered = ordered.subquery()
+    return func.json(select(func.json_group_array(func.json(ordered.c.doc))).scalar_subquery())
+
+def _category_json(dialect: str, question_job_id: Optional[int] = None, job_id_override: Optional[int] = None):
+    category = models.InterviewCategory
+    question = models.InterviewQuestion
+
+    question_filters = [question.category_id == category.id]
+    if question_job_id is not None:
+        question_filters.append(question.job_id == question_job_id)
+
+    question_document = _json_object(
+        dialect,
+        text=question.text,
+        status=question.status,
+        must_ask=_json_bool(dialect, question.must_ask),
+        id=question.id,
+        category_id=question.category_id,
+        job_id=func.coalesce(question.job_id, 0),
+        position=question.position,
+    )
+    questions = _json_array(
+        dialect, question_document, (question.position, question.id), question_filters, correlate=category
+    )
+
+    return _json_object(
+        dialect,
+        name=category.name,
+        description=category.description,
+        default_time=category.default_time,
+        id=category.id,
+        job_id=literal(job_id_override) if job_id_override is not None else func.coalesce(category.job_id, 0),
+        questions=questions,
+    )
+
+def get_interview_categories_json_by_job(db: Session, job_id: int) -> str:
+    """All categories of a job with all their questions, as a JSON array string."""
+    dialect = db.get_bind().dialect.name
+    category = models.InterviewCategory
+    document = _category_json(dialect)
+
+    if dialect == "postgresql":
+        stmt = select(cast(func.coalesce(
+            func.json_agg(aggregate_order_by(document, category.id)),
+            literal_column("'[]'::json")
+        ), Text)).where(category.job_id == job_id)
+    else:
+        ordered = select(document.label("doc")).where(category.job_id == job_id).order_by(category.id).subquery()
+        stmt = select(func.json_group_array(func.json(ordered.c.doc)))
+
+    return db.execute(stmt).scalar_one()
+
+def get_interview_category_json_for_job(db: Session, category_id: int, job_id: int):
+    """
+    One category with only the questions belonging to ``job_id``, as a JSON
+    object string (job_id is reported as the requested job), together with
+    whether the job exists, in one query. Returns ``(job_exists, json)``;
+    the JSON is None if the category does not exist.
+    """
+    dialect = db.get_bind().dialect.name
+    document = _category_json(dialect, question_job_id=job_id, job_id_override=job_id)
+    category_json = select(cast(document, Text)).where(models.InterviewCategory.id == category_id).scalar_subquery()
+    job_exists = select(models.Job.id).where(models.Job.id == job_id).exists()
+    return tuple(db.execute(select(job_exists, category_json)).one())
 
 def delete_interview_category(db: Session, category_id: int):
     """Delete an interview category and all its related questions."""
-    db_category = db.query(models.InterviewCategory).filter(models.InterviewCategory.id == category_id).first()
+    db_category = get_interview_category(db, category_id)
     if db_category:
         db.delete(db_category)  # Will cascade delete related questions
+        cache.invalidate(db, cache.JOB_CATEGORIES, db_category.job_id)
         db.commit()
         return True
     return False
 
 # Interview Question CRUD operations
+def _next_question_position(category_id):
+    """Position after the last question of a category, as a scalar subquery."""
+    question = aliased(models.InterviewQuestion)  # not correlated with an UPDATE of the same table
+    return select(func.coalesce(func.max(question.position) + 1, 0)).where(
+        question.category_id == category_id
+    ).scalar_subquery()
+
 def create_interview_question(db: Session, question: schemas.InterviewQuestionCreate):
-    db_question = models.InterviewQuestion(**question.dict())
+    """Add a question at the end of its category."""
+    db_question = models.InterviewQuestion(**question.dict(), position=_next_question_position(question.category_id))
     db.add(db_question)
     db.commit()
     db.refresh(db_question)
     return db_question
 
 def get_interview_questions_by_job(db: Session, job_id: int):
-    """Get all interview questions for a specific job."""
-    return db.query(models.InterviewQuestion).filter(models.InterviewQuestion.job_id == job_id).all()
+    """Get all interview questions for a specific job, in order within each category."""
+    question = models.InterviewQuestion
+    return db.query(question).filter(question.job_id == job_id).order_by(
+        question.category_id, question.position, question.id
+    ).all()
 
 def get_interview_questions_by_category(db: Session, category_id: int, job_id: Optional[int] = None):
-    """Get all interview questions for a specific category and optionally for a specific job."""
-    query = db.query(models.InterviewQuestion).filter(models.InterviewQuestion.category_id == category_id)
+    """Get all interview questions for a specific category (in order) and optionally for a specific job."""
+    question = models.InterviewQuestion
+    query = db.query(question).filter(question.category_id == category_id)
     
     if job_id is not None:
-        query = query.filter(models.InterviewQuestion.job_id == job_id)
+        query = query.filter(question.job_id == job_id)
     
-    return query.all()
+    return query.order_by(question.position, question.id).all()
+
+def get_interview_questions_by_ids(db: Session, question_ids: Sequence[int]):
+    """Get many questions with one IN query. Returns (questions in requested order, missing IDs)."""
+    ids = _unique_ids(question_ids)
+    questions = db.query(models.InterviewQuestion).filter(models.InterviewQuestion.id.in_(ids)).all()
+    return _order_by_ids(ids, questions, key=lambda question: question.id)
 
 def get_interview_question(db: Session, question_id: int):
-    """Get an interview question by its ID."""
-    return db.query(models.InterviewQuestion).filter(models.InterviewQuestion.id == question_id).first()
+    """Get an interview question by its ID (no query if this session already loaded it)."""
+    return _get_by_id(db, models.InterviewQuestion, _QUESTION_BY_ID, question_id)
 
-def update_interview_question(db: Session, question_id: int, question_update: schemas.InterviewQuestionUpdate):
-    """Update an interview question."""
-    db_question = get_interview_question(db, question_id)
-    if db_question:
-        update_data = question_update.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_question, key, value)
-        db.commit()
-        db.refresh(db_question)
+def update_interview_question(db: Session, question_id: int, question_update: schemas.InterviewQuestionUpdate,
+                              expected_version: Optional[int] = None):
+    """
+    Update an interview question in one UPDATE ... RETURNING. Returns None if
+    it doesn't exist; raises VersionConflictError if ``expected_version`` is stale.
+    A question moved to another category goes to its end.
+    """
+    update_data = question_update.dict(exclude_unset=True)
+    if update_data.get("category_id") is not None:
+        question = models.InterviewQuestion
+        update_data["position"] = case(
+            (question.category_id == update_data["category_id"], question.position),
+            else_=_next_question_position(update_data["category_id"])
+        )
+    db_question, _ = _versioned_update(
+        db, models.InterviewQuestion, question_id, update_data, expected_version=expected_version
+    )
+    db.commit()
     return db_question
 
 def delete_interview_question(db: Session, question_id: int):
@@ -153,6 +502,109 @@ def delete_interview_question(db: Session, question_id: int):
         db.commit()
     return db_question
 
+# Bulk interview plan edits. A requested position puts a question before the
+# one currently at that position; the touched categories are then renumbered
+# 0..n-1 with a window function, so gaps and ties never persist.
+_END_POSITION = 2 ** 31 - 1  # sorts after every real position until renumbered
+
+def get_interview_plan_owners(db: Session, job_id: int, question_ids: Sequence[int], category_ids: Sequence[int]):
+    """
+    Which of ``question_ids`` and ``category_ids`` belong to the job, in one
+    query. Returns ({question ID: its category ID}, {category IDs}).
+    """
+    question, category = models.InterviewQuestion, models.InterviewCategory
+    rows = db.execute(union_all(
+        select(literal("question").label("kind"), question.id, question.category_id)
+        .where(question.id.in_(question_ids), question.job_id == job_id),
+        select(literal("category").label("kind"), category.id, category.id)
+        .where(category.id.in_(category_ids), category.job_id == job_id),
+    )).all()
+    question_categories = {row[1]: row[2] for row in rows if row.kind == "question"}
+    return question_categories, {row[1] for row in rows if row.kind == "category"}
+
+def _renumber_questions(db: Session, category_ids: Sequence[int], placed_ids: Sequence[int]):
+    """Dense positions per category; placed questions go before others at the same position."""
+    question = models.InterviewQuestion
+    placed_first = case((question.id.in_(placed_ids), 0), else_=1)
+    ranked = select(
+        question.id,
+        (func.row_number().over(
+            partition_by=question.category_id, order_by=(question.position, placed_first, question.id)
+        ) - 1).label("position"),
+    ).where(question.category_id.in_(category_ids)).subquery()
+    db.execute(
+        update(question)
+        .where(question.id == ranked.c.id, question.position != ranked.c.position)
+        .values(position=ranked.c.position)
+        .execution_options(synchronize_session=False)
+    )
+
+def bulk_edit_interview_questions(db: Session, job_id: int, operations: schemas.InterviewQuestionBulkRequest,
+                                  question_categories: Dict[int, int]):
+    """
+    Apply a batch of question edits to a job's interview plan in one
+    transaction: one DELETE, one UPDATE (a CASE per changed column), one
+    multi-row INSERT and one renumbering UPDATE of the touched categories.
+    ``question_categories`` maps the updated and deleted questions to their
+    current category (see get_interview_plan_owners).
+    Returns (created questions, updated questions, deleted IDs).
+    """
+    question = models.InterviewQuestion
+    touched, placed = set(), []
+
+    deleted_ids = _unique_ids(operations.delete)
+    if deleted_ids:
+        db.execute(
+            delete(question).where(question.id.in_(deleted_ids)).execution_options(synchronize_session=False)
+        )
+        touched.update(question_categories[question_id] for question_id in deleted_ids)
+
+    updates = [item.dict(exclude_none=True) for item in operations.update]
+    updates = [item for item in updates if len(item) > 1]  # more than the ID
+    if updates:
+        values = {}
+        for field in ("text", "status", "must_ask", "category_id"):
+            changes = {item["id"]: item[field] for item in updates if field in item}
+            if changes:
+                values[field] = case(changes, value=question.id, else_=getattr(question, field))
+
+        positions = {}
+        for item in updates:
+            current_category = question_categories[item["id"]]
+            moved = item.get("category_id", current_category) != current_category
+            if "position" in item or moved:
+                positions[item["id"]] = item.get("position", _END_POSITION)
+                touched.update((current_category, item.get("category_id", current_category)))
+        if positions:
+            values["position"] = case(positions, value=question.id, else_=question.position)
+            placed.extend(positions)
+
+        db.execute(
+            update(question)
+            .where(question.id.in_([item["id"] for item in updates]))
+            .values(**values, version=question.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    created_ids = []
+    if operations.create:
+        rows = [
+            {**item.dict(exclude={"position"}), "job_id": job_id,
+             "position": _END_POSITION if item.position is None else item.position}
+            for item in operations.create
+        ]
+        created_ids = list(db.scalars(insert(question).returning(question.id, sort_by_parameter_order=True), rows))
+        placed.extend(created_ids)
+        touched.update(item.category_id for item in operations.create)
+
+    if touched:
+        _renumber_questions(db, list(touched), placed)
+    db.commit()
+
+    updated_ids = [item["id"] for item in updates]
+    questions, _ = get_interview_questions_by_ids(db, created_ids + updated_ids)
+    return questions[:len(created_ids)], questions[len(created_ids):], deleted_ids
+
 # Default interview structure creation
 def create_default_interview_structure(db: Session, job_id: int):
     """
@@ -204,22 +656,24 @@ def create_default_interview_structure(db: Session, job_id: int):
         db.add(db_category)
         db.flush()  # To get the category ID
         
-        for question in questions:
+        for position, question in enumerate(questions):
             db_question = models.InterviewQuestion(
                 text=question["text"],
                 status="active",
                 must_ask=question["must_ask"],
                 category_id=db_category.id,
-                job_id=job_id
+                job_id=job_id,
+                position=position
             )
             db.add(db_question)
     
+    cache.invalidate(db, cache.JOB_CATEGORIES, job_id)
     db.commit()
 
-def clone_interview_structure(db: Session, source_job_id: int, target_job_id: int, clone_questions: bool = False):
+def copy_interview_structure(db: Session, source_job_id: int, target_job_id: int, clone_questions: bool = False):
     """
     Clone interview categories from one job to another.
-    Optionally clone the questions as well.
+    Optionally clone the questions as well. Does not commit.
     
     Args:
         db: Database session
@@ -267,31 +721,118 @@ def clone_interview_structure(db: Session, source_job_id: int, target_job_id: in
                     status=source_question.status,
                     must_ask=source_question.must_ask,
                     category_id=new_category.id,
-                    job_id=target_job_id
+                    job_id=target_job_id,
+                    position=source_question.position
                 )
                 db.add(new_question)
         
         created_categories.append(new_category)
     
-    db.commit()
+    cache.invalidate(db, cache.JOB_CATEGORIES, target_job_id)
+    return created_categories
+
+def clone_interview_structure(db: Session, source_job_id: int, target_job_id: int, clone_questions: bool = False):
+    """``copy_interview_structure`` and commit."""
+    created_categories = copy_interview_structure(db, source_job_id, target_job_id, clone_questions=clone_questions)
+    if created_categories is not None:
+        db.commit()
     return created_categories
 
 # Candidate CRUD operations
+def _split_profile(data: dict):
+    """Split candidate fields into the person's profile and the application's own."""
+    profile = {field: data.pop(field) for field in models.PERSON_FIELDS if field in data}
+    if profile.get("skills") is not None:
+        # Convert skills list to comma-separated string
+        profile["skills"] = ','.join(profile["skills"])
+    return profile, data
+
+def _upsert_person(db: Session, profile: dict) -> int:
+    """Insert a person, or update the profile of the one with that email. Returns their ID."""
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(models.Person).values(**profile)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Person.email],
+        set_={field: stmt.excluded[field] for field in profile if field != "email"}
+    ).returning(models.Person.id)
+    return db.scalar(stmt)
+
+def _touch_applications(db: Session, person_id: int, fields: Sequence[str], exclude_id: Optional[int] = None):
+    """
+    After a profile change, bump the version of the person's applications
+    (their responses changed: ETags and match caches must notice) and
+    publish it. Returns the touched application IDs.
+    """
+    stmt = update(models.Candidate).where(models.Candidate.person_id == person_id)
+    if exclude_id is not None:
+        stmt = stmt.where(models.Candidate.id != exclude_id)
+    rows = db.execute(
+        stmt.values(version=models.Candidate.version + 1)
+        .returning(models.Candidate.id, models.Candidate.job_id, models.Candidate.version)
+        .execution_options(synchronize_session=False)
+    ).all()
+    for row in rows:
+        events.publish(db, "candidate.updated", row.job_id, candidate_id=row.id, version=row.version, fields=sorted(fields))
+    return [row.id for row in rows]
+
+def _check_duplicates(db: Session, candidate_ids: Sequence[int], person: models.Person):
+    for candidate_id in candidate_ids:
+        dedup.check_candidate(
+            db, candidate_id, person.name, person.email, person.phone, person.skills, person_id=person.id
+        )
+
+class AlreadyAppliedError(Exception):
+    """The person already has an application to that job."""
+
 def create_candidate(db: Session, candidate: schemas.CandidateCreate):
-    """Create a new candidate."""
-    # Convert skills list to comma-separated string
-    candidate_data = candidate.dict()
-    candidate_data['skills'] = ','.join(candidate_data['skills'])
+    """
+    Create a new candidate (an application). A person who applied before,
+    recognized by their email, is reused and their profile updated with the
+    fields this request sent (optional ones it left out are kept). Raises
+    AlreadyAppliedError (after rolling back) if a concurrent request created
+    the same application first.
+    """
+    profile, _ = _split_profile(candidate.dict(exclude_unset=True))
+    _, application = _split_profile(candidate.dict())
     
-    db_candidate = models.Candidate(**candidate_data)
+    existing = db.execute(
+        select(models.Person.id, *[getattr(models.Person, field) for field in profile])
+        .where(models.Person.email == profile["email"])
+    ).first()
+    profile_changed = existing is None or dict(zip(profile, existing[1:])) != profile
+    person_id = _upsert_person(db, profile) if profile_changed else existing.id
+    touched = _touch_applications(db, person_id, profile) if existing is not None and profile_changed else []
+    
+    db_candidate = models.Candidate(person_id=person_id, **application)
     db.add(db_candidate)
+    pipeline_stats.record_candidate_added(db, candidate.job_id, candidate.status, candidate.rating)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Lost the race on ix_candidates_person_id_job_id to the same application
+        db.rollback()
+        if get_candidate_by_email(db, email=candidate.email, job_id=candidate.job_id) is not None:
+            raise AlreadyAppliedError()
+        raise
+    status_history.record_transitions(db, [(db_candidate.id, db_candidate.job_id, None, db_candidate.status)])
+    if DEDUP_ENABLED:
+        _check_duplicates(db, [db_candidate.id, *touched], db.get(models.Person, person_id))
+    events.publish(db, "candidate.created", candidate.job_id, candidate_id=db_candidate.id, status=candidate.status)
     db.commit()
     db.refresh(db_candidate)
     return db_candidate
 
 def get_candidate(db: Session, candidate_id: int):
-    """Get a candidate by ID."""
-    return db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    """Get a candidate by ID (no query if this session already loaded it)."""
+    return _get_by_id(db, models.Candidate, _CANDIDATE_BY_ID, candidate_id)
+
+def get_candidate_by_email(db: Session, email: str, job_id: int):
+    """The application of the person with this email to a job, if any."""
+    return db.scalars(_CANDIDATE_BY_EMAIL, {"email": email, "job_id": job_id}).first()
+
+def get_archived_candidate(db: Session, candidate_id: int):
+    """Get an archived candidate by ID (read-only)."""
+    return db.get(models.ArchivedCandidate, candidate_id)
 
 def get_candidates_by_job(db: Session, job_id: int, skip: int = 0, limit: int = 100):
     """Get all candidates for a specific job."""
@@ -299,68 +840,198 @@ def get_candidates_by_job(db: Session, job_id: int, skip: int = 0, limit: int =
         models.Candidate.job_id == job_id
     ).offset(skip).limit(limit).all()
 
-def update_candidate(db: Session, candidate_id: int, candidate_update: schemas.CandidateUpdate):
-    """Update a candidate's information."""
-    db_candidate = get_candidate(db, candidate_id=candidate_id)
-    if db_candidate:
-        update_data = candidate_update.dict(exclude_unset=True)
-        
-        # Convert skills list to comma-separated string if skills are being updated
-        if 'skills' in update_data and update_data['skills'] is not None:
-            update_data['skills'] = ','.join(update_data['skills'])
+def update_candidate(db: Session, candidate_id: int, candidate_update: schemas.CandidateUpdate,
+                     expected_version: Optional[int] = None):
+    """
+    Update a candidate's information in one UPDATE ... RETURNING, which also
+    yields the previous status and rating for the pipeline rollup. Returns
+    None if the candidate doesn't exist; raises VersionConflictError if
+    ``expected_version`` is stale.
+    """
+    profile, update_data = _split_profile(candidate_update.dict(exclude_unset=True))
+    
+    db_candidate, old_values = _versioned_update(
+        db,
+        models.Candidate,
+        candidate_id,
+        update_data,
+        expected_version=expected_version,
+        old_columns=("status", "rating")
+    )
+    if db_candidate is None:
+        return None
+    
+    old_status, old_rating = old_values
+    if db_candidate.status != old_status or db_candidate.rating != old_rating:
+        pipeline_stats.record_candidate_changed(
+            db, db_candidate.job_id, old_status, db_candidate.status, old_rating, db_candidate.rating
+        )
+    
+    # Profile changes go to the person, shared with their other applications
+    touched = []
+    if profile:
+        db.execute(
+            update(models.Person).where(models.Person.id == db_candidate.person_id).values(**profile)
+            .execution_options(synchronize_session=False)
+        )
+        touched = _touch_applications(db, db_candidate.person_id, profile, exclude_id=candidate_id)
+    person = db.get(models.Person, db_candidate.person_id, populate_existing=True)
+    db.expunge(person)
+    set_committed_value(db_candidate, "person", person)
+    
+    if DEDUP_ENABLED and any(field in profile for field in dedup.IDENTIFYING_FIELDS):
+        _check_duplicates(db, [candidate_id, *touched], person)
+    
+    if db_candidate.status != old_status:
+        status_history.record_transitions(db, [(candidate_id, db_candidate.job_id, old_status, db_candidate.status)])
+        events.publish(
+            db, "candidate.status_changed", db_candidate.job_id, candidate_ids=[candidate_id],
+            status=db_candidate.status, previous_status=old_status
+        )
+    events.publish(
+        db, "candidate.updated", db_candidate.job_id, candidate_id=candidate_id,
+        version=db_candidate.version, fields=sorted([*update_data, *profile])
+    )
+    db.commit()
+    return db_candidate
+
+def bulk_update_candidate_status(db: Session, candidate_ids: List[int], new_status: int):
+    """
+    Set the status of many candidates with one UPDATE.
+    Returns the updated candidates in the requested order; unknown IDs are skipped.
+    """
+    ids = list(dict.fromkeys(candidate_ids))
+    if not ids:
+        return []
+    
+    # Current statuses, needed to move candidates between pipeline buckets
+    previous = db.execute(
+        select(models.Candidate.id, models.Candidate.job_id, models.Candidate.status)
+        .where(models.Candidate.id.in_(ids))
+    ).all()
+    
+    if previous:
+        db.execute(
+            update(models.Candidate)
+            .where(models.Candidate.id.in_([row.id for row in previous]))
+            .values(status=new_status, version=models.Candidate.version + 1)
+            .execution_options(synchronize_session=False)
+        )
         
-        for key, value in update_data.items():
-            setattr(db_candidate, key, value)
+        # One batched INSERT of the status events for all candidates
+        status_history.record_transitions(db, [(row.id, row.job_id, row.status, new_status) for row in previous])
         
-        db.commit()
-        db.refresh(db_candidate)
-    return db_candidate
+        transitions_by_job = {}
+        ids_by_job = {}
+        for row in previous:
+            transitions_by_job.setdefault(row.job_id, []).append((row.status, new_status))
+            ids_by_job.setdefault(row.job_id, []).append(row.id)
+        for job_id, transitions in transitions_by_job.items():
+            pipeline_stats.record_status_changes(db, job_id, transitions)
+            events.publish(db, "candidate.status_changed", job_id, candidate_ids=ids_by_job[job_id], status=new_status)
+    
+    db.commit()
+    
+    candidates = db.query(models.Candidate).filter(models.Candidate.id.in_(ids)).all()
+    by_id = {candidate.id: candidate for candidate in candidates}
+    return [by_id[candidate_id] for candidate_id in ids if candidate_id in by_id]
 
 def delete_candidate(db: Session, candidate_id: int):
     """Delete a candidate."""
     db_candidate = get_candidate(db, candidate_id=candidate_id)
     if db_candidate:
         db.delete(db_candidate)
+        db.flush()
+        pipeline_stats.record_candidate_removed(db, db_candidate.job_id, db_candidate.status, db_candidate.rating)
+        events.publish(db, "candidate.deleted", db_candidate.job_id, candidate_id=candidate_id)
         db.commit()
     return db_candidate
 
-def search_candidates(
-    db: Session,
+def _candidate_search_filters(
     job_id: int,
     search_term: Optional[str] = None,
     status: Optional[int] = None,
     min_rating: Optional[float] = None,
     max_rating: Optional[float] = None,
-    skip: int = 0,
-    limit: int = 100
+    model=models.Candidate
 ):
-    """
-    Search candidates with filters.
-    status: Integer (0: Screening, 1: Interview, 2: Hired, 3: Rejected)
-    """
-    query = db.query(models.Candidate).filter(models.Candidate.job_id == job_id)
+    filters = [model.job_id == job_id]
     
     if search_term:
         search_term = f"%{search_term}%"
-        query = query.filter(
-            (models.Candidate.name.ilike(search_term)) |
-            (models.Candidate.email.ilike(search_term)) |
-            (models.Candidate.education.ilike(search_term)) |
-            (models.Candidate.experience.ilike(search_term)) |
-            (models.Candidate.skills.ilike(search_term))
+        person = models.Person
+        filters.append(
+            (person.name.ilike(search_term)) |
+            (person.email.ilike(search_term)) |
+            (person.education.ilike(search_term)) |
+            (person.experience.ilike(search_term)) |
+            (person.skills.ilike(search_term))
         )
     
     if status is not None:
-        query = query.filter(models.Candidate.status == status)
+        filters.append(model.status == status)
     
     if min_rating is not None:
-        query = query.filter(models.Candidate.rating >= min_rating)
+        filters.append(model.rating >= min_rating)
     
     if max_rating is not None:
-        query = query.filter(models.Candidate.rating <= max_rating)
+        filters.append(model.rating <= max_rating)
     
+    return filters
+
+def search_candidates(
+    db: Session,
+    job_id: int,
+    search_term: Optional[str] = None,
+    status: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    skip: int = 0,
+    limit: int = 100
+):
+    """
+    Search candidates with filters.
+    status: Integer (0: Screening, 1: Interview, 2: Hired, 3: Rejected)
+    """
+    filters = _candidate_search_filters(job_id, search_term, status, min_rating, max_rating)
+    query = db.query(models.Candidate).join(models.Candidate.person).options(
+        contains_eager(models.Candidate.person)
+    ).filter(*filters)
     return query.offset(skip).limit(limit).all()
 
+def search_candidate_rows(
+    db: Session,
+    job_id: int,
+    fields: Sequence[str],
+    search_term: Optional[str] = None,
+    status: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    skip: int = 0,
+    limit: int = 100,
+    archived: bool = False
+):
+    """
+    Like search_candidates, but return plain row tuples of the given columns.
+    Used by the list endpoints to skip ORM object and schema construction.
+    ``archived`` reads an archived job's candidates instead.
+    """
+    model = models.ArchivedCandidate if archived else models.Candidate
+    filters = _candidate_search_filters(job_id, search_term, status, min_rating, max_rating, model=model)
+    stmt = _candidate_select(fields, model=model, join_person=bool(search_term))
+    return db.execute(stmt.where(*filters).offset(skip).limit(limit)).all()
+
+def iter_candidate_row_batches(db: Session, job_id: int, fields: Sequence[str], batch_size: int = 1000):
+    """Stream all candidates of a job as batches of row tuples (for exports)."""
+    stmt = (
+        _candidate_select(fields)
+        .where(models.Candidate.job_id == job_id)
+        .order_by(models.Candidate.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in db.execute(stmt).partitions():
+        yield batch
+
 def get_candidate_status_counts(db: Session, job_id: int):
     """
     Get the count of candidates for each status for a specific job.
@@ -371,21 +1042,19 @@ def get_candidate_status_counts(db: Session, job_id: int):
         "2": 1,  # 1 candidate Hired
         "3": 2   # 2 candidates Rejected
     }
+    Read from the precomputed pipeline rollup, not counted on every call.
     """
-    result = {}
+    stats = pipeline_stats.get_stats(db, job_id)
     
-    # Query the database for counts of each status
-    for status_value in [0, 1, 2, 3]:
-        count = db.query(models.Candidate).filter(
-            models.Candidate.job_id == job_id,
-            models.Candidate.status == status_value
-        ).count()
-        result[str(status_value)] = count
+    result = {}
+    for status_value, column_name in pipeline_stats.STATUS_COLUMNS.items():
+        result[str(status_value)] = getattr(stats, column_name) if stats else 0
     
     # Also get total count
-    total = db.query(models.Candidate).filter(
-        models.Candidate.job_id == job_id
-    ).count()
-    result["total"] = total
+    result["total"] = stats.total_count if stats else 0
     
-    return result 
\ No newline at end of file
+    return result
+
+def get_job_pipeline_stats(db: Session, job_id: int):
+    """Get the precomputed pipeline rollup (counts, average rating, latest application) for a job."""
+    return pipeline_stats.get_stats(db, job_id)
@@ -0,0 +1,120 @@
+"""Hiring-manager dashboard assembled with a fixed number of queries.
+
+The frontend used to fetch a manager's jobs and then, per job, the status
+counts, the interview categories and a page of candidates (3N+1 requests).
+``get_manager_dashboard`` returns the same information for all jobs at once
+using four queries regardless of how many jobs the manager has:
+
+1. the jobs joined with their pipeline rollup,
+2. interview categories per job (count and planned minutes),
+3. interview questions per job (count and must-ask count),
+4. the next few scheduled interviews per job (window function).
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+
+from . import models, pipeline_stats
+
+def get_manager_dashboard(db: Session, manager_id: int, status: Optional[str] = None, upcoming_limit: int = 5):
+    job = models.Job
+    stats = models.JobPipelineStats
+
+    jobs_stmt = (
+        select(job, stats)
+        .outerjoin(stats, stats.job_id == job.id)
+        .where(job.assigned_to == manager_id)
+        .order_by(job.id)
+    )
+    if status:
+        jobs_stmt = jobs_stmt.where(job.status == status)
+    rows = db.execute(jobs_stmt).all()
+
+    # Jobs that predate the rollup table: build their rows once
+    missing = [db_job.id for db_job, job_stats in rows if job_stats is None]
+    if missing:
+        pipeline_stats.build_missing(db, missing)
+        db.commit()
+        rows = db.execute(jobs_stmt).all()
+
+    job_ids = [db_job.id for db_job, _ in rows]
+    if not job_ids:
+        return []
+
+    category = models.InterviewCategory
+    category_rows = db.execute(
+        select(
+            category.job_id,
+            func.count(category.id),
+            func.coalesce(func.sum(category.default_time), 0),
+        )
+        .where(category.job_id.in_(job_ids))
+        .group_by(category.job_id)
+    ).all()
+    categories_by_job = {row[0]: row[1:] for row in category_rows}
+
+    question = models.InterviewQuestion
+    question_rows = db.execute(
+        select(
+            question.job_id,
+            func.count(question.id),
+            func.coalesce(func.sum(case((question.must_ask, 1), else_=0)), 0),
+        )
+        .where(question.job_id.in_(job_ids))
+        .group_by(question.job_id)
+    ).all()
+    questions_by_job = {row[0]: row[1:] for row in question_rows}
+
+    candidate = models.Candidate
+    ranked = (
+        select(
+            candidate.id.label("candidate_id"),
+            candidate.job_id,
+            models.Person.name,
+            candidate.status,
+            candidate.interview_date,
+            func.row_number().over(
+                partition_by=candidate.job_id,
+                order_by=candidate.interview_date
+            ).label("position"),
+        )
+        .join(models.Person, models.Person.id == candidate.person_id)
+        .where(
+            candidate.job_id.in_(job_ids),
+            candidate.interview_scheduled.is_(True),
+            candidate.interview_date >= datetime.now(),
+        )
+        .subquery()
+    )
+    upcoming_rows = db.execute(
+        select(ranked)
+        .where(ranked.c.position <= upcoming_limit)
+        .order_by(ranked.c.job_id, ranked.c.position)
+    ).all()
+    upcoming_by_job = {}
+    for row in upcoming_rows:
+        upcoming_by_job.setdefault(row.job_id, []).append({
+            "candidate_id": row.candidate_id,
+            "name": row.name,
+            "status": row.status,
+            "interview_date": row.interview_date,
+        })
+
+    dashboard = []
+    for db_job, job_stats in rows:
+        category_count, total_minutes = categories_by_job.get(db_job.id, (0, 0))
+        question_count, must_ask_count = questions_by_job.get(db_job.id, (0, 0))
+        dashboard.append({
+            "job": db_job,
+            "pipeline": job_stats,
+            "interview_plan": {
+                "category_count": category_count,
+                "total_minutes": total_minutes,
+                "question_count": question_count,
+                "must_ask_count": must_ask_count,
+            },
+            "upcoming_interviews": upcoming_by_job.get(db_job.id, []),
+        })
+    return dashboard
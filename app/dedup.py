@@ -0,0 +1,328 @@
+"""Near-duplicate candidate detection.
+
+People are matched by their exact email when they apply, so each has one
+``Person`` record; but the same person often comes back with another
+address, a different spelling of their name or a differently formatted
+phone number. Comparing every candidate with every other one doesn't scale,
+so candidates are *blocked* instead: each gets a few keys, stored in
+``candidate_dedup_keys``, and only candidates sharing a key are ever
+compared:
+
+- ``p:`` the last 10 digits of the phone number,
+- ``e:`` the email's local part without dots and ``+tags``,
+- ``n<band>:`` MinHash LSH bands of the name's character trigrams, so
+  "Jon Smith", "John Smith" and "Smith, John" collide with high probability
+  while unrelated names almost never do.
+
+Pairs that share a key are then verified (``compare``): they need a similar
+name (trigram Jaccard) plus the same phone or email local part, or a nearly
+identical name with overlapping skills. Verified pairs are stored in
+``candidate_duplicates`` for a reviewer to confirm or dismiss; nothing is
+merged automatically.
+
+``check_candidate`` runs on every insert or edit of the identifying fields,
+inside the write's transaction: one indexed lookup of the candidate's keys.
+``find_duplicates_in_batches`` (``find_duplicate_candidates.py``) backfills
+keys and flags for existing rows by streaming the key table in key order,
+so the work grows with the number of rows and the (capped) block sizes,
+not with the square of the table.
+"""
+import itertools
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import DEDUP_MAX_BLOCK_SIZE, DEDUP_NAME_BANDS, DEDUP_NAME_BAND_ROWS
+
+# Name similarity (trigram Jaccard) needed next to a matching phone or email,
+# and on its own when the skills overlap enough
+NAME_WITH_CONTACT = 0.5
+NAME_ALONE = 0.85
+SKILLS_WITH_NAME = 0.5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(20240601)  # fixed: keys must be stable across processes and runs
+_PERMUTATIONS = DEDUP_NAME_BANDS * DEDUP_NAME_BAND_ROWS
+_HASH_A = _rng.randint(1, 1 << 31, size=_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+_HASH_B = _rng.randint(0, 1 << 31, size=_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+
+IDENTIFYING_FIELDS = ("name", "email", "phone", "skills")
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase ASCII letters, word order ignored: "Smith, Jöhn" -> "john smith"."""
+    if not name:
+        return ""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join(sorted(re.sub(r"[^a-z]+", " ", ascii_name.lower()).split()))
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Last 10 digits, so country prefixes and formatting don't matter."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) >= 7 else None
+
+def normalize_email_local(email: Optional[str]) -> Optional[str]:
+    local = (email or "").lower().split("@", 1)[0].split("+", 1)[0].replace(".", "")
+    return local if len(local) >= 3 else None
+
+def normalize_skills(skills: Optional[str]) -> Set[str]:
+    return {skill.strip().lower() for skill in (skills or "").split(",") if skill.strip()}
+
+def name_shingles(normalized_name: str) -> Set[str]:
+    padded = f" {normalized_name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def minhash_bands(shingles: Set[str]) -> List[str]:
+    """LSH band signatures of a shingle set (one per band)."""
+    if not shingles:
+        return []
+    hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles], np.uint64)
+    # Universal hashing (a*x + b) mod p for every permutation at once
+    permuted = (np.outer(hashes, _HASH_A) + _HASH_B) % np.uint64(_MERSENNE_PRIME)
+    signature = permuted.min(axis=0)
+    return [
+        f"{zlib.crc32(signature[band * DEDUP_NAME_BAND_ROWS:(band + 1) * DEDUP_NAME_BAND_ROWS].tobytes()):08x}"
+        for band in range(DEDUP_NAME_BANDS)
+    ]
+
+@dataclass
+class Identity:
+    """Normalized identifying fields of one candidate."""
+    candidate_id: int
+    name: str
+    phone: Optional[str]
+    email_local: Optional[str]
+    skills: Set[str]
+    person_id: Optional[int] = None
+
+    @classmethod
+    def of(cls, candidate_id: int, name, email, phone, skills, person_id: Optional[int] = None) -> "Identity":
+        return cls(candidate_id, normalize_name(name), normalize_phone(phone),
+                   normalize_email_local(email), normalize_skills(skills), person_id)
+
+    def keys(self) -> List[str]:
+        keys = []
+        if self.phone:
+            keys.append(f"p:{self.phone}")
+        if self.email_local:
+            keys.append(f"e:{self.email_local}")
+        for band, signature in enumerate(minhash_bands(name_shingles(self.name))):
+            keys.append(f"n{band}:{signature}")
+        return keys
+
+def compare(a: Identity, b: Identity) -> Optional[Tuple[float, List[str]]]:
+    """(score, reasons) if ``a`` and ``b`` look like the same person, else None."""
+    if a.person_id is not None and a.person_id == b.person_id:
+        return None  # two applications of one person, not a duplicate
+    name_similarity = jaccard(name_shingles(a.name), name_shingles(b.name)) if a.name and b.name else 0.0
+    same_phone = a.phone is not None and a.phone == b.phone
+    same_email = a.email_local is not None and a.email_local == b.email_local
+    skills_similarity = jaccard(a.skills, b.skills)
+
+    duplicate = (
+        ((same_phone or same_email) and name_similarity >= NAME_WITH_CONTACT)
+        or (name_similarity >= NAME_ALONE and skills_similarity >= SKILLS_WITH_NAME)
+    )
+    if not duplicate:
+        return None
+
+    reasons = [f"name:{name_similarity:.2f}"]
+    if same_phone:
+        reasons.append("phone")
+    if same_email:
+        reasons.append("email")
+    if skills_similarity:
+        reasons.append(f"skills:{skills_similarity:.2f}")
+    score = min(1.0, 0.5 * name_similarity + 0.25 * same_phone + 0.15 * same_email + 0.1 * skills_similarity
+                + (0.1 if same_phone and same_email else 0.0))
+    return round(score, 4), reasons
+
+def _identity_select():
+    person = models.Person
+    return select(
+        models.Candidate.id, person.name, person.email, person.phone, person.skills, person.id
+    ).join_from(models.Candidate, person, person.id == models.Candidate.person_id)
+
+def _load_identities(db: Session, candidate_ids: Sequence[int]) -> Dict[int, Identity]:
+    rows = db.execute(_identity_select().where(models.Candidate.id.in_(list(candidate_ids)))).all()
+    return {row[0]: Identity.of(*row) for row in rows}
+
+def _insert_ignoring_existing(db: Session, model, rows: List[dict]):
+    """INSERT rows, skipping any that violate a unique constraint (already there)."""
+    if not rows:
+        return
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    db.execute(dialect_insert(model).on_conflict_do_nothing(), rows)
+
+def _flag_rows(pairs: Iterable[Tuple[Identity, Identity, float, List[str]]]) -> List[dict]:
+    rows = []
+    for a, b, score, reasons in pairs:
+        newer, older = (a, b) if a.candidate_id > b.candidate_id else (b, a)
+        rows.append({
+            "candidate_id": newer.candidate_id,
+            "duplicate_of_id": older.candidate_id,
+            "score": score,
+            "reasons": ",".join(reasons),
+            "status": "open",
+            "created_at": datetime.now(),
+        })
+    return rows
+
+def check_candidate(db: Session, candidate_id: int, name, email, phone, skills, person_id: Optional[int] = None,
+                    max_matches: int = DEDUP_MAX_BLOCK_SIZE) -> List[dict]:
+    """
+    (Re)index one candidate's keys and flag the candidates it duplicates.
+    Runs in the caller's transaction; returns the new flags' rows.
+    """
+    identity = Identity.of(candidate_id, name, email, phone, skills, person_id)
+    keys = identity.keys()
+
+    db.execute(delete(models.CandidateDedupKey).where(models.CandidateDedupKey.candidate_id == candidate_id))
+    if not keys:
+        return []
+    db.execute(insert(models.CandidateDedupKey), [{"key": key, "candidate_id": candidate_id} for key in keys])
+
+    others = db.scalars(
+        select(models.CandidateDedupKey.candidate_id)
+        .where(models.CandidateDedupKey.key.in_(keys), models.CandidateDedupKey.candidate_id != candidate_id)
+        .distinct()
+        .limit(max_matches)
+    ).all()
+    if not others:
+        return []
+
+    pairs = []
+    for other in _load_identities(db, others).values():
+        match = compare(identity, other)
+        if match is not None:
+            pairs.append((identity, other, *match))
+    flags = _flag_rows(pairs)
+    _insert_ignoring_existing(db, models.CandidateDuplicate, flags)
+    return flags
+
+def backfill_keys(db: Session, batch_size: int = 1000) -> int:
+    """Index candidates that have no keys yet (created before dedup existed). Commits per batch."""
+    indexed = 0
+    last_id = 0
+    has_keys = select(models.CandidateDedupKey.candidate_id).where(
+        models.CandidateDedupKey.candidate_id == models.Candidate.id
+    ).exists()
+    while True:
+        rows = db.execute(
+            _identity_select()
+            .where(models.Candidate.id > last_id, ~has_keys)
+            .order_by(models.Candidate.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return indexed
+        key_rows = [
+            {"key": key, "candidate_id": row[0]}
+            for row in rows for key in Identity.of(*row).keys()
+        ]
+        _insert_ignoring_existing(db, models.CandidateDedupKey, key_rows)
+        db.commit()
+        indexed += len(rows)
+        last_id = rows[-1][0]
+
+def _blocks(db: Session, max_block_size: int, batch_size: int) -> Iterator[List[int]]:
+    """Candidate IDs sharing each key, streamed in key order; oversized blocks are skipped."""
+    key_rows = db.execute(
+        select(models.CandidateDedupKey.key, models.CandidateDedupKey.candidate_id)
+        .order_by(models.CandidateDedupKey.key)
+        .execution_options(yield_per=batch_size)
+    )
+    if db.get_bind().dialect.name == "sqlite":
+        # An open read would lock out the writes between batches
+        key_rows = key_rows.all()
+    for _, group in itertools.groupby(key_rows, key=lambda row: row[0]):
+        ids = [row[1] for row in itertools.islice(group, max_block_size + 1)]
+        if 1 < len(ids) <= max_block_size:
+            yield ids
+
+def candidate_pairs(blocks: Iterable[List[int]], max_seen: int = 1_000_000) -> Iterator[Tuple[int, int]]:
+    """
+    (lower, higher) ID pairs within the blocks. Pairs sharing several keys
+    are yielded once, as long as the memory of seen pairs (``max_seen``)
+    lasts; a repeat only costs a comparison, flags are inserted idempotently.
+    """
+    seen: Set[Tuple[int, int]] = set()
+    for ids in blocks:
+        for pair in itertools.combinations(sorted(ids), 2):
+            if pair not in seen:
+                if len(seen) >= max_seen:
+                    seen.clear()
+                seen.add(pair)
+                yield pair
+
+def find_duplicates_in_batches(read_db: Session, write_db: Session, max_block_size: int = DEDUP_MAX_BLOCK_SIZE,
+                               batch_size: int = 1000, dry_run: bool = False) -> dict:
+    """
+    Compare every pair of candidates that share a blocking key and flag the
+    duplicates. ``read_db`` streams the key table while ``write_db`` loads
+    candidates and inserts flags, committing every ``batch_size`` pairs.
+    """
+    stats = {"pairs_compared": 0, "duplicates_found": 0}
+    pairs = candidate_pairs(_blocks(read_db, max_block_size, batch_size))
+    while True:
+        batch = list(itertools.islice(pairs, batch_size))
+        if not batch:
+            return stats
+        identities = _load_identities(write_db, {candidate_id for pair in batch for candidate_id in pair})
+        found = []
+        for a_id, b_id in batch:
+            a, b = identities.get(a_id), identities.get(b_id)
+            if a is None or b is None:
+                continue
+            match = compare(a, b)
+            if match is not None:
+                found.append((a, b, *match))
+        stats["pairs_compared"] += len(batch)
+        stats["duplicates_found"] += len(found)
+        if not dry_run:
+            _insert_ignoring_existing(write_db, models.CandidateDuplicate, _flag_rows(found))
+            write_db.commit()
+
+# Reviewing flags
+def get_duplicate_flags(db: Session, status: Optional[str] = "open", job_id: Optional[int] = None,
+                        skip: int = 0, limit: int = 100):
+    flag = models.CandidateDuplicate
+    query = db.query(flag)
+    if status:
+        query = query.filter(flag.status == status)
+    if job_id is not None:
+        query = query.join(models.Candidate, models.Candidate.id == flag.candidate_id).filter(
+            models.Candidate.job_id == job_id
+        )
+    return query.order_by(flag.score.desc(), flag.id).offset(skip).limit(limit).all()
+
+def get_candidate_duplicate_flags(db: Session, candidate_id: int, status: Optional[str] = "open"):
+    flag = models.CandidateDuplicate
+    query = db.query(flag).filter((flag.candidate_id == candidate_id) | (flag.duplicate_of_id == candidate_id))
+    if status:
+        query = query.filter(flag.status == status)
+    return query.order_by(flag.score.desc(), flag.id).all()
+
+def resolve_duplicate_flag(db: Session, flag_id: int, status: str, user_id: int):
+    flag = db.get(models.CandidateDuplicate, flag_id)
+    if flag is None:
+        return None
+    flag.status = status
+    flag.resolved_by = user_id
+    flag.resolved_at = datetime.now()
+    db.commit()
+    db.refresh(flag)
+    return flag
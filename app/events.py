@@ -0,0 +1,298 @@
+"""Change events pushed to clients over Server-Sent Events.
+
+The candidate and job write paths in ``crud`` call ``publish`` inside their
+transaction, and the event is delivered only if that transaction commits:
+
+- on PostgreSQL it is sent with ``pg_notify`` (NOTIFY is transactional), and
+  every worker process LISTENs on ``EVENTS_CHANNEL`` with one dedicated
+  connection (``PgListener``), so a change made by any worker, background
+  task or script reaches the subscribers of all of them;
+- on other databases (single process) it is held on the session and handed
+  to the local broker after commit.
+
+The ``EventBroker`` fans each event out to the subscribers of its job and to
+those following all jobs. Every subscriber has a bounded buffer of
+``EVENTS_CLIENT_BUFFER`` messages; a client too slow to keep up has its
+buffer replaced by a single ``resync`` event, telling it to refetch, so a
+stalled connection never holds more than that in memory nor slows anyone
+else down. Internal events (``internal=True``, e.g. the cache invalidations
+of ``cache``) go only to the broker's listeners, never to subscribers.
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+import orjson
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from .config import (
+    EVENTS_CHANNEL, EVENTS_CLIENT_BUFFER, EVENTS_ENABLED, EVENTS_KEEPALIVE,
+    EVENTS_MAX_SUBSCRIBERS, EVENTS_RECONNECT_DELAY,
+)
+from .database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+
+_PENDING_KEY = "pending_events"
+
+def _encode(event_data: dict) -> bytes:
+    """One SSE message."""
+    return b"event: " + event_data["type"].encode() + b"\ndata: " + orjson.dumps(event_data) + b"\n\n"
+
+RESYNC = _encode({"type": "resync", "job_id": None})
+
+def publish(db: Session, event_type: str, job_id: Optional[int], internal: bool = False, **data):
+    """
+    Queue a change event in the session's transaction; delivered on commit.
+    ``internal`` events reach the broker's listeners but no SSE client.
+    """
+    if not EVENTS_ENABLED:
+        return
+    event_data = {"type": event_type, "job_id": job_id, **data}
+    if internal:
+        event_data["internal"] = True
+    payload = orjson.dumps(event_data)
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        # Too big to NOTIFY (e.g. a huge bulk update); clients refetch the job
+        event_data = {"type": event_type, "job_id": job_id, "truncated": True}
+        if internal:
+            event_data["internal"] = True
+        payload = orjson.dumps(event_data)
+
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_notify(EVENTS_CHANNEL, payload.decode())))
+    else:
+        db.info.setdefault(_PENDING_KEY, []).append(event_data)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _deliver_pending(session: Session):
+    for event_data in session.info.pop(_PENDING_KEY, ()):
+        broker.deliver(event_data)
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+def _discard_pending(session: Session, transaction):
+    # Rolled back (or closed) without commit
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+class TooManySubscribers(Exception):
+    pass
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", job_id: Optional[int]):
+        self.broker = broker
+        self.job_id = job_id  # None: all jobs
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_CLIENT_BUFFER)
+
+    def put(self, message: Optional[bytes]):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow client: drop what it hasn't read and ask it to refetch
+            self.broker.overflows_total += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC if message is not None else None)
+
+    async def stream(self):
+        """SSE body: buffered events, with a comment line as keepalive."""
+        try:
+            yield f"retry: {EVENTS_RECONNECT_DELAY * 1000:.0f}\n\n".encode()
+            while True:
+                try:
+                    message = await asyncio.wait_for(self.queue.get(), timeout=EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if message is None:  # broker shutting down
+                    break
+                yield message
+        finally:
+            self.broker.unsubscribe(self)
+
+class EventBroker:
+    """Per-process fan-out of change events to SSE subscribers."""
+
+    def __init__(self, max_subscribers: int = EVENTS_MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._subscribers: Dict[Optional[int], Set[Subscription]] = {}
+        self._count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listeners: List[Callable[[dict], None]] = []
+
+        self.events_total = 0
+        self.messages_total = 0
+        self.overflows_total = 0
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    def add_listener(self, callback: Callable[[dict], None]):
+        """Call ``callback(event)`` for every event (and resync), on the event loop."""
+        self._listeners.append(callback)
+
+    def close(self):
+        for subscriptions in self._subscribers.values():
+            for subscription in list(subscriptions):
+                subscription.put(None)
+        self._loop = None
+
+    def subscribe(self, job_id: Optional[int] = None) -> Subscription:
+        if self._count >= self.max_subscribers:
+            raise TooManySubscribers()
+        subscription = Subscription(self, job_id)
+        self._subscribers.setdefault(job_id, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription; unsubscribing twice is a no-op."""
+        subscriptions = self._subscribers.get(subscription.job_id)
+        if subscriptions is not None and subscription in subscriptions:
+            subscriptions.discard(subscription)
+            self._count -= 1
+            if not subscriptions:
+                del self._subscribers[subscription.job_id]
+
+    def deliver(self, event_data: dict):
+        """Hand an event to the broker's event loop (safe from any thread)."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.dispatch, event_data)
+
+    def _notify_listeners(self, event_data: dict):
+        for callback in self._listeners:
+            try:
+                callback(event_data)
+            except Exception as e:
+                logger.error(f"Event listener {callback!r} failed: {e}")
+
+    def dispatch(self, event_data: dict):
+        """Fan out one event; must run on the broker's event loop."""
+        self.events_total += 1
+        self._notify_listeners(event_data)
+        if event_data.get("internal"):
+            return
+        targets = list(self._subscribers.get(event_data.get("job_id"), ()))
+        targets.extend(self._subscribers.get(None, ()))
+        if not targets:
+            return
+        message = _encode(event_data)  # encoded once for every subscriber
+        for subscription in targets:
+            subscription.put(message)
+        self.messages_total += len(targets)
+
+    def resync_all(self):
+        """Tell every subscriber to refetch (events may have been missed)."""
+        self._notify_listeners({"type": "resync", "job_id": None})
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.put(RESYNC)
+
+    def metrics(self) -> dict:
+        return {
+            "subscribers": self._count,
+            "jobs_watched": sum(1 for job_id in self._subscribers if job_id is not None),
+            "events_total": self.events_total,
+            "messages_total": self.messages_total,
+            "overflows_total": self.overflows_total,
+        }
+
+class PgListener:
+    """LISTENs on the events channel with one dedicated psycopg2 connection."""
+
+    def __init__(self, broker: EventBroker, channel: str = EVENTS_CHANNEL):
+        self.broker = broker
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _connect(self):
+        connection = engine.raw_connection()
+        driver_connection = connection.driver_connection
+        connection.detach()  # ours for good, not returned to the pool
+        driver_connection.autocommit = True
+        with driver_connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return driver_connection
+
+    @staticmethod
+    def _ping(connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        first = True
+        while True:
+            try:
+                connection = await asyncio.to_thread(self._connect)
+            except Exception as e:
+                logger.error(f"Event listener could not connect: {e}")
+                await asyncio.sleep(EVENTS_RECONNECT_DELAY)
+                continue
+
+            if not first:
+                # Notifications sent while we were disconnected are lost
+                self.broker.resync_all()
+            first = False
+
+            readable = asyncio.Event()
+            fd = connection.fileno()
+            loop.add_reader(fd, readable.set)
+            try:
+                while True:
+                    try:
+                        await asyncio.wait_for(readable.wait(), timeout=EVENTS_KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        # Quiet channel: make sure the connection is still alive
+                        await asyncio.to_thread(self._ping, connection)
+                    readable.clear()
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        try:
+                            self.broker.dispatch(orjson.loads(notification.payload))
+                        except orjson.JSONDecodeError:
+                            logger.error(f"Ignoring malformed event: {notification.payload!r}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event listener lost its connection: {e}")
+            finally:
+                loop.remove_reader(fd)
+                connection.close()
+            await asyncio.sleep(EVENTS_RECONNECT_DELAY)
+
+# The broker of this process; the listener is created by the startup event
+broker = EventBroker()
+listener: Optional[PgListener] = None
+
+def start():
+    global listener
+    broker.start()
+    if engine.dialect.name == "postgresql":
+        listener = PgListener(broker)
+        listener.start()
+
+async def stop():
+    if listener is not None:
+        await listener.stop()
+    broker.close()
@@ -0,0 +1,61 @@
+"""Chunked deletion for jobs with many candidates.
+
+A plain ``DELETE FROM jobs`` relies on ``ON DELETE CASCADE`` and removes the
+job's candidates, interview plan and pipeline rollup in one transaction.
+That is fine for ordinary jobs, but for one with tens of thousands of
+applicants it holds row locks for the whole cascade. Here the children are
+deleted ``DELETE_CHUNK_SIZE`` rows at a time, each chunk in its own short
+transaction, and the job row goes last. It runs as the ``delete_job``
+background task (see ``task_handlers.py``) and is safe to rerun.
+"""
+from typing import Callable
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from . import cache, events, models
+from .config import DELETE_CHUNK_SIZE
+
+def _delete_chunk(db: Session, model, condition, chunk_size: int) -> int:
+    """Delete up to ``chunk_size`` rows matching ``condition`` and commit."""
+    ids = select(model.id).where(condition).limit(chunk_size).scalar_subquery()
+    deleted = db.execute(
+        delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return deleted
+
+def delete_job_in_chunks(db: Session, job_id: int, progress: Callable, chunk_size: int = DELETE_CHUNK_SIZE) -> dict:
+    """Delete a job's candidates and interview plan chunk by chunk, then the job."""
+    stats = db.get(models.JobPipelineStats, job_id)
+    candidates_total = stats.total_count if stats is not None else None
+
+    # Status history first, so the candidate chunks don't cascade to it
+    progress(0, total=candidates_total, message="Deleting status history")
+    event = models.CandidateStatusEvent
+    while _delete_chunk(db, event, event.job_id == job_id, chunk_size):
+        pass
+
+    candidates_deleted = 0
+    progress(0, total=candidates_total, message="Deleting candidates")
+    while True:
+        deleted = _delete_chunk(db, models.Candidate, models.Candidate.job_id == job_id, chunk_size)
+        if not deleted:
+            break
+        candidates_deleted += deleted
+        progress(candidates_deleted)
+
+    progress(candidates_deleted, message="Deleting interview plan")
+    while _delete_chunk(db, models.InterviewQuestion, models.InterviewQuestion.job_id == job_id, chunk_size):
+        pass
+    while _delete_chunk(db, models.InterviewCategory, models.InterviewCategory.job_id == job_id, chunk_size):
+        pass
+
+    # The pipeline rollup row goes with the job (ON DELETE CASCADE)
+    progress(candidates_deleted, message="Deleting job")
+    db.execute(delete(models.Job).where(models.Job.id == job_id))
+    events.publish(db, "job.deleted", job_id)
+    cache.invalidate_job(db, job_id)
+    db.commit()
+
+    return {"job_id": job_id, "candidates_deleted": candidates_deleted}
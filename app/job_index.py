@@ -0,0 +1,187 @@
+"""Reverse matching: recommend open jobs for a candidate.
+
+An in-memory inverted index maps each requirement term (the hashed terms of
+``matching``) to the open jobs asking for it, with the weight the term
+carries in that job's match score. Recommending jobs for a candidate walks
+only the posting lists of the candidate's own terms and adds up their
+weights per job, so the cost depends on how many jobs share the candidate's
+skills, not on how many jobs are open. Scores are the same ``match_score``
+as in ``matching`` (the share of a job's requirements the candidate covers).
+
+Each worker builds the index on first use. Afterwards it follows the job
+change events (``events``): created, updated, closed or deleted jobs are
+marked dirty and reloaded with one query before the next recommendation.
+Only the posting lists of their terms are rebuilt. When events are not
+flowing (e.g. ``EVENTS_ENABLED=false``) the whole index is rebuilt once it
+is older than ``JOB_INDEX_MAX_AGE`` seconds.
+"""
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import events, matching, models
+from .config import JOB_INDEX_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+OPEN = models.JobStatus.OPEN.value
+
+def job_term_weights(requirements: Optional[str]) -> Dict[int, float]:
+    """Term ID -> share of the job's match score one full match of it is worth."""
+    parsed = matching.parse_requirements(requirements)
+    weights: Dict[int, float] = {}
+    for terms in parsed:
+        for term in terms:
+            term_id = matching.term_id(term)
+            weights[term_id] = weights.get(term_id, 0.0) + 1.0 / (len(terms) * len(parsed))
+    return weights
+
+class JobIndex:
+    """Inverted index from requirement terms to open jobs (one per worker)."""
+
+    def __init__(self):
+        # Jobs live in dense rows so scores can be summed with bincount;
+        # rows of removed jobs are reused
+        self._row_of: Dict[int, int] = {}
+        self._job_ids = np.zeros(0, np.int64)
+        self._free_rows: List[int] = []
+        self._job_terms: Dict[int, Dict[int, float]] = {}
+        # Term ID -> (job rows, weights)
+        self._postings: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+        self._loaded = False
+        self._built_at = 0.0
+        self._dirty: Set[int] = set()
+        self._full_refresh = False
+        events.broker.add_listener(self._on_event)
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def _on_event(self, event_data: dict):
+        if event_data["type"].startswith("job."):
+            self._dirty.add(event_data["job_id"])
+        elif event_data["type"] == "resync":
+            self._full_refresh = True  # events may have been missed
+
+    def build(self, db: Session):
+        """(Re)build the index from every open job."""
+        self.load(db.execute(
+            select(models.Job.id, models.Job.requirements).where(models.Job.status == OPEN)
+        ).all())
+
+    def load(self, rows: Sequence[Tuple[int, Optional[str]]]):
+        """Replace the index with (job ID, requirements) rows."""
+        self._row_of = {}
+        self._job_terms = {}
+        self._free_rows = []
+        grouped: Dict[int, Tuple[List[int], List[float]]] = {}
+        for row, (job_id, requirements) in enumerate(rows):
+            self._row_of[job_id] = row
+            self._job_terms[job_id] = weights = job_term_weights(requirements)
+            for term_id, weight in weights.items():
+                job_rows, job_weights = grouped.setdefault(term_id, ([], []))
+                job_rows.append(row)
+                job_weights.append(weight)
+        self._job_ids = np.array([job_id for job_id, _ in rows], np.int64)
+        self._postings = {
+            term_id: (np.array(job_rows, np.int64), np.array(job_weights, np.float32))
+            for term_id, (job_rows, job_weights) in grouped.items()
+        }
+        self._loaded = True
+        self._built_at = time.monotonic()
+        self._dirty.clear()
+        self._full_refresh = False
+        logger.info(f"Job index built: {len(rows)} open jobs, {len(self._postings)} terms")
+
+    def _apply_changes(self, db: Session, job_ids: Iterable[int]):
+        """Reload some jobs: drop them from the index and add back those still open."""
+        job_ids = list(job_ids)
+        current = db.execute(
+            select(models.Job.id, models.Job.requirements)
+            .where(models.Job.id.in_(job_ids), models.Job.status == OPEN)
+        ).all()
+
+        removed_rows: Dict[int, Set[int]] = {}  # term -> rows leaving its posting list
+        for job_id in job_ids:
+            row = self._row_of.pop(job_id, None)
+            if row is None:
+                continue
+            for term_id in self._job_terms.pop(job_id):
+                removed_rows.setdefault(term_id, set()).add(row)
+            self._free_rows.append(row)
+
+        added: Dict[int, Tuple[List[int], List[float]]] = {}
+        new_rows = []
+        for job_id, requirements in current:
+            row = self._free_rows.pop() if self._free_rows else len(self._job_ids) + len(new_rows)
+            if row >= len(self._job_ids):
+                new_rows.append(job_id)
+            else:
+                self._job_ids[row] = job_id
+            self._row_of[job_id] = row
+            self._job_terms[job_id] = weights = job_term_weights(requirements)
+            for term_id, weight in weights.items():
+                job_rows, job_weights = added.setdefault(term_id, ([], []))
+                job_rows.append(row)
+                job_weights.append(weight)
+        if new_rows:
+            self._job_ids = np.concatenate([self._job_ids, np.array(new_rows, np.int64)])
+
+        # Rebuild only the posting lists that changed
+        for term_id in set(removed_rows) | set(added):
+            job_rows, job_weights = self._postings.get(term_id, (np.zeros(0, np.int64), np.zeros(0, np.float32)))
+            if term_id in removed_rows:
+                keep = ~np.isin(job_rows, list(removed_rows[term_id]))
+                job_rows, job_weights = job_rows[keep], job_weights[keep]
+            if term_id in added:
+                extra_rows, extra_weights = added[term_id]
+                job_rows = np.concatenate([job_rows, np.array(extra_rows, np.int64)])
+                job_weights = np.concatenate([job_weights, np.array(extra_weights, np.float32)])
+            if len(job_rows):
+                self._postings[term_id] = (job_rows, job_weights)
+            else:
+                self._postings.pop(term_id, None)
+
+    def refresh(self, db: Session):
+        """Bring the index up to date before a lookup."""
+        expired = not events.broker.running and time.monotonic() - self._built_at > JOB_INDEX_MAX_AGE
+        if not self._loaded or self._full_refresh or expired:
+            self.build(db)
+        elif self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            self._apply_changes(db, dirty)
+
+    def recommend(self, term_ids: List[int], term_weights: List[float], limit: int = 10,
+                  exclude: Iterable[int] = (), min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Best (job ID, score) pairs for a candidate's sparse term vector."""
+        postings = [
+            (self._postings[term_id], weight)
+            for term_id, weight in zip(term_ids, term_weights) if term_id in self._postings
+        ]
+        if not postings:
+            return []
+        rows = np.concatenate([job_rows for (job_rows, _), _ in postings])
+        weights = np.concatenate([job_weights * weight for (_, job_weights), weight in postings])
+        scores = np.minimum(np.bincount(rows, weights=weights, minlength=len(self._job_ids)), 1.0)
+
+        mask = scores >= min_score if min_score > 0 else scores > 0
+        for job_id in exclude:
+            row = self._row_of.get(job_id)
+            if row is not None:
+                mask[row] = False
+        return matching.top_k(scores, self._job_ids, limit, mask)
+
+index = JobIndex()
+
+def recommend_jobs(db: Session, candidate: models.Candidate, limit: int = 10,
+                   exclude_current: bool = True, min_score: float = 0.0) -> List[Tuple[int, float]]:
+    """Open jobs best matching a candidate's skills and experience, best first."""
+    index.refresh(db)
+    term_ids, term_weights = matching.candidate_terms(candidate.skills, candidate.experience)
+    exclude = [candidate.job_id] if exclude_current else []
+    return index.recommend(term_ids, term_weights, limit=limit, exclude=exclude, min_score=min_score)
@@ -0,0 +1,93 @@
+"""Request-scoped loading of the rows a route works on.
+
+Routes used to look the same rows up several times per request: once for
+the existence check, again in ``crud`` before the write. ``RequestLoader``
+lives for one request (FastAPI caches ``get_loader`` per request, next to
+the request's session) and loads each row at most once:
+
+- rows already in the session's identity map are returned without a query
+  (``crud`` getters use ``Session.get``, so a later ``crud`` call reuses them);
+- IDs asked for together are loaded with one ``IN`` query, jobs through the
+  read-through ``cache``;
+- IDs found missing are remembered, so a second check doesn't query again.
+
+``job_or_404``, ``category_or_404``, ``candidate_or_404`` and
+``question_or_404`` are FastAPI dependencies resolving the path (or query)
+parameter of the same name into the row, or answering 404.
+"""
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .database import get_db
+
+# What a 404 calls each entity
+NAMES = {
+    models.Job: "Job",
+    models.InterviewCategory: "Interview category",
+    models.InterviewQuestion: "Interview question",
+    models.Candidate: "Candidate",
+    models.User: "User",
+}
+
+class RequestLoader:
+    """Per-request memo of rows by primary key, loading missing ones in batches."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._missing: Set[Tuple[type, Hashable]] = set()
+
+    def _fetch(self, model, ids, options):
+        if model is models.Job and not options:
+            return crud.get_jobs_by_ids(self.db, ids).values()
+        return self.db.query(model).options(*options).filter(model.id.in_(ids)).all()
+
+    def get_many(self, model, ids: Iterable[Hashable], *options) -> Dict[Hashable, object]:
+        """
+        Rows of ``model`` by ID, with one query for those not loaded yet in
+        this request. Missing IDs are left out. ``options`` (e.g. a
+        ``joinedload``) apply to that query.
+        """
+        found = {}
+        to_load = []
+        for row_id in dict.fromkeys(ids):
+            if (model, row_id) in self._missing:
+                continue
+            instance = self.db.identity_map.get(self.db.identity_key(model, row_id))
+            if instance is not None:
+                found[row_id] = instance
+            else:
+                to_load.append(row_id)
+
+        if to_load:
+            for instance in self._fetch(model, to_load, options):
+                found[instance.id] = instance
+            self._missing.update((model, row_id) for row_id in to_load if row_id not in found)
+        return found
+
+    def get(self, model, row_id: Hashable, *options) -> Optional[object]:
+        return self.get_many(model, [row_id], *options).get(row_id)
+
+    def get_or_404(self, model, row_id: Hashable, *options):
+        instance = self.get(model, row_id, *options)
+        if instance is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{NAMES[model]} not found")
+        return instance
+
+def get_loader(db: Session = Depends(get_db)) -> RequestLoader:
+    """FastAPI dependency: the request's loader, bound to the request's session."""
+    return RequestLoader(db)
+
+def job_or_404(job_id: int, loader: RequestLoader = Depends(get_loader)) -> models.Job:
+    return loader.get_or_404(models.Job, job_id)
+
+def category_or_404(category_id: int, loader: RequestLoader = Depends(get_loader)) -> models.InterviewCategory:
+    return loader.get_or_404(models.InterviewCategory, category_id)
+
+def question_or_404(question_id: int, loader: RequestLoader = Depends(get_loader)) -> models.InterviewQuestion:
+    return loader.get_or_404(models.InterviewQuestion, question_id)
+
+def candidate_or_404(candidate_id: int, loader: RequestLoader = Depends(get_loader)) -> models.Candidate:
+    return loader.get_or_404(models.Candidate, candidate_id)
@@ -1,14 +1,12 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
 
-from . import models
-from .database import engine, get_db
-from .routes import auth_routes, job_routes, interview_routes, hiring_routes
-from .seed import seed_data
-
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+from .admission import AdmissionControlMiddleware, AdmissionController
+from .compression import CompressionMiddleware
+from .config import COMPRESSION_MINIMUM_SIZE, GZIP_LEVEL, ZSTD_LEVEL, ADMISSION_CONTROL, ADMISSION_LIMITS, TASK_RUNNER_ENABLED, EVENTS_ENABLED
+from .routes import auth_routes, job_routes, interview_routes, candidate_routes, hiring_routes, task_routes, event_routes, analytics_routes
+from .startup import run_startup_tasks
+from . import cache, events, tasks, task_handlers  # noqa: F401  (registers the task kinds)
 
 app = FastAPI(
     title="We Hire API",
@@ -16,6 +14,12 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Admission control: bounded concurrency and queues per route class. Added
+# first so it sits inside CORS, which then also decorates the 429/503s.
+admission_controller = AdmissionController(ADMISSION_LIMITS)
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -29,21 +33,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON/MessagePack/Arrow responses (zstd or gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    gzip_level=GZIP_LEVEL,
+    zstd_level=ZSTD_LEVEL,
+)
+
 # Include routers
 app.include_router(auth_routes.router)
 app.include_router(job_routes.router)
 app.include_router(interview_routes.router)
+app.include_router(candidate_routes.router)
 app.include_router(hiring_routes.router)
+app.include_router(task_routes.router)
+app.include_router(event_routes.router)
+app.include_router(analytics_routes.router)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to We Hire API"}
 
+@app.get("/metrics/admission")
+async def admission_metrics():
+    """Per route class: active and queued requests, admitted and shed counts (this worker)."""
+    return admission_controller.metrics()
+
+@app.get("/metrics/events")
+async def event_metrics():
+    """Open event streams and events delivered or dropped (this worker)."""
+    return events.broker.metrics()
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """Per cached namespace: hits, misses, invalidations, evictions and entries (this worker)."""
+    return cache.backend.metrics()
+
 @app.on_event("startup")
 async def startup_event():
-    # Seed initial data
-    db = next(get_db())
-    seed_data(db)
+    # Create tables and seed initial data (no-op in workers forked by the
+    # production server, whose master already did this once)
+    run_startup_tasks()
+    
+    # Run queued background tasks in this worker
+    if TASK_RUNNER_ENABLED:
+        tasks.start_runner()
+    
+    # Fan out change events to SSE clients (and LISTEN for other workers' on PostgreSQL)
+    if EVENTS_ENABLED:
+        events.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await tasks.stop_runner()
+    await events.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,305 @@
+"""Candidate-to-job match scoring and top-k ranking.
+
+A job's ``requirements`` text is split into requirements (on commas,
+semicolons, line breaks and "and"), and filler words ("5+ years of
+experience in ...", "knowledge of ...") are dropped, leaving terms such as
+``python``, ``fastapi`` or ``product management``. A candidate covers a
+requirement through their ``skills`` (full weight) or, failing that, their
+``experience`` text (``MATCH_EXPERIENCE_WEIGHT``). The match score is the
+share of the job's requirements covered, from 0 to 1; a requirement of
+several words counts partially for each word matched.
+
+Terms are hashed into a fixed feature space (``N_FEATURES``), so every
+candidate is a sparse vector built once from their own text, independent
+of the job, and a job's requirements are a short sorted vector of term IDs
+and weights (cached per job version). Scoring a job's candidates is a
+vectorized sparse dot product over all of them at once.
+
+Per job, each worker keeps the candidates' vectors in memory
+(``CandidateFeatures``, LRU over ``MATCH_CACHE_JOBS`` jobs). Every ranking
+request reads the job's candidate IDs, versions and statuses, and only
+candidates that are new or whose ``version`` changed are read and
+vectorized again; their scores are the only ones recomputed unless the
+job's requirements changed too.
+"""
+import re
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import MATCH_CACHE_JOBS, MATCH_EXPERIENCE_WEIGHT
+
+N_FEATURES = 1 << 20
+SKILL_WEIGHT = 1.0
+
+# Reads of changed candidates' text are chunked to keep IN lists reasonable
+FETCH_CHUNK_SIZE = 1000
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_REQUIREMENT_SEPARATORS = re.compile(r"[,;\n\r•]|\band\b|\bor\b")
+
+# Words that describe a requirement rather than name a skill
+FILLER_WORDS = frozenset("""
+    a an the of in on with and or for to at as using including plus
+    year years yr yrs month months experience experienced expertise exposure
+    knowledge strong solid good great excellent deep proven hands
+    proficiency proficient familiarity familiar understanding background
+    skill skills ability working work professional advanced basic
+    must should required preferred nice have etc
+""".split())
+
+@lru_cache(maxsize=65536)
+def _word_terms(word: str) -> Tuple[str, ...]:
+    """Terms of one whitespace-separated word (cached: vocabularies are small)."""
+    terms = []
+    for token in _TOKEN.findall(word):
+        token = token.rstrip(".")
+        if token.endswith(".js"):  # react.js -> react
+            token = token[:-3]
+        if token and token not in FILLER_WORDS and not token.rstrip("+").isdigit():
+            terms.append(token)
+    return tuple(terms)
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Normalized terms of ``text``: lowercase, no filler words or bare numbers."""
+    if not text:
+        return []
+    return [term for word in text.lower().split() for term in _word_terms(word)]
+
+@lru_cache(maxsize=65536)
+def term_id(term: str) -> int:
+    return zlib.crc32(term.encode()) & (N_FEATURES - 1)
+
+def parse_requirements(requirements: Optional[str]) -> List[List[str]]:
+    """Requirement text -> list of requirements, each a list of terms."""
+    parsed = []
+    for part in _REQUIREMENT_SEPARATORS.split(requirements or ""):
+        terms = list(dict.fromkeys(tokenize(part)))
+        if terms:
+            parsed.append(terms)
+    return parsed
+
+class RequirementVector:
+    """A job's requirements as sorted term IDs with weights (1 per requirement)."""
+
+    def __init__(self, requirements: Optional[str]):
+        self.requirements = parse_requirements(requirements)
+        weights: Dict[int, float] = {}
+        for terms in self.requirements:
+            for term in terms:
+                weights[term_id(term)] = weights.get(term_id(term), 0.0) + 1.0 / len(terms)
+        self.ids = np.array(sorted(weights), dtype=np.int64)
+        self.weights = np.array([weights[i] for i in self.ids.tolist()], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.requirements)
+
+def candidate_terms(skills: Optional[str], experience: Optional[str]) -> Tuple[List[int], List[float]]:
+    """Sparse vector of one candidate: term IDs and weights, skills over experience."""
+    weights = dict.fromkeys(map(term_id, tokenize(experience)), MATCH_EXPERIENCE_WEIGHT)
+    weights.update(dict.fromkeys(map(term_id, tokenize((skills or "").replace(",", " "))), SKILL_WEIGHT))
+    return list(weights), list(weights.values())
+
+class CandidateFeatures:
+    """
+    Sparse vectors (CSR-like) of one job's candidates, plus their versions and
+    statuses. Rows are in no particular order; ``order`` sorts them by ID.
+    """
+
+    def __init__(self, ids, versions, statuses, lengths, indices, values):
+        self.ids = ids
+        self.versions = versions
+        self.statuses = statuses
+        self.lengths = lengths
+        self.indices = indices
+        self.values = values
+        self.rows = np.repeat(np.arange(len(ids)), lengths)  # row of each entry
+        self.order = np.argsort(ids, kind="stable")
+        # Scores against a job version (filled in by ``scores_for``); rows
+        # in ``stale_rows`` still need scoring
+        self.scores: Optional[np.ndarray] = None
+        self.scored_version: Optional[int] = None
+        self.stale_rows: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64),
+            np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32)
+        )
+
+    def locate(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Row of each ID here and whether it was found."""
+        if not len(self.ids):
+            return np.zeros(len(ids), np.int64), np.zeros(len(ids), bool)
+        positions = np.searchsorted(self.ids, ids, sorter=self.order)
+        positions = np.minimum(positions, len(self.ids) - 1)
+        rows = self.order[positions]
+        return rows, self.ids[rows] == ids
+
+def score_rows(features: CandidateFeatures, requirement: RequirementVector,
+               row_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Match scores of all rows (or only of ``row_mask``; the others are 0)."""
+    count = len(features.ids)
+    if not len(requirement) or not count:
+        return np.zeros(count, np.float32)
+
+    indices, values, rows = features.indices, features.values, features.rows
+    if row_mask is not None:
+        entry_mask = row_mask[rows]
+        indices, values, rows = indices[entry_mask], values[entry_mask], rows[entry_mask]
+
+    positions = np.minimum(np.searchsorted(requirement.ids, indices), len(requirement.ids) - 1)
+    matched = requirement.ids[positions] == indices
+    contributions = np.where(matched, requirement.weights[positions] * values, 0.0)
+    scores = np.bincount(rows, weights=contributions, minlength=count) / len(requirement)
+    return np.minimum(scores, 1.0).astype(np.float32)
+
+def build_features(db: Session, job_id: int, cached: Optional[CandidateFeatures] = None) -> CandidateFeatures:
+    """
+    Current vectors of a job's candidates. Rows of ``cached`` whose version is
+    unchanged are reused (with their scores); the rest are read and vectorized.
+    """
+    candidate = models.Candidate
+    current = db.execute(
+        select(candidate.id, candidate.version, candidate.status).where(candidate.job_id == job_id)
+    ).all()
+    ids = np.fromiter((row[0] for row in current), np.int64, len(current))
+    versions = np.fromiter((row[1] or 0 for row in current), np.int64, len(current))
+    statuses = np.fromiter((row[2] or 0 for row in current), np.int64, len(current))
+
+    cached = cached or CandidateFeatures.empty()
+    cached_rows, found = cached.locate(ids)
+    unchanged = found & (cached.versions[cached_rows] == versions) if len(cached.ids) else found
+    stale_ids = ids[~unchanged].tolist()
+
+    # Vectorize new and changed candidates
+    new_terms: Dict[int, Tuple[List[int], List[float]]] = {}
+    for start in range(0, len(stale_ids), FETCH_CHUNK_SIZE):
+        chunk = stale_ids[start:start + FETCH_CHUNK_SIZE]
+        for candidate_id, skills, experience in db.execute(
+            select(candidate.id, models.Person.skills, models.Person.experience)
+            .join(models.Person, models.Person.id == candidate.person_id)
+            .where(candidate.id.in_(chunk))
+        ):
+            new_terms[candidate_id] = candidate_terms(skills, experience)
+    stale_ids = [candidate_id for candidate_id in stale_ids if candidate_id in new_terms]  # deleted meanwhile
+
+    # Kept rows first, in the cached layout, then the new ones
+    keep = np.zeros(len(cached.ids), bool)
+    keep[cached_rows[unchanged]] = True
+    entry_keep = keep[cached.rows]
+    kept_ids = cached.ids[keep]
+    new_ids = np.array(stale_ids, np.int64)
+    new_lengths = np.array([len(new_terms[i][0]) for i in stale_ids], np.int64)
+
+    all_ids = np.concatenate([kept_ids, new_ids])
+    # Versions and statuses as just read, in the new row order
+    by_id = np.argsort(ids, kind="stable")
+    positions = by_id[np.searchsorted(ids, all_ids, sorter=by_id)]
+
+    features = CandidateFeatures(
+        all_ids,
+        versions[positions],
+        statuses[positions],
+        np.concatenate([cached.lengths[keep], new_lengths]),
+        np.concatenate([cached.indices[entry_keep], np.array(
+            [term for i in stale_ids for term in new_terms[i][0]], np.int64
+        )]),
+        np.concatenate([cached.values[entry_keep], np.array(
+            [weight for i in stale_ids for weight in new_terms[i][1]], np.float32
+        )]),
+    )
+    if cached.scores is not None:
+        features.scores = np.concatenate([cached.scores[keep], np.zeros(len(new_ids), np.float32)])
+        features.scored_version = cached.scored_version
+        features.stale_rows = np.arange(len(all_ids)) >= len(kept_ids)
+    return features
+
+def scores_for(features: CandidateFeatures, job: models.Job,
+               requirement: RequirementVector) -> np.ndarray:
+    """Scores of every row against ``job``, recomputing only what changed."""
+    stale_rows = features.stale_rows
+    if features.scores is None or features.scored_version != job.version:
+        features.scores = score_rows(features, requirement)
+    elif stale_rows is not None and stale_rows.any():
+        features.scores[stale_rows] = score_rows(features, requirement, stale_rows)[stale_rows]
+    features.scored_version = job.version
+    features.stale_rows = None
+    return features.scores
+
+def top_k(scores: np.ndarray, ids: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+    """The ``k`` best (ID, score) pairs, best first; ties go to the lower ID."""
+    rows = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+    if k <= 0 or not len(rows):
+        return []
+    if len(rows) > k:
+        # Everything scoring at least the k-th best, so ties are broken by ID
+        threshold = np.partition(scores[rows], len(rows) - k)[len(rows) - k]
+        rows = rows[scores[rows] >= threshold]
+    best = rows[np.lexsort((ids[rows], -scores[rows]))][:k]
+    return list(zip(ids[best].tolist(), scores[best].tolist()))
+
+class MatchCache:
+    """Per-worker LRU of candidate vectors and requirement vectors by job."""
+
+    def __init__(self, max_jobs: int = MATCH_CACHE_JOBS):
+        self.max_jobs = max_jobs
+        self._features: "OrderedDict[int, CandidateFeatures]" = OrderedDict()
+        self._requirements: "OrderedDict[Tuple[int, int], RequirementVector]" = OrderedDict()
+
+    def _remember(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_jobs:
+            cache.popitem(last=False)
+
+    def requirement_vector(self, job: models.Job) -> RequirementVector:
+        key = (job.id, job.version)
+        vector = self._requirements.get(key)
+        if vector is None:
+            vector = RequirementVector(job.requirements)
+            self._remember(self._requirements, key, vector)
+        return vector
+
+    def features(self, db: Session, job_id: int) -> CandidateFeatures:
+        features = build_features(db, job_id, cached=self._features.get(job_id))
+        self._remember(self._features, job_id, features)
+        return features
+
+cache = MatchCache()
+
+def rank_candidates(db: Session, job: models.Job, limit: int = 20,
+                    status: Optional[int] = None, min_score: float = 0.0) -> Tuple[List[Tuple[int, float]], int]:
+    """
+    Best matching candidates of ``job`` as (candidate ID, score) pairs, and
+    how many candidates were ranked (after the status filter).
+    """
+    features = cache.features(db, job.id)
+    scores = scores_for(features, job, cache.requirement_vector(job))
+    mask = np.ones(len(scores), bool)
+    if status is not None:
+        mask &= features.statuses == status
+    if min_score > 0:
+        mask &= scores >= min_score
+    return top_k(scores, features.ids, limit, mask), int(mask.sum())
+
+def explain(job: models.Job, skills: Optional[str], experience: Optional[str]) -> dict:
+    """One candidate's score for ``job`` and which requirements they cover or miss."""
+    requirement = cache.requirement_vector(job)
+    term_ids, weights = candidate_terms(skills, experience)
+    features = CandidateFeatures(
+        np.zeros(1, np.int64), np.zeros(1, np.int64), np.zeros(1, np.int64),
+        np.array([len(term_ids)], np.int64), np.array(term_ids, np.int64), np.array(weights, np.float32)
+    )
+    present = set(tokenize(experience)) | set(tokenize((skills or "").replace(",", " ")))
+    matched, missing = [], []
+    for terms in requirement.requirements:
+        (matched if present.intersection(terms) else missing).append(" ".join(terms))
+    return {"match_score": float(score_rows(features, requirement)[0]), "matched": matched, "missing": missing}
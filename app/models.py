@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Date, Float, DateTime, Enum, func
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Date, Float, DateTime, Enum, Index, JSON, Table, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -37,20 +37,31 @@ class Job(Base):
     requirements = Column(Text)
     date_created = Column(Date, nullable=False, server_default=func.current_date())
     end_date = Column(Date)
-    assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
+    assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     status = Column(String, default=JobStatus.DRAFT)
     location = Column(String)
     salary = Column(Float, nullable=True)
     department = Column(String)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Optimistic concurrency (ETag)
     
     # Relationship with the assigned hiring manager
     assigned_manager = relationship("User", back_populates="assigned_jobs")
     
+    # Children are removed by ON DELETE CASCADE in the database; passive_deletes
+    # keeps SQLAlchemy from loading them all just to delete them one by one.
+
     # Relationship with interview categories
-    interview_categories = relationship("InterviewCategory", back_populates="job")
+    interview_categories = relationship(
+        "InterviewCategory", back_populates="job", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     # Relationship with candidates
-    candidates = relationship("Candidate", back_populates="job", cascade="all, delete-orphan")
+    candidates = relationship("Candidate", back_populates="job", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Precomputed pipeline counts (see pipeline_stats.py)
+    pipeline_stats = relationship(
+        "JobPipelineStats", back_populates="job", uselist=False, cascade="all, delete-orphan", passive_deletes=True
+    )
 
 class InterviewCategory(Base):
     __tablename__ = "interview_categories"
@@ -59,10 +70,13 @@ class InterviewCategory(Base):
     name = Column(String, index=True)
     description = Column(Text)
     default_time = Column(Integer)  # in minutes
-    job_id = Column(Integer, ForeignKey("jobs.id"))
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"))
     
     # Relationship with interview questions
-    questions = relationship("InterviewQuestion", back_populates="category", cascade="all, delete-orphan")
+    questions = relationship(
+        "InterviewQuestion", back_populates="category", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="[InterviewQuestion.position, InterviewQuestion.id]"
+    )
     
     # Relationship with job
     job = relationship("Job", back_populates="interview_categories")
@@ -74,8 +88,10 @@ class InterviewQuestion(Base):
     text = Column(Text)
     status = Column(String, default="active")
     must_ask = Column(Boolean, default=False)  # Indicates if this is a must-ask question
-    category_id = Column(Integer, ForeignKey("interview_categories.id"))
-    job_id = Column(Integer, ForeignKey("jobs.id"))
+    category_id = Column(Integer, ForeignKey("interview_categories.id", ondelete="CASCADE"))
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"))
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Optimistic concurrency (ETag)
+    position = Column(Integer, nullable=False, default=0, server_default="0")  # Order within the category
     
     # Relationship with category
     category = relationship("InterviewCategory", back_populates="questions")
@@ -83,8 +99,17 @@ class InterviewQuestion(Base):
     # Relationship with job
     job = relationship("Job")
 
-class Candidate(Base):
-    __tablename__ = "candidates"
+    __table_args__ = (
+        # A category's questions in order (reads and renumbering after bulk edits)
+        Index("ix_interview_questions_category_id_position", "category_id", "position"),
+    )
+
+# Profile fields a candidate response carries that are stored on the Person
+PERSON_FIELDS = ("name", "email", "phone", "education", "experience", "skills", "avatar_url")
+
+class Person(Base):
+    """Someone applying to jobs. The profile is stored once, however many jobs they apply to."""
+    __tablename__ = "people"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -92,17 +117,225 @@ class Candidate(Base):
     phone = Column(String)
     education = Column(Text)
     experience = Column(Text)
+    skills = Column(Text)  # Store as comma-separated values
+    avatar_url = Column(String, nullable=True)
+
+    # Relationship with their applications
+    applications = relationship("Candidate", back_populates="person", passive_deletes=True)
+
+class PersonProfile:
+    """Read-only profile fields of an application's person, so a candidate
+    still has the flat shape of ``schemas.Candidate``."""
+    name = property(lambda self: self.person.name)
+    email = property(lambda self: self.person.email)
+    phone = property(lambda self: self.person.phone)
+    education = property(lambda self: self.person.education)
+    experience = property(lambda self: self.person.experience)
+    skills = property(lambda self: self.person.skills)
+    avatar_url = property(lambda self: self.person.avatar_url)
+
+class Candidate(PersonProfile, Base):
+    """One application of a person to a job (per-job state only)."""
+    __tablename__ = "candidates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    person_id = Column(Integer, ForeignKey("people.id", ondelete="CASCADE"), nullable=False)
     applied_date = Column(Date, server_default=func.current_date())
     status = Column(Integer, default=0)  # 0: Screening, 1: Interview, 2: Hired, 3: Rejected
     resume_url = Column(String, nullable=True)
     cover_letter = Column(Boolean, default=False)
-    skills = Column(Text)  # Store as comma-separated values
     rating = Column(Float, default=0.0)
-    avatar_url = Column(String, nullable=True)
     interview_scheduled = Column(Boolean, default=False)
     interview_date = Column(DateTime, nullable=True)
     notes = Column(Text, nullable=True)
-    job_id = Column(Integer, ForeignKey("jobs.id"))
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"))
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Optimistic concurrency (ETag)
+
+    # Relationship with the person (loaded in the same query)
+    person = relationship("Person", back_populates="applications", lazy="joined", innerjoin=True)
 
     # Relationship with job
-    job = relationship("Job", back_populates="candidates") 
\ No newline at end of file
+    job = relationship("Job", back_populates="candidates") 
+
+    __table_args__ = (
+        # One application per person and job; also finds a person's applications
+        Index("ix_candidates_person_id_job_id", "person_id", "job_id", unique=True),
+        # Latest application date per job (pipeline rollup repair on delete)
+        Index("ix_candidates_job_id_applied_date", "job_id", "applied_date"),
+        # Interview calendar range queries, org-wide and per job (scheduled only)
+        Index(
+            "ix_candidates_interview_date",
+            "interview_date",
+            postgresql_where=interview_scheduled.is_(True),
+            sqlite_where=interview_scheduled.is_(True),
+        ),
+        Index(
+            "ix_candidates_job_id_interview_date",
+            "job_id",
+            "interview_date",
+            postgresql_where=interview_scheduled.is_(True),
+            sqlite_where=interview_scheduled.is_(True),
+        ),
+    )
+
+class JobPipelineStats(Base):
+    """Per-job candidate counts, maintained incrementally by crud (see pipeline_stats.py)."""
+    __tablename__ = "job_pipeline_stats"
+
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    screening_count = Column(Integer, nullable=False, default=0)
+    interview_count = Column(Integer, nullable=False, default=0)
+    hired_count = Column(Integer, nullable=False, default=0)
+    rejected_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    last_applied_date = Column(Date, nullable=True)
+
+    # Relationship with job
+    job = relationship("Job", back_populates="pipeline_stats")
+
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.total_count if self.total_count else None
+
+class BackgroundTask(Base):
+    """A heavy operation run outside the request by the task runner (see tasks.py)."""
+    __tablename__ = "background_tasks"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    kind = Column(String, nullable=False)  # registered handler name
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    progress_current = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    progress_message = Column(String, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # refreshed while running; stale = worker died
+
+    __table_args__ = (
+        # The runner claims the oldest pending task
+        Index("ix_background_tasks_status_created_at", "status", "created_at"),
+    )
+
+class CandidateDedupKey(Base):
+    """Blocking key of a candidate for duplicate detection (see dedup.py)."""
+    __tablename__ = "candidate_dedup_keys"
+
+    key = Column(String(40), primary_key=True)  # e.g. "p:5550100123", "e:jdoe", "n3:9f2c..."
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        # Replacing a candidate's keys after an edit
+        Index("ix_candidate_dedup_keys_candidate_id", "candidate_id"),
+    )
+
+class CandidateStatusEvent(Base):
+    """
+    One change of a candidate's status (append-only, see status_history.py).
+    The application's first event has no ``from_status``.
+    """
+    __tablename__ = "candidate_status_events"
+
+    id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    from_status = Column(Integer, nullable=True)
+    to_status = Column(Integer, nullable=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        # Per-job and per-department analytics: a job's events already in
+        # the (candidate, time) order the stage windows need
+        Index("ix_candidate_status_events_job_id_candidate_id_changed_at", "job_id", "candidate_id", "changed_at"),
+        # A candidate's history (and the cascade when it is deleted)
+        Index("ix_candidate_status_events_candidate_id_changed_at", "candidate_id", "changed_at"),
+    )
+
+class CandidateDuplicate(Base):
+    """A likely duplicate: ``candidate_id`` looks like the older ``duplicate_of_id``."""
+    __tablename__ = "candidate_duplicates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
+    duplicate_of_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+    reasons = Column(String, nullable=False)  # comma-separated, e.g. "phone,name"
+    status = Column(String, nullable=False, default="open")  # open, confirmed, dismissed
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    resolved_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    resolved_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("candidate_id", "duplicate_of_id", name="uq_candidate_duplicates_pair"),
+        Index("ix_candidate_duplicates_duplicate_of_id", "duplicate_of_id"),
+        Index("ix_candidate_duplicates_status", "status"),
+    )
+
+# Archive ("cold") tables, see archive.py. Same columns as the hot tables plus
+# archived_at, no foreign keys and only the indexes archived reads need, so
+# history doesn't grow the hot tables or their indexes.
+def _archive_table(table, name, *indexes):
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable, autoincrement=False)
+        for column in table.columns
+    ]
+    return Table(
+        name,
+        Base.metadata,
+        *columns,
+        Column("archived_at", DateTime, nullable=False, server_default=func.now()),
+        *indexes
+    )
+
+class ArchivedJob(Base):
+    __table__ = _archive_table(Job.__table__, "jobs_archive")
+
+    assigned_manager = relationship(
+        "User", primaryjoin="User.id == foreign(ArchivedJob.assigned_to)", viewonly=True
+    )
+
+class ArchivedInterviewCategory(Base):
+    __table__ = _archive_table(
+        InterviewCategory.__table__,
+        "interview_categories_archive",
+        Index("ix_interview_categories_archive_job_id", "job_id"),
+    )
+
+    questions = relationship(
+        "ArchivedInterviewQuestion",
+        primaryjoin="ArchivedInterviewCategory.id == foreign(ArchivedInterviewQuestion.category_id)",
+        order_by="[ArchivedInterviewQuestion.position, ArchivedInterviewQuestion.id]",
+        viewonly=True
+    )
+
+class ArchivedInterviewQuestion(Base):
+    __table__ = _archive_table(
+        InterviewQuestion.__table__,
+        "interview_questions_archive",
+        Index("ix_interview_questions_archive_job_id", "job_id"),
+    )
+
+class ArchivedCandidateStatusEvent(Base):
+    __table__ = _archive_table(
+        CandidateStatusEvent.__table__,
+        "candidate_status_events_archive",
+        Index("ix_candidate_status_events_archive_job_id", "job_id"),
+    )
+
+class ArchivedCandidate(PersonProfile, Base):
+    __table__ = _archive_table(
+        Candidate.__table__,
+        "candidates_archive",
+        Index("ix_candidates_archive_job_id", "job_id"),
+    )
+
+    # People are not archived: they may have applied to other jobs
+    person = relationship(
+        "Person", primaryjoin="Person.id == foreign(ArchivedCandidate.person_id)", lazy="joined", viewonly=True
+    )
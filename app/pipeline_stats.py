@@ -0,0 +1,160 @@
+"""Incrementally maintained per-job pipeline rollup (``job_pipeline_stats``).
+
+Every candidate write path in ``crud`` adjusts the job's rollup row with an
+atomic ``UPDATE ... SET count = count + delta`` inside the same transaction,
+so dashboard reads are a single primary-key lookup however many applicants
+a job has.
+
+Rows are created together with the job. Jobs that predate the table get
+their row built from the candidates table on first read, and
+``rebuild_pipeline_stats.py`` recomputes everything if the rollup ever
+drifts.
+"""
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update, delete, insert, func, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Candidate.status -> rollup column (0: Screening, 1: Interview, 2: Hired, 3: Rejected)
+STATUS_COLUMNS = {
+    0: "screening_count",
+    1: "interview_count",
+    2: "hired_count",
+    3: "rejected_count",
+}
+
+def _apply(db: Session, job_id: int, status_deltas: Dict[int, int], total_delta: int = 0,
+           rating_delta: float = 0.0, applied_date=None):
+    stats = models.JobPipelineStats
+    values = {}
+
+    for status_value, delta in status_deltas.items():
+        column_name = STATUS_COLUMNS.get(status_value)
+        if column_name and delta:
+            column = getattr(stats, column_name)
+            values[column_name] = column + delta
+
+    if total_delta:
+        values["total_count"] = stats.total_count + total_delta
+
+    if rating_delta:
+        values["rating_sum"] = stats.rating_sum + rating_delta
+
+    if applied_date is not None:
+        values["last_applied_date"] = case(
+            (stats.last_applied_date.is_(None), applied_date),
+            (stats.last_applied_date < applied_date, applied_date),
+            else_=stats.last_applied_date
+        )
+
+    if values:
+        db.execute(update(stats).where(stats.job_id == job_id).values(**values))
+
+def record_candidate_added(db: Session, job_id: int, status: int, rating: Optional[float],
+                           applied_date: Optional[date] = None):
+    """Count a new candidate. ``applied_date`` defaults to today, like the column."""
+    _apply(
+        db,
+        job_id,
+        {status: 1},
+        total_delta=1,
+        rating_delta=rating or 0.0,
+        applied_date=applied_date if applied_date is not None else func.current_date()
+    )
+
+def record_candidate_changed(db: Session, job_id: int, old_status: int, new_status: int,
+                             old_rating: Optional[float], new_rating: Optional[float]):
+    """Move a candidate between status buckets and/or adjust the rating sum."""
+    status_deltas = Counter()
+    if old_status != new_status:
+        status_deltas[old_status] -= 1
+        status_deltas[new_status] += 1
+    _apply(db, job_id, status_deltas, rating_delta=(new_rating or 0.0) - (old_rating or 0.0))
+
+def record_status_changes(db: Session, job_id: int, transitions: Iterable[Tuple[int, int]]):
+    """Apply many (old_status, new_status) moves for one job in a single UPDATE."""
+    status_deltas = Counter()
+    for old_status, new_status in transitions:
+        if old_status != new_status:
+            status_deltas[old_status] -= 1
+            status_deltas[new_status] += 1
+    _apply(db, job_id, status_deltas)
+
+def record_candidate_removed(db: Session, job_id: int, status: int, rating: Optional[float]):
+    """
+    Uncount a deleted candidate. Call after the candidate row is deleted (and
+    flushed) so the latest application date can be recomputed without it.
+    """
+    _apply(db, job_id, {status: -1}, total_delta=-1, rating_delta=-(rating or 0.0))
+
+    stats = models.JobPipelineStats
+    latest = (
+        select(func.max(models.Candidate.applied_date))
+        .where(models.Candidate.job_id == job_id)
+        .scalar_subquery()
+    )
+    db.execute(update(stats).where(stats.job_id == job_id).values(last_applied_date=latest))
+
+def _rollup_select(job_ids: Optional[Sequence[int]] = None):
+    """Recompute rollup rows from the candidates table, one per job."""
+    candidate = models.Candidate
+
+    def count_status(status_value):
+        return func.coalesce(func.sum(case((candidate.status == status_value, 1), else_=0)), 0)
+
+    stmt = (
+        select(
+            models.Job.id,
+            *[count_status(status_value) for status_value in STATUS_COLUMNS],
+            func.count(candidate.id),
+            func.coalesce(func.sum(candidate.rating), 0.0),
+            func.max(candidate.applied_date),
+        )
+        .select_from(models.Job)
+        .outerjoin(candidate, candidate.job_id == models.Job.id)
+        .group_by(models.Job.id)
+    )
+    if job_ids is not None:
+        stmt = stmt.where(models.Job.id.in_(job_ids))
+    return stmt
+
+_ROLLUP_COLUMNS = ["job_id", *STATUS_COLUMNS.values(), "total_count", "rating_sum", "last_applied_date"]
+
+def rebuild(db: Session, job_id: Optional[int] = None, job_ids: Optional[Sequence[int]] = None):
+    """
+    Recompute the rollup for one job (``job_id``), several (``job_ids``), or
+    for every job when neither is given.
+    """
+    if job_id is not None:
+        job_ids = [job_id]
+
+    stats = models.JobPipelineStats
+    clear = delete(stats)
+    if job_ids is not None:
+        clear = clear.where(stats.job_id.in_(job_ids))
+    db.execute(clear)
+    db.execute(insert(stats).from_select(_ROLLUP_COLUMNS, _rollup_select(job_ids)))
+
+def build_missing(db: Session, job_ids: Sequence[int]):
+    """
+    Build the rollup rows of jobs that don't have one yet. Rows that already
+    exist, e.g. because a concurrent first read just built them, are left
+    alone (ON CONFLICT DO NOTHING), so racing readers don't collide.
+    """
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(models.JobPipelineStats).from_select(_ROLLUP_COLUMNS, _rollup_select(job_ids))
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["job_id"]))
+
+def get_stats(db: Session, job_id: int) -> Optional[models.JobPipelineStats]:
+    """The job's rollup row, built on the fly for jobs that predate the table."""
+    row = db.get(models.JobPipelineStats, job_id)
+    if row is None:
+        build_missing(db, [job_id])
+        db.commit()
+        row = db.get(models.JobPipelineStats, job_id)
+    return row
@@ -1 +1 @@
-from . import auth_routes, job_routes, interview_routes, candidate_routes, hiring_routes 
\ No newline at end of file
+from . import auth_routes, job_routes, interview_routes, candidate_routes, hiring_routes, task_routes, event_routes, analytics_routes
\ No newline at end of file
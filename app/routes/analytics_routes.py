@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+
+from .. import schemas, models, auth, loaders, status_history
+from ..loaders import RequestLoader
+from ..database import get_db
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+def _check_scope(loader: RequestLoader, job_id: Optional[int], department: Optional[str],
+                 since: Optional[datetime], until: Optional[datetime]):
+    """Analytics cover one job or one department (never a scan of every event)."""
+    if (job_id is None) == (department is None):
+        raise HTTPException(status_code=400, detail="Specify either job_id or department")
+    if since is not None and until is not None and since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if job_id is not None:
+        loader.get_or_404(models.Job, job_id)
+
+@router.get("/time-in-stage", response_model=schemas.TimeInStage)
+async def read_time_in_stage(
+    job_id: Optional[int] = Query(None, description="One job"),
+    department: Optional[str] = Query(None, description="All jobs of a department"),
+    since: Optional[datetime] = Query(None, description="Only stays entered from this time"),
+    until: Optional[datetime] = Query(None, description="Only stays entered before this time"),
+    db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    How long candidates stay in each stage: average, median, 90th and 95th
+    percentile and longest completed stay in hours, plus how many are still
+    in the stage.
+    """
+    _check_scope(loader, job_id, department, since, until)
+    stages = status_history.time_in_stage(db, job_id=job_id, department=department, since=since, until=until)
+    return {"job_id": job_id, "department": department, "since": since, "until": until, "stages": stages}
+
+@router.get("/conversion", response_model=schemas.Conversion)
+async def read_conversion(
+    job_id: Optional[int] = Query(None, description="One job"),
+    department: Optional[str] = Query(None, description="All jobs of a department"),
+    since: Optional[datetime] = Query(None, description="Only applications from this time"),
+    until: Optional[datetime] = Query(None, description="Only applications before this time"),
+    db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Funnel per job and in total: applications, how many reached the
+    interview stage, were hired or rejected, and the conversion rates.
+    """
+    _check_scope(loader, job_id, department, since, until)
+    funnel = status_history.conversion(db, job_id=job_id, department=department, since=since, until=until)
+    return {"job_id": job_id, "department": department, "since": since, "until": until, **funnel}
@@ -1,20 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
-from .. import schemas, crud, models, auth
+from .. import schemas, crud, models, auth, serializers, scheduling, concurrency, tasks, matching, job_index, dedup, loaders, status_history
+from ..loaders import RequestLoader
+from ..config import MAX_RANKED_CANDIDATES, MAX_RECOMMENDED_JOBS
 from ..database import get_db
+from .task_routes import task_accepted
 
 router = APIRouter(prefix="/api/candidates", tags=["Candidates"])
 
+# Candidate rows join the application with the person's profile (Arrow column types)
+CANDIDATE_MODELS = (models.Candidate, models.Person)
+
+def _check_interview_conflicts(
+    db: Session,
+    job_id: int,
+    interview_scheduled: bool,
+    interview_date: Optional[datetime],
+    candidate_id: Optional[int] = None
+):
+    """Reject scheduling an interview that overlaps another one of the same hiring manager."""
+    if not interview_scheduled or interview_date is None:
+        return
+    
+    conflicts = scheduling.find_conflicts(db, job_id, interview_date, exclude_candidate_id=candidate_id)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Interview overlaps other interviews of the hiring manager",
+                "conflicts": jsonable_encoder(conflicts)
+            }
+        )
+
 @router.post("", response_model=schemas.Candidate)
 async def create_candidate(
     candidate: schemas.CandidateCreate,
+    response: Response,
+    allow_conflicts: bool = Query(False, description="Schedule even if the interview overlaps another one"),
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Create a new candidate for a job."""
+    """
+    Create a new candidate for a job. Someone who applied to another job
+    with the same email keeps one profile, updated from this request.
+    """
     # Only HR or Hiring Manager can create candidates
     if current_user.role not in ["HR", "Hiring Manager"]:
         raise HTTPException(
@@ -23,11 +57,26 @@ async def create_candidate(
         )
     
     # Check if job exists
-    job = crud.get_job(db, job_id=candidate.job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
+    loader.get_or_404(models.Job, candidate.job_id)
+    
+    # A person (known by their email) applies to each job once
+    already_applied = HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="This person has already applied to this job"
+    )
+    if crud.get_candidate_by_email(db, email=candidate.email, job_id=candidate.job_id) is not None:
+        raise already_applied
     
-    return crud.create_candidate(db=db, candidate=candidate)
+    if not allow_conflicts:
+        _check_interview_conflicts(db, candidate.job_id, candidate.interview_scheduled, candidate.interview_date)
+    
+    try:
+        db_candidate = crud.create_candidate(db=db, candidate=candidate)
+    except crud.AlreadyAppliedError:
+        # A concurrent request created the same application after the check above
+        raise already_applied
+    concurrency.set_etag(response, db_candidate)
+    return db_candidate
 
 @router.get("/job/{job_id}", response_model=List[schemas.Candidate])
 async def read_candidates_by_job(
@@ -38,50 +87,234 @@ async def read_candidates_by_job(
     status: Optional[int] = None,
     min_rating: Optional[float] = Query(None, ge=0, le=5),
     max_rating: Optional[float] = Query(None, ge=0, le=5),
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    include_archived: bool = Query(False, description="Also look in the archive of old closed jobs"),
+    media_type: str = Depends(serializers.negotiate_media_type),
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Get all candidates for a specific job with optional filters.
     status: Integer (0: Screening, 1: Interview, 2: Hired, 3: Rejected)
+    Use view=summary or fields=... to skip heavy columns such as experience.
     """
-    # Check if job exists
-    job = crud.get_job(db, job_id=job_id)
+    selected = serializers.resolve_fields(serializers.CANDIDATE_PROJECTIONS, view=view, fields=fields)
+    
+    # Check if job exists (an archived job's candidates are archived with it)
+    archived = False
+    job = loader.get(models.Job, job_id)
+    if job is None and include_archived:
+        job = crud.get_archived_job(db, job_id=job_id)
+        archived = job is not None
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    candidates = crud.search_candidates(
+    rows = crud.search_candidate_rows(
         db,
         job_id=job_id,
+        fields=selected,
         search_term=search,
         status=status,
         min_rating=min_rating,
         max_rating=max_rating,
         skip=skip,
-        limit=limit
+        limit=limit,
+        archived=archived
     )
-    return candidates
+    return serializers.rows_response(selected, rows, media_type=media_type, model=CANDIDATE_MODELS)
+
+@router.get("/job/{job_id}/export", response_model=List[schemas.Candidate])
+async def export_candidates_by_job(
+    job_id: int,
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    media_type: str = Depends(serializers.negotiate_media_type),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
+):
+    """
+    Export every candidate of a job, without pagination.
+    The response is streamed; send Accept: application/msgpack or
+    application/vnd.apache.arrow.stream for the compact binary formats.
+    """
+    selected = serializers.resolve_fields(serializers.CANDIDATE_PROJECTIONS, view=view, fields=fields)
+    
+    batches = crud.iter_candidate_row_batches(db, job_id=job_id, fields=selected)
+    return serializers.stream_rows_response(selected, batches, media_type=media_type, model=CANDIDATE_MODELS)
+
+@router.get("/job/{job_id}/ranked", response_model=schemas.RankedCandidates)
+async def read_ranked_candidates(
+    job_id: int,
+    limit: int = Query(20, ge=1, le=MAX_RANKED_CANDIDATES),
+    status: Optional[int] = None,
+    min_score: float = Query(0.0, ge=0, le=1),
+    view: str = Query("summary", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
+):
+    """
+    The job's candidates best matching its requirements, best first.
+    match_score is the share of the requirements a candidate's skills (or,
+    at a discount, experience) cover. status filters like the list endpoint.
+    """
+    selected = serializers.resolve_fields(serializers.CANDIDATE_PROJECTIONS, view=view, fields=fields)
+    
+    best, ranked = matching.rank_candidates(db, job, limit=limit, status=status, min_score=min_score)
+    scores = dict(best)
+    rows, _ = crud.get_candidate_rows_by_ids(db, selected, list(scores))
+    return serializers.ranked_response(job_id, selected, rows, scores, ranked)
+
+@router.get("/duplicates", response_model=List[schemas.DuplicateFlag])
+async def read_duplicate_flags(
+    status: Optional[schemas.DuplicateFlagStatus] = schemas.DuplicateFlagStatus.OPEN,
+    job_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Likely duplicate candidates awaiting review, most similar first.
+    job_id limits the list to flags on that job's newer candidate records.
+    """
+    return dedup.get_duplicate_flags(
+        db, status=status.value if status else None, job_id=job_id, skip=skip, limit=limit
+    )
+
+@router.put("/duplicates/{flag_id}", response_model=schemas.DuplicateFlag)
+async def resolve_duplicate_flag(
+    flag_id: int,
+    flag_update: schemas.DuplicateFlagUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Confirm or dismiss a duplicate flag. Candidates are never merged automatically."""
+    # Check permissions
+    if current_user.role not in ["HR", "Hiring Manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    flag = dedup.resolve_duplicate_flag(db, flag_id=flag_id, status=flag_update.status.value, user_id=current_user.id)
+    if flag is None:
+        raise HTTPException(status_code=404, detail="Duplicate flag not found")
+    return flag
+
+@router.post("/batch", response_model=schemas.CandidateBatch)
+async def read_candidates_batch(
+    batch: schemas.BatchIds,
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Get many candidates by ID in one request (e.g. a saved shortlist).
+    Items come back in the requested order; unknown IDs are listed in missing.
+    """
+    selected = serializers.resolve_fields(serializers.CANDIDATE_PROJECTIONS, view=view, fields=fields)
+    rows, missing = crud.get_candidate_rows_by_ids(db, selected, batch.ids)
+    return serializers.batch_response(selected, rows, missing)
 
 @router.get("/{candidate_id}", response_model=schemas.Candidate)
 async def read_candidate(
     candidate_id: int,
+    response: Response,
+    include_archived: bool = Query(False, description="Also look in the archive of old closed jobs"),
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Get a specific candidate by ID."""
-    candidate = crud.get_candidate(db, candidate_id=candidate_id)
+    """Get a specific candidate by ID. The ETag header carries its version."""
+    candidate = loader.get(models.Candidate, candidate_id)
+    if candidate is None and include_archived:
+        candidate = crud.get_archived_candidate(db, candidate_id=candidate_id)
     if candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
+    concurrency.set_etag(response, candidate)
     return candidate
 
+@router.get("/{candidate_id}/match", response_model=schemas.CandidateMatch)
+async def read_candidate_match(
+    candidate_id: int,
+    loader: RequestLoader = Depends(loaders.get_loader),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    candidate: models.Candidate = Depends(loaders.candidate_or_404)
+):
+    """How well a candidate matches their job: score plus requirements matched and missing."""
+    job = loader.get_or_404(models.Job, candidate.job_id)
+    
+    match = matching.explain(job, candidate.skills, candidate.experience)
+    return {"candidate_id": candidate.id, "job_id": job.id, **match}
+
+@router.get("/{candidate_id}/duplicates", response_model=List[schemas.DuplicateFlag])
+async def read_candidate_duplicates(
+    candidate_id: int,
+    status: Optional[schemas.DuplicateFlagStatus] = schemas.DuplicateFlagStatus.OPEN,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    candidate: models.Candidate = Depends(loaders.candidate_or_404)
+):
+    """Likely duplicates of a candidate, in either direction."""
+    return dedup.get_candidate_duplicate_flags(db, candidate_id=candidate_id, status=status.value if status else None)
+
+@router.get("/{candidate_id}/status-history", response_model=List[schemas.CandidateStatusEvent])
+async def read_candidate_status_history(
+    candidate_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    candidate: models.Candidate = Depends(loaders.candidate_or_404)
+):
+    """A candidate's status changes, oldest first (the first one is the application)."""
+    return status_history.get_candidate_history(db, candidate_id=candidate_id)
+
+@router.get("/{candidate_id}/recommended-jobs", response_model=schemas.RecommendedJobs)
+async def read_recommended_jobs(
+    candidate_id: int,
+    limit: int = Query(10, ge=1, le=MAX_RECOMMENDED_JOBS),
+    min_score: float = Query(0.0, ge=0, le=1),
+    exclude_current: bool = Query(True, description="Leave out the job the candidate applied to"),
+    view: str = Query("summary", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    candidate: models.Candidate = Depends(loaders.candidate_or_404)
+):
+    """
+    Open jobs whose requirements best match a candidate's skills and
+    experience, best first (e.g. to route a rejected applicant elsewhere).
+    """
+    selected = serializers.resolve_fields(serializers.JOB_PROJECTIONS, view=view, fields=fields)
+    
+    best = job_index.recommend_jobs(
+        db, candidate, limit=limit, exclude_current=exclude_current, min_score=min_score
+    )
+    scores = dict(best)
+    rows, _ = crud.get_rows_by_ids(db, models.Job, selected, list(scores))
+    return serializers.recommended_jobs_response(candidate_id, selected, rows, scores)
+
 @router.put("/{candidate_id}", response_model=schemas.Candidate)
 async def update_candidate(
     candidate_id: int,
     candidate: schemas.CandidateUpdate,
+    response: Response,
+    allow_conflicts: bool = Query(False, description="Schedule even if the interview overlaps another one"),
+    expected_version: Optional[int] = Depends(concurrency.if_match_version),
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Update a candidate's information."""
+    """
+    Update a candidate's information.
+    Send the ETag from a previous response as If-Match to get a 409 instead
+    of overwriting someone else's changes.
+    """
     # Only HR or Hiring Manager can update candidates
     if current_user.role not in ["HR", "Hiring Manager"]:
         raise HTTPException(
@@ -89,18 +322,35 @@ async def update_candidate(
             detail="Not enough permissions"
         )
     
-    # Check if candidate exists
-    db_candidate = crud.get_candidate(db, candidate_id=candidate_id)
-    if db_candidate is None:
-        raise HTTPException(status_code=404, detail="Candidate not found")
+    # (Re)scheduling an interview: check the hiring manager's calendar
+    changes = candidate.dict(exclude_unset=True)
+    if not allow_conflicts and ("interview_date" in changes or "interview_scheduled" in changes):
+        db_candidate = loader.get_or_404(models.Candidate, candidate_id)
+        _check_interview_conflicts(
+            db,
+            db_candidate.job_id,
+            changes.get("interview_scheduled", db_candidate.interview_scheduled),
+            changes.get("interview_date", db_candidate.interview_date),
+            candidate_id=candidate_id
+        )
+    
+    try:
+        updated_candidate = crud.update_candidate(
+            db, candidate_id=candidate_id, candidate_update=candidate, expected_version=expected_version
+        )
+    except concurrency.VersionConflictError as e:
+        raise concurrency.conflict(e, "Candidate")
     
-    updated_candidate = crud.update_candidate(db, candidate_id=candidate_id, candidate_update=candidate)
+    if updated_candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    concurrency.set_etag(response, updated_candidate)
     return updated_candidate
 
 @router.delete("/{candidate_id}", response_model=schemas.Candidate)
 async def delete_candidate(
     candidate_id: int,
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """Delete a candidate."""
@@ -111,24 +361,24 @@ async def delete_candidate(
             detail="Not enough permissions"
         )
     
-    # Check if candidate exists
-    candidate = crud.get_candidate(db, candidate_id=candidate_id)
-    if candidate is None:
-        raise HTTPException(status_code=404, detail="Candidate not found")
+    # Check if candidate exists (crud reuses the loaded row)
+    loader.get_or_404(models.Candidate, candidate_id)
     
     deleted_candidate = crud.delete_candidate(db, candidate_id=candidate_id)
     return deleted_candidate
 
-@router.post("/bulk-status-update", response_model=List[schemas.Candidate])
+@router.post("/bulk-status-update", response_model=List[schemas.Candidate], responses={202: {"model": schemas.BackgroundTask}})
 async def bulk_update_candidate_status(
     candidate_ids: List[int],
     new_status: int,
+    background: bool = Query(False, description="Update in the background and return a task (202)"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Update status for multiple candidates at once.
     new_status: Integer (0: Screening, 1: Interview, 2: Hired, 3: Rejected)
+    With background=true, poll GET /api/tasks/{task_id} for the result.
     """
     # Only HR or Hiring Manager can update candidates
     if current_user.role not in ["HR", "Hiring Manager"]:
@@ -144,20 +394,17 @@ async def bulk_update_candidate_status(
             detail="Invalid status value. Must be 0, 1, 2, or 3."
         )
     
-    updated_candidates = []
-    for candidate_id in candidate_ids:
-        # Check if candidate exists
-        db_candidate = crud.get_candidate(db, candidate_id=candidate_id)
-        if db_candidate:
-            # Update only the status
-            updated_candidate = crud.update_candidate(
-                db, 
-                candidate_id=candidate_id, 
-                candidate_update=schemas.CandidateUpdate(status=new_status)
-            )
-            updated_candidates.append(updated_candidate)
-    
-    return updated_candidates
+    if background:
+        task = tasks.submit(
+            db,
+            "bulk_update_candidate_status",
+            {"candidate_ids": candidate_ids, "new_status": new_status},
+            user_id=current_user.id
+        )
+        return task_accepted(task)
+    
+    # One UPDATE for all candidates; unknown IDs are skipped
+    return crud.bulk_update_candidate_status(db, candidate_ids=candidate_ids, new_status=new_status)
 
 @router.get("/job/{job_id}/status/{status_value}", response_model=List[schemas.Candidate])
 async def get_candidates_by_status(
@@ -165,17 +412,18 @@ async def get_candidates_by_status(
     status_value: int,
     skip: int = 0,
     limit: int = 100,
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    media_type: str = Depends(serializers.negotiate_media_type),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
 ):
     """
     Get candidates filtered by job and status.
     status_value: Integer (0: Screening, 1: Interview, 2: Hired, 3: Rejected)
     """
-    # Check if job exists
-    job = crud.get_job(db, job_id=job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
+    selected = serializers.resolve_fields(serializers.CANDIDATE_PROJECTIONS, view=view, fields=fields)
     
     # Validate status value
     if status_value not in [0, 1, 2, 3]:
@@ -184,20 +432,22 @@ async def get_candidates_by_status(
             detail="Invalid status value. Must be 0, 1, 2, or 3."
         )
     
-    candidates = crud.search_candidates(
+    rows = crud.search_candidate_rows(
         db,
         job_id=job_id,
+        fields=selected,
         status=status_value,
         skip=skip,
         limit=limit
     )
-    return candidates
+    return serializers.rows_response(selected, rows, media_type=media_type, model=CANDIDATE_MODELS)
 
 @router.get("/job/{job_id}/status-counts")
 async def get_candidate_status_counts(
     job_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
 ):
     """
     Get the count of candidates for each status for a specific job.
@@ -210,9 +460,4 @@ async def get_candidate_status_counts(
         "total": 11
     }
     """
-    # Check if job exists
-    job = crud.get_job(db, job_id=job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
     return crud.get_candidate_status_counts(db, job_id=job_id) 
\ No newline at end of file
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.orm import Session
+
+from .. import crud, models, auth, events
+from ..database import get_db
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # don't let nginx buffer the stream
+}
+
+def _event_stream(db: Session, job_id=None) -> StreamingResponse:
+    # Give the session's connection back to the pool; the stream may stay
+    # open for hours and doesn't need one
+    db.close()
+    try:
+        subscription = events.broker.subscribe(job_id)
+    except events.TooManySubscribers:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many open event streams, please retry later",
+            headers={"Retry-After": "30"}
+        )
+    # The stream's own cleanup doesn't run if the client leaves before the
+    # first chunk; the background task runs after the response either way
+    return StreamingResponse(
+        subscription.stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+        background=BackgroundTask(events.broker.unsubscribe, subscription)
+    )
+
+@router.get("")
+async def stream_all_events(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Server-Sent Events stream of candidate and job changes for all jobs.
+    Event types: job.created, job.updated, job.deleted, candidate.created,
+    candidate.updated, candidate.status_changed, candidate.deleted, and
+    resync (events were dropped; refetch what you display).
+    """
+    return _event_stream(db)
+
+@router.get("/job/{job_id}")
+async def stream_job_events(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Server-Sent Events stream of the changes to one job and its candidates,
+    replacing polling of the candidate lists and status counts.
+    """
+    job = crud.get_job(db, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _event_stream(db, job_id=job_id)
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from .. import schemas, crud, models, auth
+from .. import schemas, crud, models, auth, dashboard
 from ..database import get_db
 
 router = APIRouter(prefix="/api/hiring-managers", tags=["Hiring Managers"])
@@ -13,4 +13,27 @@ async def read_hiring_managers(
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     hiring_managers = crud.get_hiring_managers(db)
-    return hiring_managers 
\ No newline at end of file
+    return hiring_managers 
+
+@router.get("/{manager_id}/dashboard", response_model=schemas.ManagerDashboard)
+async def read_manager_dashboard(
+    manager_id: int,
+    status: Optional[str] = Query(None, description="Only include jobs with this status"),
+    upcoming_limit: int = Query(5, ge=0, le=50, description="Upcoming interviews to include per job"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Everything the manager dashboard shows in one request: the manager's jobs
+    with their pipeline counts, interview plan summary and next scheduled
+    interviews. Uses a fixed number of queries however many jobs there are.
+    """
+    manager = crud.get_user(db, user_id=manager_id)
+    if not manager or manager.role != "Hiring Manager":
+        raise HTTPException(
+            status_code=404,
+            detail="Hiring manager not found"
+        )
+    
+    jobs = dashboard.get_manager_dashboard(db, manager_id=manager_id, status=status, upcoming_limit=upcoming_limit)
+    return {"manager": manager, "jobs": jobs}
\ No newline at end of file
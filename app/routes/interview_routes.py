@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Dict
+from datetime import datetime, timedelta
 
-from .. import schemas, crud, models, auth
+from .. import schemas, crud, models, auth, scheduling, concurrency, tasks, loaders
+from ..loaders import RequestLoader
+from ..config import MAX_SCHEDULE_RANGE_DAYS
 from ..database import get_db
+from .task_routes import task_accepted
 
 router = APIRouter(prefix="/api/interview", tags=["Interview"])
 
@@ -20,42 +24,42 @@ async def read_interview_categories(
 @router.get("/job/{job_id}/categories", response_model=List[schemas.InterviewCategory])
 async def read_interview_categories_by_job(
     job_id: int,
+    include_archived: bool = Query(False, description="Also look in the archive of old closed jobs"),
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Get all interview categories for a specific job."""
+    """
+    Get all interview categories for a specific job.
+    The nested JSON is built by the database and sent as-is.
+    """
     # Check if job exists
-    job = crud.get_job(db, job_id=job_id)
+    job = loader.get(models.Job, job_id)
+    if job is None and include_archived and crud.get_archived_job(db, job_id=job_id) is not None:
+        return crud.get_archived_interview_categories_by_job(db, job_id=job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
         
-    categories = crud.get_interview_categories_by_job(db, job_id=job_id)
-    return categories
+    categories_json = crud.get_interview_categories_json_by_job(db, job_id=job_id)
+    return Response(content=categories_json, media_type="application/json")
 
 @router.get("/job/{job_id}/questions", response_model=List[schemas.InterviewQuestion])
 async def read_interview_questions_by_job(
     job_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
 ):
     """Get all interview questions for a specific job."""
-    # Check if job exists
-    job = crud.get_job(db, job_id=job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-        
     questions = crud.get_interview_questions_by_job(db, job_id=job_id)
     return questions
 
 @router.get("/categories/{category_id}", response_model=schemas.InterviewCategory)
 async def read_interview_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db_category: models.InterviewCategory = Depends(loaders.category_or_404)
 ):
-    db_category = crud.get_interview_category(db, category_id=category_id)
-    if db_category is None:
-        raise HTTPException(status_code=404, detail="Interview category not found")
     return db_category
 
 @router.get("/categories/{category_id}/questions", response_model=List[schemas.InterviewQuestion])
@@ -63,22 +67,17 @@ async def read_interview_questions_by_category(
     category_id: int,
     job_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    loader: RequestLoader = Depends(loaders.get_loader),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    category: models.InterviewCategory = Depends(loaders.category_or_404)
 ):
     """
     Get all interview questions for a specific category.
     Optionally filter by job_id if provided.
     """
-    # Check if category exists
-    category = crud.get_interview_category(db, category_id=category_id)
-    if category is None:
-        raise HTTPException(status_code=404, detail="Interview category not found")
-    
     # If job_id is provided, check if it exists
     if job_id is not None:
-        job = crud.get_job(db, job_id=job_id)
-        if job is None:
-            raise HTTPException(status_code=404, detail="Job not found")
+        loader.get_or_404(models.Job, job_id)
         
     # Get questions, filtered by job_id if provided
     questions = crud.get_interview_questions_by_category(db, category_id=category_id, job_id=job_id)
@@ -88,6 +87,7 @@ async def read_interview_questions_by_category(
 async def create_interview_category(
     category: schemas.InterviewCategoryCreate,
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     # Only HR or Hiring Manager can create categories
@@ -98,16 +98,16 @@ async def create_interview_category(
         )
     
     # Check if job exists
-    job = crud.get_job(db, job_id=category.job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
+    loader.get_or_404(models.Job, category.job_id)
         
     return crud.create_interview_category(db=db, category=category)
 
 @router.post("/questions", response_model=schemas.InterviewQuestion)
 async def create_interview_question(
     question: schemas.InterviewQuestionCreate,
+    response: Response,
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     # Only HR or Hiring Manager can create questions
@@ -117,13 +117,16 @@ async def create_interview_question(
             detail="Not enough permissions"
         )
     
-    # Check if category exists
-    db_category = crud.get_interview_category(db, category_id=question.category_id)
-    if db_category is None:
-        raise HTTPException(status_code=404, detail="Interview category not found")
+    # Check that the category exists, loading its job in the same query
+    db_category = loader.get_or_404(
+        models.InterviewCategory, question.category_id, joinedload(models.InterviewCategory.job)
+    )
     
-    # Check if job exists
-    job = crud.get_job(db, job_id=question.job_id)
+    # Check if job exists (only another job than the category's needs a lookup)
+    if db_category.job_id == question.job_id:
+        job = db_category.job
+    else:
+        job = loader.get(models.Job, question.job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -131,7 +134,69 @@ async def create_interview_question(
     if db_category.job_id != question.job_id:
         raise HTTPException(status_code=400, detail="Category does not belong to the specified job")
     
-    return crud.create_interview_question(db=db, question=question)
+    db_question = crud.create_interview_question(db=db, question=question)
+    concurrency.set_etag(response, db_question)
+    return db_question
+
+@router.post("/questions/batch", response_model=schemas.InterviewQuestionBatch)
+async def read_interview_questions_batch(
+    batch: schemas.BatchIds,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Get many interview questions by ID in one request.
+    Items come back in the requested order; unknown IDs are listed in missing.
+    """
+    questions, missing = crud.get_interview_questions_by_ids(db, batch.ids)
+    return {"items": questions, "missing": missing}
+
+@router.post("/job/{job_id}/questions/bulk", response_model=schemas.InterviewQuestionBulkResult)
+async def bulk_edit_interview_questions(
+    job_id: int,
+    operations: schemas.InterviewQuestionBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
+):
+    """
+    Create, update (text, status, must_ask), move, reorder and delete many
+    questions of a job's interview plan in one transaction.
+    A position puts the question before the one currently at that position
+    in its category; afterwards each touched category is numbered 0..n-1.
+    """
+    # Only HR or Hiring Manager can edit questions
+    if current_user.role not in ["HR", "Hiring Manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    updated_ids = [item.id for item in operations.update]
+    if len(set(updated_ids)) != len(updated_ids) or set(updated_ids) & set(operations.delete):
+        raise HTTPException(status_code=400, detail="Each question may be updated or deleted only once")
+
+    # Every question and category must belong to this job (one query)
+    question_ids = set(updated_ids) | set(operations.delete)
+    category_ids = {item.category_id for item in operations.create}
+    category_ids |= {item.category_id for item in operations.update if item.category_id is not None}
+    question_categories, job_category_ids = crud.get_interview_plan_owners(db, job_id, question_ids, category_ids)
+
+    missing_questions = sorted(question_ids - question_categories.keys())
+    if missing_questions:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Interview questions not found in this job: {', '.join(map(str, missing_questions))}"
+        )
+    missing_categories = sorted(category_ids - job_category_ids)
+    if missing_categories:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Interview categories not found in this job: {', '.join(map(str, missing_categories))}"
+        )
+
+    created, updated, deleted = crud.bulk_edit_interview_questions(db, job_id, operations, question_categories)
+    return {"created": created, "updated": updated, "deleted": deleted}
 
 @router.get("/job/{job_id}/categories/{category_id}", response_model=schemas.InterviewCategory)
 async def read_interview_category_by_job(
@@ -140,38 +205,32 @@ async def read_interview_category_by_job(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Get an interview category with questions specific to a job."""
-    # Check if job exists
-    job = crud.get_job(db, job_id=job_id)
-    if job is None:
+    """
+    Get an interview category with questions specific to a job.
+    The nested JSON is built by the database and sent as-is.
+    """
+    # Category with only the questions for this job (None if it doesn't
+    # exist), and whether the job exists, in one query
+    job_exists, category_json = crud.get_interview_category_json_for_job(db, category_id=category_id, job_id=job_id)
+    if not job_exists:
         raise HTTPException(status_code=404, detail="Job not found")
-        
-    # Check if category exists
-    category = crud.get_interview_category(db, category_id=category_id)
-    if category is None:
+    if category_json is None:
         raise HTTPException(status_code=404, detail="Interview category not found")
     
-    # Get only the questions for this category and job
-    questions = crud.get_interview_questions_by_category(db, category_id=category_id, job_id=job_id)
-    
-    # Create a response that includes only the questions for this specific job
-    response = schemas.InterviewCategory(
-        id=category.id,
-        name=category.name,
-        description=category.description,
-        default_time=category.default_time,
-        job_id=job_id,
-        questions=questions
-    )
-    
-    return response
+    return Response(content=category_json, media_type="application/json")
 
-@router.post("/job/{target_job_id}/clone-from/{source_job_id}", response_model=Dict[str, str])
+@router.post(
+    "/job/{target_job_id}/clone-from/{source_job_id}",
+    response_model=Dict[str, str],
+    responses={202: {"model": schemas.BackgroundTask}}
+)
 async def clone_job_interview_structure(
     target_job_id: int,
     source_job_id: int,
     clone_questions: bool = Query(False, description="Whether to also clone the questions"),
+    background: bool = Query(False, description="Clone in the background and return a task (202)"),
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
@@ -180,6 +239,7 @@ async def clone_job_interview_structure(
     
     This is useful when you want to reuse the same interview structure across multiple jobs,
     with either the same questions or just the same categories.
+    With background=true, poll GET /api/tasks/{task_id} for the result.
     """
     # Only HR or Hiring Manager can clone interview structures
     if current_user.role not in ["HR", "Hiring Manager"]:
@@ -188,15 +248,23 @@ async def clone_job_interview_structure(
             detail="Not enough permissions"
         )
     
-    # Check if source and target jobs exist
-    source_job = crud.get_job(db, job_id=source_job_id)
-    if source_job is None:
+    # Check if source and target jobs exist (one lookup for both)
+    jobs = loader.get_many(models.Job, [source_job_id, target_job_id])
+    if source_job_id not in jobs:
         raise HTTPException(status_code=404, detail="Source job not found")
         
-    target_job = crud.get_job(db, job_id=target_job_id)
-    if target_job is None:
+    if target_job_id not in jobs:
         raise HTTPException(status_code=404, detail="Target job not found")
     
+    if background:
+        task = tasks.submit(
+            db,
+            "clone_interview_structure",
+            {"source_job_id": source_job_id, "target_job_id": target_job_id, "clone_questions": clone_questions},
+            user_id=current_user.id
+        )
+        return task_accepted(task)
+    
     # Clone the interview structure
     created_categories = crud.clone_interview_structure(
         db, 
@@ -216,16 +284,32 @@ async def clone_job_interview_structure(
                   (" with questions" if clone_questions else " without questions")
     }
 
+@router.get("/questions/{question_id}", response_model=schemas.InterviewQuestion)
+async def read_interview_question(
+    question_id: int,
+    response: Response,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db_question: models.InterviewQuestion = Depends(loaders.question_or_404)
+):
+    """Get a specific interview question. The ETag header carries its version."""
+    concurrency.set_etag(response, db_question)
+    return db_question
+
 @router.put("/questions/{question_id}", response_model=schemas.InterviewQuestion)
 async def update_interview_question(
     question_id: int,
     question: schemas.InterviewQuestionUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(concurrency.if_match_version),
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Update an interview question.
     Can update text, status, must_ask flag, or change the category.
+    Send the ETag from a previous response as If-Match to get a 409 instead
+    of overwriting someone else's changes.
     """
     # Only HR or Hiring Manager can update questions
     if current_user.role not in ["HR", "Hiring Manager"]:
@@ -234,16 +318,10 @@ async def update_interview_question(
             detail="Not enough permissions"
         )
     
-    # Check if question exists
-    db_question = crud.get_interview_question(db, question_id=question_id)
-    if db_question is None:
-        raise HTTPException(status_code=404, detail="Interview question not found")
-    
     # If updating category, check if the new category exists
     if question.category_id is not None:
-        db_category = crud.get_interview_category(db, category_id=question.category_id)
-        if db_category is None:
-            raise HTTPException(status_code=404, detail="Interview category not found")
+        db_question = loader.get_or_404(models.InterviewQuestion, question_id)
+        db_category = loader.get_or_404(models.InterviewCategory, question.category_id)
         
         # Make sure the new category belongs to the same job
         if db_category.job_id != db_question.job_id:
@@ -253,13 +331,23 @@ async def update_interview_question(
             )
     
     # Update the question
-    updated_question = crud.update_interview_question(db, question_id=question_id, question_update=question)
+    try:
+        updated_question = crud.update_interview_question(
+            db, question_id=question_id, question_update=question, expected_version=expected_version
+        )
+    except concurrency.VersionConflictError as e:
+        raise concurrency.conflict(e, "Interview question")
+    
+    if updated_question is None:
+        raise HTTPException(status_code=404, detail="Interview question not found")
+    concurrency.set_etag(response, updated_question)
     return updated_question
 
 @router.delete("/questions/{question_id}", response_model=schemas.InterviewQuestion)
 async def delete_interview_question(
     question_id: int,
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """Delete an interview question."""
@@ -270,10 +358,8 @@ async def delete_interview_question(
             detail="Not enough permissions"
         )
     
-    # Check if question exists
-    db_question = crud.get_interview_question(db, question_id=question_id)
-    if db_question is None:
-        raise HTTPException(status_code=404, detail="Interview question not found")
+    # Check if question exists (crud reuses the loaded row)
+    loader.get_or_404(models.InterviewQuestion, question_id)
     
     # Delete the question
     deleted_question = crud.delete_interview_question(db, question_id=question_id)
@@ -283,6 +369,7 @@ async def delete_interview_question(
 async def delete_interview_category(
     category_id: int, 
     db: Session = Depends(get_db),
+    loader: RequestLoader = Depends(loaders.get_loader),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """Delete an interview category and all its related questions."""
@@ -293,10 +380,8 @@ async def delete_interview_category(
             detail="Not enough permissions"
         )
     
-    # Check if category exists
-    db_category = crud.get_interview_category(db, category_id=category_id)
-    if db_category is None:
-        raise HTTPException(status_code=404, detail="Interview category not found")
+    # Check if category exists (crud reuses the loaded row)
+    loader.get_or_404(models.InterviewCategory, category_id)
     
     # Delete category and all related questions
     result = crud.delete_interview_category(db, category_id=category_id)
@@ -307,4 +392,87 @@ async def delete_interview_category(
             detail="Failed to delete category"
         )
     
-    # No content to return on successful deletion 
\ No newline at end of file
+    # No content to return on successful deletion 
+
+# Interview calendar
+def _schedule_range(start: Optional[datetime], end: Optional[datetime]):
+    """Default to the next 7 days; reject inverted or overly long ranges."""
+    start = start or datetime.now()
+    end = end or start + timedelta(days=7)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > timedelta(days=MAX_SCHEDULE_RANGE_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range cannot exceed {MAX_SCHEDULE_RANGE_DAYS} days"
+        )
+    return start, end
+
+@router.get("/schedule", response_model=List[schemas.ScheduledInterview])
+async def read_interview_schedule(
+    start: Optional[datetime] = Query(None, description="Range start (default: now)"),
+    end: Optional[datetime] = Query(None, description="Range end (default: start + 7 days)"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Get scheduled interviews across all jobs, ordered by time."""
+    start, end = _schedule_range(start, end)
+    return scheduling.get_scheduled_interviews(db, start, end, limit=limit)
+
+@router.get("/job/{job_id}/schedule", response_model=List[schemas.ScheduledInterview])
+async def read_job_interview_schedule(
+    job_id: int,
+    start: Optional[datetime] = Query(None, description="Range start (default: now)"),
+    end: Optional[datetime] = Query(None, description="Range end (default: start + 7 days)"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
+):
+    """Get scheduled interviews for a specific job, ordered by time."""
+    start, end = _schedule_range(start, end)
+    return scheduling.get_scheduled_interviews(db, start, end, job_id=job_id, limit=limit)
+
+@router.get("/manager/{manager_id}/schedule", response_model=List[schemas.ScheduledInterview])
+async def read_manager_interview_schedule(
+    manager_id: int,
+    start: Optional[datetime] = Query(None, description="Range start (default: now)"),
+    end: Optional[datetime] = Query(None, description="Range end (default: start + 7 days)"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Get scheduled interviews for all jobs assigned to a hiring manager."""
+    start, end = _schedule_range(start, end)
+    return scheduling.get_scheduled_interviews(db, start, end, manager_id=manager_id, limit=limit)
+
+@router.get("/manager/{manager_id}/conflicts", response_model=List[schemas.InterviewConflictPair])
+async def read_manager_interview_conflicts(
+    manager_id: int,
+    start: Optional[datetime] = Query(None, description="Range start (default: now)"),
+    end: Optional[datetime] = Query(None, description="Range end (default: start + 7 days)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Get pairs of overlapping interviews on a hiring manager's calendar.
+    An interview lasts the sum of its job's interview category default times.
+    """
+    start, end = _schedule_range(start, end)
+    return scheduling.find_manager_conflicts(db, manager_id, start, end)
+
+@router.get("/conflicts", response_model=List[schemas.ScheduledInterview])
+async def check_interview_conflicts(
+    job_id: int,
+    interview_date: datetime,
+    candidate_id: Optional[int] = Query(None, description="Candidate being (re)scheduled, ignored in the check"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    job: models.Job = Depends(loaders.job_or_404)
+):
+    """
+    Check whether an interview for a job at the given time would overlap
+    other interviews of the job's hiring manager, before scheduling it.
+    """
+    return scheduling.find_conflicts(db, job_id, interview_date, exclude_candidate_id=candidate_id)
\ No newline at end of file
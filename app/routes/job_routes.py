@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from .. import schemas, crud, models, auth
+from .. import schemas, crud, models, auth, serializers, concurrency, tasks, loaders
 from ..database import get_db
+from .task_routes import task_accepted
 
 router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
 
 @router.post("/", response_model=schemas.Job)
 async def create_job(
     job: schemas.JobCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
@@ -22,7 +24,9 @@ async def create_job(
                 detail="Invalid hiring manager ID"
             )
     
-    return crud.create_job(db=db, job=job)
+    db_job = crud.create_job(db=db, job=job)
+    concurrency.set_etag(response, db_job)
+    return db_job
 
 @router.get("/", response_model=List[schemas.Job])
 async def read_jobs(
@@ -30,17 +34,62 @@ async def read_jobs(
     limit: int = 100,
     status: Optional[str] = Query(None, description="Filter by job status"),
     title: Optional[str] = Query(None, description="Filter by job title"),
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    include_archived: bool = Query(False, description="Also look in the archive of old closed jobs"),
+    media_type: str = Depends(serializers.negotiate_media_type),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    selected = serializers.resolve_fields(serializers.JOB_PROJECTIONS, view=view, fields=fields)
+    rows = crud.get_job_rows(
+        db, fields=selected, skip=skip, limit=limit, status=status, title=title, include_archived=include_archived
+    )
+    return serializers.rows_response(selected, rows, media_type=media_type, model=models.Job)
+
+@router.get("/export", response_model=List[schemas.Job])
+async def export_jobs(
+    status: Optional[str] = Query(None, description="Filter by job status"),
+    title: Optional[str] = Query(None, description="Filter by job title"),
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    media_type: str = Depends(serializers.negotiate_media_type),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    jobs = crud.get_jobs(db, skip=skip, limit=limit, status=status, title=title)
-    return jobs
+    """
+    Export every matching job, without pagination.
+    The response is streamed; send Accept: application/msgpack or
+    application/vnd.apache.arrow.stream for the compact binary formats.
+    """
+    selected = serializers.resolve_fields(serializers.JOB_PROJECTIONS, view=view, fields=fields)
+    batches = crud.iter_job_row_batches(db, fields=selected, status=status, title=title)
+    return serializers.stream_rows_response(selected, batches, media_type=media_type, model=models.Job)
+
+@router.post("/batch", response_model=schemas.JobBatch)
+async def read_jobs_batch(
+    batch: schemas.BatchIds,
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Get many jobs by ID in one request.
+    Items come back in the requested order; unknown IDs are listed in missing.
+    """
+    selected = serializers.resolve_fields(serializers.JOB_PROJECTIONS, view=view, fields=fields)
+    rows, missing = crud.get_rows_by_ids(db, models.Job, selected, batch.ids)
+    return serializers.batch_response(selected, rows, missing)
 
 @router.get("/manager/{manager_id}", response_model=List[schemas.Job])
 async def read_jobs_by_manager(
     manager_id: int,
     skip: int = 0,
     limit: int = 100,
+    view: str = Query("full", description="Named projection: summary or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (overrides view)"),
+    media_type: str = Depends(serializers.negotiate_media_type),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
@@ -48,6 +97,8 @@ async def read_jobs_by_manager(
     Get all jobs assigned to a specific manager.
     This can be used after a hiring manager signs in to show only their assigned jobs.
     """
+    selected = serializers.resolve_fields(serializers.JOB_PROJECTIONS, view=view, fields=fields)
+    
     # Check if the manager exists
     manager = crud.get_user(db, user_id=manager_id)
     if not manager or manager.role != "Hiring Manager":
@@ -57,31 +108,53 @@ async def read_jobs_by_manager(
         )
     
     # Get jobs for this manager
-    jobs = crud.get_jobs_by_manager(db, manager_id=manager_id, skip=skip, limit=limit)
-    return jobs
+    rows = crud.get_job_rows_by_manager(
+        db, manager_id=manager_id, fields=selected, skip=skip, limit=limit
+    )
+    return serializers.rows_response(selected, rows, media_type=media_type, model=models.Job)
 
 @router.get("/{job_id}", response_model=schemas.JobDetail)
 async def read_job(
     job_id: int,
+    response: Response,
+    include_archived: bool = Query(False, description="Also look in the archive of old closed jobs"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     db_job = crud.get_job(db, job_id=job_id)
+    if db_job is None and include_archived:
+        db_job = crud.get_archived_job(db, job_id=job_id)
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
+    concurrency.set_etag(response, db_job)
     return db_job
 
+@router.get("/{job_id}/pipeline-stats", response_model=schemas.JobPipelineStats)
+async def read_job_pipeline_stats(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db_job: models.Job = Depends(loaders.job_or_404)
+):
+    """
+    Get precomputed pipeline figures for a job: candidates per status,
+    total, average rating and the latest application date.
+    """
+    return crud.get_job_pipeline_stats(db, job_id=job_id)
+
 @router.put("/{job_id}", response_model=schemas.Job)
 async def update_job(
     job_id: int,
     job: schemas.JobUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(concurrency.if_match_version),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    db_job = crud.get_job(db, job_id=job_id)
-    if db_job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
+    """
+    Update a job. Send the ETag from a previous response as If-Match to get
+    a 409 instead of overwriting someone else's changes.
+    """
     # Check if assigned hiring manager exists (if provided)
     if job.assigned_to:
         assigned_manager = crud.get_user(db, user_id=job.assigned_to)
@@ -91,19 +164,29 @@ async def update_job(
                 detail="Invalid hiring manager ID"
             )
     
-    updated_job = crud.update_job(db=db, job_id=job_id, job_update=job)
+    try:
+        updated_job = crud.update_job(db=db, job_id=job_id, job_update=job, expected_version=expected_version)
+    except concurrency.VersionConflictError as e:
+        raise concurrency.conflict(e, "Job")
+    
+    if updated_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    concurrency.set_etag(response, updated_job)
     return updated_job
 
-@router.delete("/{job_id}", response_model=schemas.Job)
+@router.delete("/{job_id}", response_model=schemas.Job, responses={202: {"model": schemas.BackgroundTask}})
 async def delete_job(
     job_id: int,
+    background: bool = Query(False, description="Delete in chunks in the background and return a task (202)"),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db_job: models.Job = Depends(loaders.job_or_404)
 ):
-    db_job = crud.get_job(db, job_id=job_id)
-    if db_job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
+    """
+    Delete a job together with its candidates, interview categories and
+    questions. For jobs with very many candidates pass background=true and
+    poll GET /api/tasks/{task_id}.
+    """
     # Additional permission check could be added here
     # For example, only HR can delete jobs
     if current_user.role != "HR":
@@ -112,4 +195,8 @@ async def delete_job(
             detail="Only HR can delete jobs"
         )
     
-    return crud.delete_job(db=db, job_id=job_id) 
\ No newline at end of file
+    if background:
+        task = tasks.submit(db, "delete_job", {"job_id": job_id}, user_id=current_user.id)
+        return task_accepted(task)
+    
+    return crud.delete_job(db=db, job_id=job_id)
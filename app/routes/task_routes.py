@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from typing import List
+
+from .. import schemas, models, auth, tasks
+from ..database import get_db
+
+router = APIRouter(prefix="/api/tasks", tags=["Background Tasks"])
+
+def task_accepted(task: models.BackgroundTask) -> JSONResponse:
+    """202 response for an endpoint that handed its work to a background task."""
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(schemas.BackgroundTask.model_validate(task)),
+        headers={"Location": f"{router.prefix}/{task.id}"}
+    )
+
+@router.get("", response_model=List[schemas.BackgroundTask])
+async def read_my_tasks(
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Get the background tasks started by the current user, newest first."""
+    return tasks.get_tasks_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+
+@router.get("/{task_id}", response_model=schemas.BackgroundTask)
+async def read_task(
+    task_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Get the status, progress and (once completed) result of a background task."""
+    task = tasks.get_task(db, task_id=task_id)
+    # HR can see every task; everyone else only their own
+    if task is None or (task.created_by != current_user.id and current_user.role != "HR"):
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
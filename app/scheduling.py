@@ -0,0 +1,184 @@
+"""Interview calendar queries and hiring-manager conflict detection.
+
+Scheduled interviews are candidates with ``interview_scheduled`` set and an
+``interview_date``. Range queries over them are served by the partial
+indexes on ``candidates.interview_date`` (see ``models.Candidate``).
+
+An interview lasts as long as its job's interview plan: the sum of the
+job's category ``default_time``s, or ``DEFAULT_INTERVIEW_MINUTES`` when the
+job has no categories. Two interviews conflict when they belong to jobs of
+the same hiring manager and their time ranges overlap.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import DEFAULT_INTERVIEW_MINUTES
+
+def as_naive_utc(value: datetime) -> datetime:
+    """interview_date is stored without a time zone; compare like with like."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class Interval:
+    __slots__ = ("start", "end", "item")
+
+    def __init__(self, start: datetime, end: datetime, item):
+        self.start = start
+        self.end = end
+        self.item = item
+
+class IntervalIndex:
+    """
+    Static interval set answering "which intervals overlap [start, end)?".
+
+    Intervals are kept sorted by start. Because no interval is longer than
+    ``max_length``, any interval overlapping the query must start within
+    ``[start - max_length, end)``, which two binary searches find; only that
+    slice is checked. Half-open ranges: back-to-back interviews don't clash.
+    """
+
+    def __init__(self, intervals: Iterable[Interval]):
+        self._intervals = sorted(intervals, key=lambda interval: interval.start)
+        self._starts = [interval.start for interval in self._intervals]
+        self._max_length = max(
+            (interval.end - interval.start for interval in self._intervals),
+            default=timedelta(0)
+        )
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Interval]:
+        lo = bisect_left(self._starts, start - self._max_length)
+        hi = bisect_right(self._starts, end)
+        return [
+            interval for interval in self._intervals[lo:hi]
+            if interval.start < end and interval.end > start
+        ]
+
+    def overlapping_pairs(self):
+        """All pairs of overlapping intervals (sweep over the sorted starts)."""
+        pairs = []
+        active: List[Interval] = []
+        for interval in self._intervals:
+            active = [other for other in active if other.end > interval.start]
+            pairs.extend((other, interval) for other in active)
+            active.append(interval)
+        return pairs
+
+def interview_durations(db: Session, job_ids: Optional[Sequence[int]] = None, manager_id: Optional[int] = None) -> Dict[int, int]:
+    """Interview length in minutes per job, from the jobs' category default_times."""
+    category = models.InterviewCategory
+    stmt = (
+        select(models.Job.id, func.sum(category.default_time))
+        .select_from(models.Job)
+        .outerjoin(category, category.job_id == models.Job.id)
+        .group_by(models.Job.id)
+    )
+    if job_ids is not None:
+        stmt = stmt.where(models.Job.id.in_(job_ids))
+    if manager_id is not None:
+        stmt = stmt.where(models.Job.assigned_to == manager_id)
+
+    return {job_id: minutes or DEFAULT_INTERVIEW_MINUTES for job_id, minutes in db.execute(stmt)}
+
+def _scheduled_interviews_stmt(start: datetime, end: datetime):
+    candidate = models.Candidate
+    return (
+        select(
+            candidate.id.label("candidate_id"),
+            models.Person.name.label("candidate_name"),
+            candidate.status,
+            candidate.interview_date,
+            models.Job.id.label("job_id"),
+            models.Job.title.label("job_title"),
+            models.Job.assigned_to.label("manager_id"),
+        )
+        .join(models.Job, models.Job.id == candidate.job_id)
+        .join(models.Person, models.Person.id == candidate.person_id)
+        .where(
+            candidate.interview_scheduled.is_(True),
+            candidate.interview_date >= start,
+            candidate.interview_date < end,
+        )
+        .order_by(candidate.interview_date, candidate.id)
+    )
+
+def _as_interview(row, minutes: int) -> dict:
+    return {
+        **row._asdict(),
+        "duration_minutes": minutes,
+        "ends_at": row.interview_date + timedelta(minutes=minutes),
+    }
+
+def _with_durations(db: Session, rows) -> List[dict]:
+    durations = interview_durations(db, job_ids={row.job_id for row in rows}) if rows else {}
+    return [_as_interview(row, durations.get(row.job_id, DEFAULT_INTERVIEW_MINUTES)) for row in rows]
+
+def get_scheduled_interviews(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    job_id: Optional[int] = None,
+    manager_id: Optional[int] = None,
+    limit: Optional[int] = 500
+) -> List[dict]:
+    """Scheduled interviews starting in [start, end), org-wide or for one job/manager."""
+    stmt = _scheduled_interviews_stmt(as_naive_utc(start), as_naive_utc(end)).limit(limit)
+    if job_id is not None:
+        stmt = stmt.where(models.Candidate.job_id == job_id)
+    if manager_id is not None:
+        stmt = stmt.where(models.Job.assigned_to == manager_id)
+    return _with_durations(db, db.execute(stmt).all())
+
+def find_conflicts(
+    db: Session,
+    job_id: int,
+    interview_date: datetime,
+    exclude_candidate_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Interviews of the same hiring manager that would overlap an interview for
+    ``job_id`` at ``interview_date``. Empty if the job has no manager.
+    """
+    job = db.get(models.Job, job_id)
+    if job is None or job.assigned_to is None:
+        return []
+    interview_date = as_naive_utc(interview_date)
+
+    durations = interview_durations(db, manager_id=job.assigned_to)
+    length = timedelta(minutes=durations.get(job_id, DEFAULT_INTERVIEW_MINUTES))
+    longest = timedelta(minutes=max(durations.values(), default=DEFAULT_INTERVIEW_MINUTES))
+
+    # Only interviews starting in this window can overlap the new one
+    stmt = _scheduled_interviews_stmt(interview_date - longest, interview_date + length)
+    stmt = stmt.where(models.Job.assigned_to == job.assigned_to)
+    if exclude_candidate_id is not None:
+        stmt = stmt.where(models.Candidate.id != exclude_candidate_id)
+
+    index = IntervalIndex(
+        Interval(row.interview_date, row.interview_date + timedelta(minutes=durations[row.job_id]), row)
+        for row in db.execute(stmt).all()
+    )
+    return [
+        _as_interview(interval.item, durations[interval.item.job_id])
+        for interval in index.overlapping(interview_date, interview_date + length)
+    ]
+
+def find_manager_conflicts(db: Session, manager_id: int, start: datetime, end: datetime) -> List[dict]:
+    """All pairs of overlapping interviews for a manager's jobs starting in [start, end)."""
+    interviews = get_scheduled_interviews(db, start, end, manager_id=manager_id, limit=None)
+    index = IntervalIndex(
+        Interval(interview["interview_date"], interview["ends_at"], interview)
+        for interview in interviews
+    )
+    return [
+        {"first": first.item, "second": second.item}
+        for first, second in index.overlapping_pairs()
+    ]
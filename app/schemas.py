@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field, validator, EmailStr
-from typing import List, Optional, Union
+from typing import Any, List, Optional, Union
 from datetime import date, datetime
 from enum import Enum
 
+from .config import MAX_BATCH_IDS
+
 class UserRole(str, Enum):
     HR = "HR"
     HIRING_MANAGER = "Hiring Manager"
@@ -107,6 +109,7 @@ class InterviewQuestion(InterviewQuestionBase):
     id: int
     category_id: int
     job_id: Optional[int] = None
+    position: int = 0  # order within the category
     
     @validator('job_id', pre=True)
     def validate_job_id(cls, value):
@@ -191,4 +194,219 @@ class Candidate(CandidateBase):
         return v
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# Pipeline stats schemas
+class JobPipelineStats(BaseModel):
+    job_id: int
+    screening_count: int
+    interview_count: int
+    hired_count: int
+    rejected_count: int
+    total_count: int
+    average_rating: Optional[float] = None
+    last_applied_date: Optional[date] = None
+
+    class Config:
+        from_attributes = True
+
+# Candidate status history and funnel analytics schemas
+class CandidateStatusEvent(BaseModel):
+    id: int
+    candidate_id: int
+    job_id: int
+    from_status: Optional[int] = None  # None: the application was created
+    to_status: int
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class StageTime(BaseModel):
+    status: int
+    stage: str
+    completed: int  # stays that ended (the candidate moved on)
+    current: int  # candidates still in the stage
+    average_hours: Optional[float] = None  # over completed stays
+    p50_hours: Optional[float] = None
+    p90_hours: Optional[float] = None
+    p95_hours: Optional[float] = None
+    max_hours: Optional[float] = None
+
+class TimeInStage(BaseModel):
+    job_id: Optional[int] = None
+    department: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    stages: List[StageTime] = []
+
+class ConversionCounts(BaseModel):
+    candidates: int
+    reached_interview: int
+    hired: int
+    hired_after_interview: int
+    rejected: int
+    interview_rate: Optional[float] = None  # reached_interview / candidates
+    hire_rate: Optional[float] = None  # hired / candidates
+    interview_to_hire_rate: Optional[float] = None  # hired_after_interview / reached_interview
+    rejection_rate: Optional[float] = None  # rejected / candidates
+
+class JobConversion(ConversionCounts):
+    job_id: int
+    title: str
+
+class Conversion(BaseModel):
+    job_id: Optional[int] = None
+    department: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    jobs: List[JobConversion] = []
+    total: ConversionCounts
+
+# Hiring manager dashboard schemas
+class InterviewPlanSummary(BaseModel):
+    category_count: int
+    total_minutes: int  # sum of the categories' default_time
+    question_count: int
+    must_ask_count: int
+
+class UpcomingInterview(BaseModel):
+    candidate_id: int
+    name: str
+    status: int
+    interview_date: datetime
+
+class DashboardJob(BaseModel):
+    job: Job
+    pipeline: JobPipelineStats
+    interview_plan: InterviewPlanSummary
+    upcoming_interviews: List[UpcomingInterview] = []
+
+class ManagerDashboard(BaseModel):
+    manager: User
+    jobs: List[DashboardJob] = []
+
+# Interview calendar schemas
+class ScheduledInterview(BaseModel):
+    candidate_id: int
+    candidate_name: str
+    status: int
+    job_id: int
+    job_title: Optional[str] = None
+    manager_id: Optional[int] = None
+    interview_date: datetime
+    ends_at: datetime
+    duration_minutes: int
+
+class InterviewConflictPair(BaseModel):
+    first: ScheduledInterview
+    second: ScheduledInterview
+
+# Batch fetch-by-IDs schemas
+class BatchIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+
+class CandidateBatch(BaseModel):
+    items: List[Candidate] = []
+    missing: List[int] = []  # requested IDs that don't exist
+
+class JobBatch(BaseModel):
+    items: List[Job] = []
+    missing: List[int] = []
+
+class RankedCandidate(Candidate):
+    match_score: float  # share of the job's requirements covered, 0 to 1
+
+class RankedCandidates(BaseModel):
+    job_id: int
+    ranked: int  # candidates considered (after filters)
+    items: List[RankedCandidate] = []
+
+class RecommendedJob(Job):
+    match_score: float  # share of the job's requirements the candidate covers, 0 to 1
+
+class RecommendedJobs(BaseModel):
+    candidate_id: int
+    items: List[RecommendedJob] = []
+
+class CandidateMatch(BaseModel):
+    candidate_id: int
+    job_id: int
+    match_score: float
+    matched: List[str] = []  # requirements the candidate covers
+    missing: List[str] = []
+
+class InterviewQuestionBatch(BaseModel):
+    items: List[InterviewQuestion] = []
+    missing: List[int] = []
+
+# Bulk interview plan edits: a position puts the question before the one
+# currently at that position in its category (at the end if there is none)
+class InterviewQuestionBulkCreate(InterviewQuestionBase):
+    category_id: int
+    position: Optional[int] = Field(None, ge=0)  # None: at the end
+
+class InterviewQuestionBulkUpdate(BaseModel):
+    id: int
+    text: Optional[str] = None
+    status: Optional[str] = None
+    must_ask: Optional[bool] = None
+    category_id: Optional[int] = None  # move (to the end, unless a position is given)
+    position: Optional[int] = Field(None, ge=0)
+
+class InterviewQuestionBulkRequest(BaseModel):
+    create: List[InterviewQuestionBulkCreate] = Field([], max_length=MAX_BATCH_IDS)
+    update: List[InterviewQuestionBulkUpdate] = Field([], max_length=MAX_BATCH_IDS)
+    delete: List[int] = Field([], max_length=MAX_BATCH_IDS)
+
+class InterviewQuestionBulkResult(BaseModel):
+    created: List[InterviewQuestion] = []
+    updated: List[InterviewQuestion] = []
+    deleted: List[int] = []
+
+# Duplicate detection schemas
+class DuplicateFlagStatus(str, Enum):
+    OPEN = "open"
+    CONFIRMED = "confirmed"
+    DISMISSED = "dismissed"
+
+class DuplicateFlag(BaseModel):
+    id: int
+    candidate_id: int
+    duplicate_of_id: int  # the older record
+    score: float
+    reasons: List[str] = []  # e.g. ["name:0.82", "phone"]
+    status: DuplicateFlagStatus
+    created_at: datetime
+    resolved_by: Optional[int] = None
+    resolved_at: Optional[datetime] = None
+
+    @validator('reasons', pre=True)
+    def split_reasons(cls, v):
+        if isinstance(v, str):
+            return [reason for reason in v.split(',') if reason]
+        return v
+
+    class Config:
+        from_attributes = True
+
+class DuplicateFlagUpdate(BaseModel):
+    status: DuplicateFlagStatus
+
+# Background task schemas
+class BackgroundTask(BaseModel):
+    id: str
+    kind: str
+    status: str  # pending, running, completed, failed
+    progress_current: int = 0
+    progress_total: Optional[int] = None
+    progress_message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
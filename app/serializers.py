@@ -0,0 +1,344 @@
+"""Fast serialization for list endpoints.
+
+List endpoints can return thousands of rows. Validating each ORM object
+through the ``from_attributes`` Pydantic schemas (and their per-row
+validators) and then encoding with the stdlib ``json`` module costs more
+than the query itself. The helpers here build the same JSON directly from
+plain row tuples selected by ``crud`` and encode it with orjson.
+
+The field tuples mirror the declaration order of ``schemas.Candidate`` and
+``schemas.Job`` so the output is identical to the validated responses.
+
+List endpoints also accept sparse fieldsets: a named projection (``view``)
+or an explicit ``fields`` list. Only the selected columns are read by the
+query, so heavy ``Text`` columns are never loaded for list views.
+
+Besides JSON, list and export endpoints can answer in MessagePack or as an
+Arrow IPC stream (columnar), chosen from the ``Accept`` header. Both binary
+encoders are optional dependencies; asking for a format whose package is
+not installed falls back to the next acceptable type (or 406).
+"""
+import io
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import HTTPException, Request, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+try:
+    import pyarrow
+except ImportError:  # Optional dependency
+    pyarrow = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+# Same order as schemas.Candidate (CandidateBase fields, then Candidate's)
+CANDIDATE_FIELDS = (
+    "name",
+    "email",
+    "phone",
+    "education",
+    "experience",
+    "status",
+    "resume_url",
+    "cover_letter",
+    "skills",
+    "rating",
+    "avatar_url",
+    "interview_scheduled",
+    "interview_date",
+    "notes",
+    "id",
+    "job_id",
+    "applied_date",
+)
+
+# Same order as schemas.Job (JobBase fields, then Job's)
+JOB_FIELDS = (
+    "title",
+    "description",
+    "requirements",
+    "end_date",
+    "status",
+    "location",
+    "salary",
+    "department",
+    "id",
+    "date_created",
+    "assigned_to",
+)
+
+# Named projections; "full" matches the complete response schema
+CANDIDATE_PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    "summary": (
+        "name",
+        "email",
+        "status",
+        "skills",
+        "rating",
+        "avatar_url",
+        "interview_scheduled",
+        "interview_date",
+        "id",
+        "job_id",
+        "applied_date",
+    ),
+    "full": CANDIDATE_FIELDS,
+}
+
+JOB_PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    "summary": (
+        "title",
+        "end_date",
+        "status",
+        "location",
+        "department",
+        "id",
+        "date_created",
+        "assigned_to",
+    ),
+    "full": JOB_FIELDS,
+}
+
+def resolve_fields(
+    projections: Dict[str, Tuple[str, ...]],
+    view: str = "full",
+    fields: Optional[str] = None
+) -> Tuple[str, ...]:
+    """
+    Work out which columns a list request wants.
+
+    ``fields`` is a comma-separated list of field names and takes precedence
+    over ``view``. ``id`` is always included. The result keeps the schema's
+    field order regardless of the order the client asked for.
+    """
+    all_fields = projections["full"]
+
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(all_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        requested.add("id")
+        return tuple(name for name in all_fields if name in requested)
+
+    if view not in projections:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown view. Must be one of: {', '.join(projections)}"
+        )
+    return projections[view]
+
+def split_skills(value) -> List[str]:
+    """Comma-separated skills column -> list, as ``schemas.Candidate`` does."""
+    if not value:
+        return []
+    return [skill.strip() for skill in value.split(",") if skill.strip()]
+
+# Per-field conversions applied to raw column values
+FIELD_CONVERTERS: Dict[str, Callable] = {
+    "skills": split_skills,
+}
+
+def rows_to_dicts(fields: Sequence[str], rows: Iterable[Sequence]) -> List[dict]:
+    """Turn row tuples (in ``fields`` order) into response dictionaries."""
+    converters = [(i, FIELD_CONVERTERS[name]) for i, name in enumerate(fields) if name in FIELD_CONVERTERS]
+    if not converters:
+        return [dict(zip(fields, row)) for row in rows]
+
+    result = []
+    for row in rows:
+        values = list(row)
+        for i, convert in converters:
+            values[i] = convert(values[i])
+        result.append(dict(zip(fields, values)))
+    return result
+
+def _available_media_types() -> List[str]:
+    available = [JSON_MEDIA_TYPE]
+    if msgpack is not None:
+        available.append(MSGPACK_MEDIA_TYPE)
+    if pyarrow is not None:
+        available.append(ARROW_MEDIA_TYPE)
+    return available
+
+def negotiate_media_type(request: Request) -> str:
+    """
+    FastAPI dependency choosing the response format from the Accept header.
+    JSON is the default when the header is missing or accepts anything.
+    """
+    accept = request.headers.get("accept")
+    if not accept:
+        return JSON_MEDIA_TYPE
+
+    available = _available_media_types()
+    best, best_quality = None, 0.0
+    for part in accept.split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        media_type = MEDIA_TYPE_ALIASES.get(media_type.lower(), media_type.lower())
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+
+        if media_type in ("*/*", "application/*"):
+            media_type = JSON_MEDIA_TYPE
+        if media_type in available and quality > best_quality:
+            best, best_quality = media_type, quality
+
+    if best is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"Supported formats: {', '.join(available)}"
+        )
+    return best
+
+def _msgpack_default(value):
+    # Match the JSON output: dates and datetimes as ISO 8601 strings
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value)!r}")
+
+def _column_type(model, name: str):
+    """Type of column ``name`` of ``model``, or of the first of several models that has it."""
+    for mapped in model if isinstance(model, (tuple, list)) else (model,):
+        if name in mapped.__table__.c:
+            return mapped.__table__.c[name].type
+    raise KeyError(name)
+
+def _arrow_schema(model, fields: Sequence[str]):
+    """Arrow schema for ``fields`` derived from the model's column types."""
+    types_by_python_type = {
+        str: pyarrow.string(),
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        bool: pyarrow.bool_(),
+        date: pyarrow.date32(),
+        datetime: pyarrow.timestamp("us"),
+    }
+    columns = []
+    for name in fields:
+        if name == "skills":
+            arrow_type = pyarrow.list_(pyarrow.string())
+        else:
+            arrow_type = types_by_python_type[_column_type(model, name).python_type]
+        columns.append(pyarrow.field(name, arrow_type))
+    return pyarrow.schema(columns)
+
+def _arrow_batch(schema, fields: Sequence[str], rows: Sequence[Sequence]):
+    columns = list(zip(*rows)) if rows else [()] * len(fields)
+    arrays = []
+    for name, values, field in zip(fields, columns, schema):
+        convert = FIELD_CONVERTERS.get(name)
+        if convert is not None:
+            values = [convert(value) for value in values]
+        arrays.append(pyarrow.array(values, type=field.type))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+def rows_response(
+    fields: Sequence[str],
+    rows: Sequence[Sequence],
+    media_type: str = JSON_MEDIA_TYPE,
+    model=None
+) -> Response:
+    """
+    Build a list response straight from row tuples in the negotiated format.
+    ``model`` (the mapped class the rows come from, or a tuple of classes
+    for joined rows) is needed for Arrow only.
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        body = msgpack.packb(rows_to_dicts(fields, rows), default=_msgpack_default)
+        return Response(body, media_type=MSGPACK_MEDIA_TYPE)
+
+    if media_type == ARROW_MEDIA_TYPE:
+        schema = _arrow_schema(model, fields)
+        sink = io.BytesIO()
+        with pyarrow.ipc.new_stream(sink, schema) as writer:
+            writer.write_batch(_arrow_batch(schema, fields, rows))
+        return Response(sink.getvalue(), media_type=ARROW_MEDIA_TYPE)
+
+    return ORJSONResponse(rows_to_dicts(fields, rows))
+
+def batch_response(fields: Sequence[str], rows: Sequence[Sequence], missing: Sequence[int]) -> Response:
+    """Response for the fetch-by-IDs endpoints: found rows plus the missing IDs."""
+    return ORJSONResponse({"items": rows_to_dicts(fields, rows), "missing": list(missing)})
+
+def scored_rows_to_dicts(fields: Sequence[str], rows: Sequence[Sequence], scores: Dict[int, float]) -> List[dict]:
+    """``rows_to_dicts`` plus each row's ``match_score`` (looked up by ID)."""
+    items = rows_to_dicts(fields, rows)
+    for item in items:
+        item["match_score"] = round(scores[item["id"]], 4)
+    return items
+
+def ranked_response(job_id: int, fields: Sequence[str], rows: Sequence[Sequence],
+                    scores: Dict[int, float], ranked: int) -> Response:
+    """Response for the ranked candidate list: rows in rank order with their scores."""
+    return ORJSONResponse({"job_id": job_id, "ranked": ranked, "items": scored_rows_to_dicts(fields, rows, scores)})
+
+def recommended_jobs_response(candidate_id: int, fields: Sequence[str], rows: Sequence[Sequence],
+                              scores: Dict[int, float]) -> Response:
+    """Response for a candidate's job recommendations, best match first."""
+    return ORJSONResponse({"candidate_id": candidate_id, "items": scored_rows_to_dicts(fields, rows, scores)})
+
+def _stream_json(fields: Sequence[str], batches: Iterable[Sequence[Sequence]]) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    for rows in batches:
+        if not rows:
+            continue
+        chunk = orjson.dumps(rows_to_dicts(fields, rows))[1:-1]
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
+
+def _stream_arrow(model, fields: Sequence[str], batches: Iterable[Sequence[Sequence]]) -> Iterator[bytes]:
+    schema = _arrow_schema(model, fields)
+    sink = io.BytesIO()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for rows in batches:
+            writer.write_batch(_arrow_batch(schema, fields, rows))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()  # End-of-stream marker
+
+def stream_rows_response(
+    fields: Sequence[str],
+    batches: Iterable[Sequence[Sequence]],
+    media_type: str = JSON_MEDIA_TYPE,
+    model=None
+) -> Response:
+    """
+    Export response built from batches of row tuples.
+
+    JSON and Arrow are streamed batch by batch, so memory stays flat however
+    many rows there are. MessagePack needs the array length up front and is
+    built in one piece.
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        rows = [row for batch in batches for row in batch]
+        return rows_response(fields, rows, media_type=media_type)
+
+    if media_type == ARROW_MEDIA_TYPE:
+        return StreamingResponse(_stream_arrow(model, fields, batches), media_type=ARROW_MEDIA_TYPE)
+
+    return StreamingResponse(_stream_json(fields, batches), media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,51 @@
+"""One-time startup tasks (password hashing cost, schema creation and seeding).
+
+These must run exactly once per deployment start. Under the multi-process
+server (see ``gunicorn.conf.py``) the master process runs them before any
+worker is forked and marks the environment so workers skip them; under a
+plain single-process ``uvicorn`` run they execute from the app's startup
+event as before.
+"""
+import logging
+import os
+
+from . import auth, models
+from .config import BCRYPT_ROUNDS, PASSWORD_HASH_CALIBRATE, PASSWORD_HASH_TARGET_MS
+from .database import engine, SessionLocal
+from .seed import seed_data
+
+STARTUP_DONE_ENV = "WEHIRE_STARTUP_TASKS_DONE"
+
+logger = logging.getLogger(__name__)
+
+def startup_tasks_done() -> bool:
+    return os.environ.get(STARTUP_DONE_ENV) == "1"
+
+def calibrate_password_hashing():
+    """Pick the bcrypt cost for this machine, unless BCRYPT_ROUNDS pins it."""
+    if BCRYPT_ROUNDS or not PASSWORD_HASH_CALIBRATE:
+        return
+    rounds = auth.calibrate_bcrypt_rounds(PASSWORD_HASH_TARGET_MS)
+    auth.set_bcrypt_rounds(rounds)
+    # Workers forked (or started) later read it from the environment, so
+    # every worker hashes with the same cost
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)
+
+def run_startup_tasks():
+    """Calibrate hashing, create missing tables and seed initial data, once per process tree."""
+    if startup_tasks_done():
+        logger.info("Startup tasks already ran in the parent process. Skipping.")
+        return
+
+    calibrate_password_hashing()
+
+    models.Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        seed_data(db)
+    finally:
+        db.close()
+
+    # Forked workers inherit this, so they never repeat the work
+    os.environ[STARTUP_DONE_ENV] = "1"
@@ -0,0 +1,199 @@
+"""Append-only log of candidate status changes and the funnel analytics on it.
+
+``Candidate.status`` only holds the current stage. Every status-changing
+path in ``crud`` (create, update, bulk update) also appends a
+``candidate_status_events`` row in the same transaction, many rows with one
+batched INSERT. Events are never updated; they go away only with their
+candidate or job, and move to the archive with the job.
+
+Analytics are scoped to one job or one department and read that scope's
+events through the (job_id, candidate_id, changed_at) index:
+
+- time in stage: ``lead()`` over each candidate's events gives when every
+  stay in a stage ended, and ``cume_dist()`` over the stays of a stage gives
+  nearest-rank percentiles, in one query on PostgreSQL and SQLite alike;
+- conversion: which stages each application reached, per job.
+
+Candidates that predate the log get one event (their current status since
+the application date) from ``backfill_status_events.py``.
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, extract, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Candidate.status -> stage name (0: Screening, 1: Interview, 2: Hired, 3: Rejected)
+STAGES = {
+    0: "screening",
+    1: "interview",
+    2: "hired",
+    3: "rejected",
+}
+
+PERCENTILES = (0.5, 0.9, 0.95)
+
+def record_transitions(db: Session, transitions: Iterable[Tuple[int, int, Optional[int], int]],
+                       changed_at: Optional[datetime] = None):
+    """
+    Append (candidate_id, job_id, from_status, to_status) events with one
+    batched INSERT. Transitions that don't change the status are skipped.
+    Does not commit.
+    """
+    changed_at = changed_at or datetime.now()
+    rows = [
+        {"candidate_id": candidate_id, "job_id": job_id, "from_status": from_status,
+         "to_status": to_status, "changed_at": changed_at}
+        for candidate_id, job_id, from_status, to_status in transitions
+        if from_status != to_status
+    ]
+    if rows:
+        db.execute(insert(models.CandidateStatusEvent), rows)
+
+def get_candidate_history(db: Session, candidate_id: int) -> List[models.CandidateStatusEvent]:
+    """A candidate's status events, oldest first."""
+    event = models.CandidateStatusEvent
+    return list(db.scalars(
+        select(event).where(event.candidate_id == candidate_id).order_by(event.changed_at, event.id)
+    ))
+
+def _scope(job_id: Optional[int] = None, department: Optional[str] = None):
+    """Filters on the events of one job or of all jobs of a department."""
+    event = models.CandidateStatusEvent
+    if job_id is not None:
+        return [event.job_id == job_id]
+    return [event.job_id.in_(select(models.Job.id).where(models.Job.department == department))]
+
+def _seconds_between(dialect: str, start, end):
+    if dialect == "postgresql":
+        return extract("epoch", end - start)
+    return func.round((func.julianday(end) - func.julianday(start)) * 86400.0, 3)  # julianday is a float of days
+
+def _hours(seconds):
+    return None if seconds is None else float(seconds) / 3600.0
+
+def time_in_stage(db: Session, job_id: Optional[int] = None, department: Optional[str] = None,
+                  since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+    """
+    Per stage: stays that ended (count, average and percentile hours) and
+    candidates still in it, for stays entered in [since, until).
+    """
+    dialect = db.get_bind().dialect.name
+    event = models.CandidateStatusEvent
+
+    # Each event starts a stay in ``to_status``; the candidate's next event ends it
+    filters = _scope(job_id, department)
+    if since is not None:
+        filters.append(event.changed_at >= since)  # later events are all kept, so lead() still sees them
+    stays = select(
+        event.to_status.label("status"),
+        event.changed_at.label("entered_at"),
+        func.lead(event.changed_at).over(
+            partition_by=event.candidate_id, order_by=(event.changed_at, event.id)
+        ).label("left_at"),
+    ).where(*filters).subquery()
+
+    seconds = _seconds_between(dialect, stays.c.entered_at, stays.c.left_at)
+    ranked = select(
+        stays.c.status,
+        seconds.label("seconds"),
+        # Rank finished stays among themselves; open ones form their own partition
+        func.cume_dist().over(
+            partition_by=(stays.c.status, stays.c.left_at.is_(None)), order_by=seconds
+        ).label("rank"),
+    )
+    if until is not None:
+        ranked = ranked.where(stays.c.entered_at < until)
+    ranked = ranked.subquery()
+
+    # Nearest-rank percentile: the smallest duration whose cumulative share reaches p
+    rows = db.execute(
+        select(
+            ranked.c.status,
+            func.count(ranked.c.seconds),
+            func.count() - func.count(ranked.c.seconds),
+            func.avg(ranked.c.seconds),
+            *[func.min(case((ranked.c.rank >= p, ranked.c.seconds))) for p in PERCENTILES],
+            func.max(ranked.c.seconds),
+        )
+        .group_by(ranked.c.status)
+        .order_by(ranked.c.status)
+    ).all()
+
+    return [
+        {
+            "status": row[0],
+            "stage": STAGES.get(row[0], str(row[0])),
+            "completed": row[1],
+            "current": row[2],
+            "average_hours": _hours(row[3]),
+            "p50_hours": _hours(row[4]),
+            "p90_hours": _hours(row[5]),
+            "p95_hours": _hours(row[6]),
+            "max_hours": _hours(row[7]),
+        }
+        for row in rows
+    ]
+
+def _rates(row: dict) -> dict:
+    def share(part, whole):
+        return part / whole if whole else None
+
+    return {
+        **row,
+        "interview_rate": share(row["reached_interview"], row["candidates"]),
+        "hire_rate": share(row["hired"], row["candidates"]),
+        "interview_to_hire_rate": share(row["hired_after_interview"], row["reached_interview"]),
+        "rejection_rate": share(row["rejected"], row["candidates"]),
+    }
+
+def conversion(db: Session, job_id: Optional[int] = None, department: Optional[str] = None,
+               since: Optional[datetime] = None, until: Optional[datetime] = None) -> dict:
+    """
+    Funnel per job for the applications that entered the pipeline in
+    [since, until): how many reached the interview stage, were hired or
+    rejected, and the rates between them; plus the totals over the jobs.
+    """
+    event = models.CandidateStatusEvent
+
+    def reached(status_value):
+        return func.max(case((event.to_status == status_value, 1), else_=0))
+
+    # One row per application: which stages it reached
+    applications = (
+        select(
+            event.job_id,
+            reached(1).label("interview"),
+            reached(2).label("hired"),
+            reached(3).label("rejected"),
+        )
+        .where(*_scope(job_id, department))
+        .group_by(event.job_id, event.candidate_id)
+    )
+    if since is not None:
+        applications = applications.having(func.min(event.changed_at) >= since)
+    if until is not None:
+        applications = applications.having(func.min(event.changed_at) < until)
+    applications = applications.subquery()
+
+    rows = db.execute(
+        select(
+            applications.c.job_id,
+            models.Job.title,
+            func.count(),
+            func.sum(applications.c.interview),
+            func.sum(applications.c.hired),
+            func.sum(applications.c.interview * applications.c.hired),
+            func.sum(applications.c.rejected),
+        )
+        .join(models.Job, models.Job.id == applications.c.job_id)
+        .group_by(applications.c.job_id, models.Job.title)
+        .order_by(applications.c.job_id)
+    ).all()
+
+    counts = ("candidates", "reached_interview", "hired", "hired_after_interview", "rejected")
+    jobs = [{"job_id": row[0], "title": row[1], **dict(zip(counts, map(int, row[2:])))} for row in rows]
+    total = {count: sum(job[count] for job in jobs) for count in counts}
+    return {"jobs": [_rates(job) for job in jobs], "total": _rates(total)}
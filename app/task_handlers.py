@@ -0,0 +1,53 @@
+"""Handlers for the background task kinds (see tasks.py)."""
+from sqlalchemy.orm import Session
+
+from . import crud, job_deletion, tasks
+from .config import BULK_STATUS_CHUNK_SIZE
+from .tasks import task_handler
+
+@task_handler("delete_job")
+def delete_job(db: Session, params: dict, progress):
+    return job_deletion.delete_job_in_chunks(db, params["job_id"], progress)
+
+@task_handler("clone_interview_structure")
+def clone_interview_structure(db: Session, params: dict, progress):
+    """
+    The created category IDs are stored in the task's params with the clone,
+    so a rerun after the worker died returns them instead of cloning again.
+    """
+    category_ids = params.get("category_ids")
+    if category_ids is None:
+        progress(0, total=1, message="Cloning interview structure")
+        created_categories = crud.copy_interview_structure(
+            db,
+            source_job_id=params["source_job_id"],
+            target_job_id=params["target_job_id"],
+            clone_questions=params.get("clone_questions", False)
+        )
+        if created_categories is None:
+            raise ValueError("Source or target job no longer exists")
+        category_ids = [category.id for category in created_categories]
+        tasks.record_params(db, progress.task_id, category_ids=category_ids)
+        db.commit()
+    progress(1)
+    return {
+        "categories_created": len(category_ids),
+        "category_ids": category_ids,
+    }
+
+@task_handler("bulk_update_candidate_status")
+def bulk_update_candidate_status(db: Session, params: dict, progress):
+    """Same as the synchronous endpoint, one committed UPDATE per chunk of IDs."""
+    candidate_ids = list(dict.fromkeys(params["candidate_ids"]))
+    updated_ids = set()
+    progress(0, total=len(candidate_ids))
+    for start in range(0, len(candidate_ids), BULK_STATUS_CHUNK_SIZE):
+        chunk = candidate_ids[start:start + BULK_STATUS_CHUNK_SIZE]
+        updated = crud.bulk_update_candidate_status(db, candidate_ids=chunk, new_status=params["new_status"])
+        updated_ids.update(candidate.id for candidate in updated)
+        db.expunge_all()
+        progress(start + len(chunk))
+    return {
+        "updated": len(updated_ids),
+        "missing": [candidate_id for candidate_id in candidate_ids if candidate_id not in updated_ids],
+    }
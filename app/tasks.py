@@ -0,0 +1,228 @@
+"""Persistent background tasks for operations too slow for a request.
+
+Heavy endpoints store a row in ``background_tasks`` (``submit``) and return
+its ID right away; clients poll ``GET /api/tasks/{task_id}`` for progress
+and the result. Each worker process runs a ``TaskRunner`` on its event loop
+that claims pending tasks (``FOR UPDATE SKIP LOCKED`` on PostgreSQL, so
+several workers never pick the same one) and runs up to
+``TASK_CONCURRENCY`` of them at a time in threads.
+
+Because tasks live in the database they survive restarts: a running task
+refreshes its ``heartbeat_at``, and one whose heartbeat is older than
+``TASK_STALE_AFTER`` (its worker died) goes back to pending, up to
+``TASK_MAX_ATTEMPTS`` attempts. Handlers should therefore be safe to rerun.
+
+Handlers are registered with ``@task_handler("kind")`` (see
+``task_handlers.py``) and called as ``handler(db, params, progress)``; the
+value they return is stored as the task's result.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import TASK_CONCURRENCY, TASK_MAX_ATTEMPTS, TASK_POLL_INTERVAL, TASK_STALE_AFTER
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+TASK_HANDLERS: Dict[str, Callable] = {}
+
+def task_handler(kind: str):
+    """Register a function as the handler for tasks of ``kind``."""
+    def register(func):
+        TASK_HANDLERS[kind] = func
+        return func
+    return register
+
+def submit(db: Session, kind: str, params: dict, user_id: Optional[int] = None) -> models.BackgroundTask:
+    """Queue a task and wake the local runner. Commits."""
+    if kind not in TASK_HANDLERS:
+        raise ValueError(f"Unknown task kind: {kind}")
+    task = models.BackgroundTask(id=uuid.uuid4().hex, kind=kind, params=params, created_by=user_id)
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    if runner is not None:
+        runner.wake()
+    return task
+
+def record_params(db: Session, task_id: str, **values):
+    """
+    Merge ``values`` into a task's params in ``db``'s transaction, so a rerun
+    sees them only if the work they describe was committed too. Does not commit.
+    """
+    task = db.get(models.BackgroundTask, task_id)
+    task.params = {**(task.params or {}), **values}
+
+def get_task(db: Session, task_id: str) -> Optional[models.BackgroundTask]:
+    return db.get(models.BackgroundTask, task_id)
+
+def get_tasks_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 50):
+    return db.query(models.BackgroundTask).filter(
+        models.BackgroundTask.created_by == user_id
+    ).order_by(models.BackgroundTask.created_at.desc()).offset(skip).limit(limit).all()
+
+class Progress:
+    """Passed to handlers to report progress; each call is committed at once."""
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+
+    def __call__(self, current: int, total: Optional[int] = None, message: Optional[str] = None):
+        values = {"progress_current": current, "heartbeat_at": datetime.now()}
+        if total is not None:
+            values["progress_total"] = total
+        if message is not None:
+            values["progress_message"] = message
+        _update_task(self.task_id, **values)
+
+def _update_task(task_id: str, **values):
+    db = SessionLocal()
+    try:
+        db.execute(update(models.BackgroundTask).where(models.BackgroundTask.id == task_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+def _claim_next() -> Optional[str]:
+    """Mark the oldest pending task as running and return its ID."""
+    task = models.BackgroundTask
+    db = SessionLocal()
+    try:
+        next_id = select(task.id).where(task.status == "pending").order_by(task.created_at).limit(1)
+        if db.get_bind().dialect.name == "postgresql":
+            next_id = next_id.with_for_update(skip_locked=True)
+        now = datetime.now()
+        task_id = db.execute(
+            update(task)
+            .where(task.id == next_id.scalar_subquery(), task.status == "pending")
+            .values(status="running", started_at=now, heartbeat_at=now, attempts=task.attempts + 1)
+            .returning(task.id)
+        ).scalar_one_or_none()
+        db.commit()
+        return task_id
+    finally:
+        db.close()
+
+def _run(task_id: str):
+    """Run one claimed task to completion in the calling thread."""
+    db = SessionLocal()
+    try:
+        task = db.get(models.BackgroundTask, task_id)
+        handler = TASK_HANDLERS.get(task.kind)
+        if handler is None:
+            raise ValueError(f"No handler for task kind {task.kind}")
+        result = handler(db, dict(task.params or {}), Progress(task_id))
+        db.commit()
+        _update_task(task_id, status="completed", result=result, finished_at=datetime.now())
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Background task {task_id} failed: {e}")
+        _update_task(task_id, status="failed", error=str(e), finished_at=datetime.now())
+    finally:
+        db.close()
+
+def _maintain(running: Set[str]):
+    """Refresh our heartbeats and requeue (or fail) tasks whose worker died."""
+    task = models.BackgroundTask
+    now = datetime.now()
+    stale = task.heartbeat_at < now - timedelta(seconds=TASK_STALE_AFTER)
+    db = SessionLocal()
+    try:
+        if running:
+            db.execute(update(task).where(task.id.in_(running)).values(heartbeat_at=now))
+        db.execute(
+            update(task)
+            .where(task.status == "running", stale, task.attempts < TASK_MAX_ATTEMPTS)
+            .values(status="pending")
+        )
+        db.execute(
+            update(task)
+            .where(task.status == "running", stale, task.attempts >= TASK_MAX_ATTEMPTS)
+            .values(status="failed", error="Worker stopped while running the task", finished_at=now)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+class TaskRunner:
+    """Claims and runs tasks on the current event loop; one per worker process."""
+
+    def __init__(self, concurrency: int = TASK_CONCURRENCY, poll_interval: float = TASK_POLL_INTERVAL):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._running: Set[str] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        # Tasks still running in threads keep going; if the process exits
+        # first, their heartbeat goes stale and another worker retries them
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+
+    def wake(self):
+        """Check for work now instead of at the next poll (safe from any thread)."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _poll(self):
+        last_maintenance = None
+        while True:
+            try:
+                now = datetime.now()
+                if last_maintenance is None or now - last_maintenance >= timedelta(seconds=TASK_STALE_AFTER / 10):
+                    await asyncio.to_thread(_maintain, set(self._running))
+                    last_maintenance = now
+
+                while len(self._running) < self.concurrency:
+                    task_id = await asyncio.to_thread(_claim_next)
+                    if task_id is None:
+                        break
+                    self._running.add(task_id)
+                    asyncio.create_task(self._execute(task_id))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Task runner error: {e}")
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, task_id: str):
+        try:
+            await asyncio.to_thread(_run, task_id)
+        finally:
+            self._running.discard(task_id)
+            self._wake.set()
+
+# The runner of this process, set by the app's startup event
+runner: Optional[TaskRunner] = None
+
+def start_runner():
+    global runner
+    runner = TaskRunner()
+    runner.start()
+
+async def stop_runner():
+    if runner is not None:
+        await runner.stop()
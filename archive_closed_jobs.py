@@ -0,0 +1,53 @@
+"""Script to move old closed jobs, with their candidates and interview data, to the archive tables."""
+import argparse
+import logging
+
+from app import archive
+from app.config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def archive_closed_jobs(older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, max_batches=None, dry_run=False):
+    """Archive eligible jobs batch by batch until none are left (or max_batches is reached)."""
+    # Make sure the archive tables exist on databases created before them
+    for _, archive_model in archive.ARCHIVED_MODELS:
+        archive_model.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        if dry_run:
+            job_ids = archive.archivable_job_ids(db, older_than_days=older_than_days, limit=None)
+            logger.info(f"{len(job_ids)} jobs would be archived: {job_ids}")
+            return
+        
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            archived = archive.archive_batch(db, older_than_days=older_than_days, batch_size=batch_size)
+            if not archived:
+                break
+            total += len(archived)
+            batches += 1
+            logger.info(f"Archived {len(archived)} jobs (total {total})")
+        logger.info(f"Archiving finished: {total} jobs archived")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error archiving jobs: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS, help="Archive closed jobs that ended more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Jobs per batch")
+    parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches (rerun to resume)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the jobs that would be archived")
+    args = parser.parse_args()
+    archive_closed_jobs(
+        older_than_days=args.older_than_days,
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+        dry_run=args.dry_run
+    )
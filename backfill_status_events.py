@@ -0,0 +1,65 @@
+"""Script to give candidates created before the status history their first status event."""
+import argparse
+import logging
+from datetime import date, datetime, time
+
+from sqlalchemy import exists, insert, select
+
+from app import models
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def backfill_status_events(batch_size: int = 1000):
+    """
+    Create the status history tables if missing, then record each candidate
+    without events as having been in its current status since it applied.
+    """
+    models.CandidateStatusEvent.__table__.create(bind=engine, checkfirst=True)
+    models.ArchivedCandidateStatusEvent.__table__.create(bind=engine, checkfirst=True)
+
+    candidate, event = models.Candidate, models.CandidateStatusEvent
+    db = SessionLocal()
+    try:
+        last_id, backfilled = 0, 0
+        while True:
+            rows = db.execute(
+                select(candidate.id, candidate.job_id, candidate.status, candidate.applied_date)
+                .where(
+                    candidate.id > last_id,
+                    candidate.job_id.isnot(None),
+                    ~exists().where(event.candidate_id == candidate.id),
+                )
+                .order_by(candidate.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            db.execute(insert(event), [
+                {
+                    "candidate_id": row.id,
+                    "job_id": row.job_id,
+                    "from_status": None,
+                    "to_status": row.status or 0,
+                    "changed_at": datetime.combine(row.applied_date or date.today(), time.min),
+                }
+                for row in rows
+            ])
+            db.commit()
+            last_id = rows[-1].id
+            backfilled += len(rows)
+            logger.info(f"Backfilled {backfilled} candidates")
+        logger.info(f"Status history is in place ({backfilled} candidates backfilled)")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error backfilling status events: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Candidates per transaction")
+    args = parser.parse_args()
+    backfill_status_events(batch_size=args.batch_size)
@@ -0,0 +1,102 @@
+"""Manager dashboard: frontend fan-out (3N+1 requests) vs. the dashboard endpoint.
+
+Run from the project root:
+
+    python -m benchmarks.dashboard [jobs] [candidates_per_job]
+
+Uses a throwaway SQLite database (set BENCH_DATABASE_URL to use another,
+e.g. a scratch Postgres; it gets seeded with benchmark data). Reports HTTP
+requests, SQL statements and wall time for both approaches.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from app import crud, models, schemas, pipeline_stats
+from app.database import engine, SessionLocal
+from app.main import app
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+def seed(job_count: int, candidates_per_job: int):
+    db = SessionLocal()
+    manager_id = crud.create_user(db, schemas.UserCreate(username="bench_manager", password="bench", role="Hiring Manager")).id
+    job_ids = []
+    for i in range(job_count):
+        job = crud.create_job(db, schemas.JobCreate(
+            title=f"Job {i}", description="...", requirements="python, sql",
+            location="Remote", department="Engineering", status="open", assigned_to=manager_id
+        ))
+        job_ids.append(job.id)
+
+    soon = datetime.now() + timedelta(days=1)
+    people, rows = [], []
+    for job_id in job_ids:
+        for j in range(candidates_per_job):
+            people.append({
+                "name": f"Candidate {job_id}-{j}", "email": f"c{job_id}-{j}@example.com",
+                "phone": "1", "education": "BSc", "experience": "5 years", "skills": "python,sql",
+            })
+            rows.append({
+                "status": j % 4,
+                "rating": 3.0, "interview_scheduled": j % 5 == 0,
+                "interview_date": soon + timedelta(hours=j) if j % 5 == 0 else None, "job_id": job_id,
+            })
+    person_ids = db.scalars(insert(models.Person).returning(models.Person.id, sort_by_parameter_order=True), people)
+    for row, person_id in zip(rows, person_ids):
+        row["person_id"] = person_id
+    db.execute(insert(models.Candidate), rows)
+    pipeline_stats.rebuild(db)
+    db.commit()
+    db.close()
+    return manager_id, job_ids
+
+def measure(counter, func):
+    start_queries = counter.count
+    start = time.perf_counter()
+    requests = func()
+    return requests, counter.count - start_queries, time.perf_counter() - start
+
+def main(job_count: int = 100, candidates_per_job: int = 50):
+    with TestClient(app) as client:
+        manager_id, _ = seed(job_count, candidates_per_job)
+        token = client.post("/api/auth/login", data={"username": "bench_manager", "password": "bench"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        counter = QueryCounter()
+
+        def fan_out():
+            jobs = client.get(f"/api/jobs/manager/{manager_id}", headers=headers).json()
+            for job in jobs:
+                client.get(f"/api/candidates/job/{job['id']}/status-counts", headers=headers)
+                client.get(f"/api/interview/job/{job['id']}/categories", headers=headers)
+                client.get(f"/api/candidates/job/{job['id']}?limit=20", headers=headers)
+            return 1 + 3 * len(jobs)
+
+        def single():
+            response = client.get(f"/api/hiring-managers/{manager_id}/dashboard", headers=headers)
+            assert len(response.json()["jobs"]) == job_count
+            return 1
+
+        for name, func in (("fan-out", fan_out), ("dashboard", single)):
+            func()  # Warm up
+            requests, queries, seconds = measure(counter, func)
+            print(f"{name:>10}: {requests:4d} requests, {queries:5d} SQL statements, {seconds * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    per_job = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    main(jobs, per_job)
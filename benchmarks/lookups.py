@@ -0,0 +1,99 @@
+"""Hot single-row lookups: a fresh ORM query per call vs. prebuilt statements.
+
+Run from the project root:
+
+    python -m benchmarks.lookups [number] [repeat]
+
+Uses a throwaway SQLite database (set BENCH_DATABASE_URL to use another,
+e.g. a scratch Postgres; it gets seeded with benchmark data). The reference
+data cache is off and the session is emptied before every call, so each
+lookup runs its SELECT. Reports the best per-call time of each variant.
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ["CACHE_BACKEND"] = "none"
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import contains_eager
+
+from app import auth, crud, models, schemas
+from app.database import Base, engine, SessionLocal
+
+def seed(db):
+    user = crud.create_user(db, schemas.UserCreate(username="bench_manager", password="bench", role="Hiring Manager"))
+    job = crud.create_job(db, schemas.JobCreate(
+        title="Job", description="...", requirements="python, sql",
+        location="Remote", department="Engineering", status="open", assigned_to=user.id
+    ))
+    category = crud.create_interview_category(db, schemas.InterviewCategoryCreate(
+        name="Technical", description="...", default_time=60, job_id=job.id
+    ))
+    person = models.Person(name="Candidate", email="c@example.com", phone="1", education="BSc",
+                           experience="5 years", skills="python,sql")
+    candidate = models.Candidate(person=person, job_id=job.id, status=0)
+    db.add(candidate)
+    db.commit()
+    return user.username, job.id, category.id, candidate.id
+
+def variants(username, job_id, category_id, candidate_id):
+    """Per lookup: (name, {variant: function of the session})."""
+    Job, Candidate, Category, User, Person = (
+        models.Job, models.Candidate, models.InterviewCategory, models.User, models.Person
+    )
+    return [
+        ("job by id", {
+            "db.query().filter()": lambda db: db.query(Job).filter(Job.id == job_id).first(),
+            "db.get()": lambda db: db.get(Job, job_id),
+            "lambda_stmt": lambda db: db.scalars(
+                lambda_stmt(lambda: select(Job).where(Job.id == job_id))).first(),
+            "prebuilt select (crud)": lambda db: crud.get_job(db, job_id),
+        }),
+        ("candidate by id", {
+            "db.query().filter()": lambda db: db.query(Candidate).filter(Candidate.id == candidate_id).first(),
+            "db.get()": lambda db: db.get(Candidate, candidate_id),
+            "prebuilt select (crud)": lambda db: crud.get_candidate(db, candidate_id),
+        }),
+        ("candidate by email", {
+            "db.query().filter()": lambda db: db.query(Candidate).join(Candidate.person).options(
+                contains_eager(Candidate.person)
+            ).filter(Person.email == "c@example.com", Candidate.job_id == job_id).first(),
+            "prebuilt select (crud)": lambda db: crud.get_candidate_by_email(db, "c@example.com", job_id),
+        }),
+        ("user by username", {
+            "db.query().filter()": lambda db: db.query(User).filter(User.username == username).first(),
+            "prebuilt select (auth)": lambda db: auth.get_user(db, username),
+        }),
+        ("interview category by id", {
+            "db.query().filter()": lambda db: db.query(Category).filter(Category.id == category_id).first(),
+            "db.get()": lambda db: db.get(Category, category_id),
+            "prebuilt select (crud)": lambda db: crud.get_interview_category(db, category_id),
+        }),
+    ]
+
+def main(number: int = 2000, repeat: int = 5):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    lookups = variants(*seed(db))
+
+    def call(func):
+        db.expunge_all()  # no identity-map shortcut: every call goes to the database
+        return func(db)
+
+    print(f"{engine.dialect.name}, best of {repeat} x {number} calls, microseconds per call:")
+    for name, funcs in lookups:
+        print(f"\n{name}")
+        baseline = None
+        for label, func in funcs.items():
+            assert call(func) is not None, (name, label)
+            per_call = min(timeit.repeat(lambda: call(func), number=number, repeat=repeat)) / number * 1e6
+            baseline = baseline or per_call
+            print(f"  {label:<24} {per_call:8.1f}  ({per_call / baseline:.2f}x)")
+    db.close()
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,91 @@
+"""Match scoring: ranking a job's candidates and recommending open jobs.
+
+Run from the project root:
+
+    python -m benchmarks.matching [candidates] [open_jobs]
+
+No database is needed: synthetic candidates are vectorized in memory the
+same way ``app.matching.build_features`` does after reading them, and
+synthetic open jobs are loaded straight into a ``JobIndex``. Reports the
+one-off vectorization cost, scoring every candidate, picking the top 20,
+rescoring after 1% of the candidates changed, and the 10 best open jobs
+for one candidate.
+"""
+import random
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from app import job_index, matching
+
+SKILLS = [
+    "python", "fastapi", "django", "postgresql", "mysql", "docker", "kubernetes", "aws",
+    "react", "redux", "typescript", "javascript", "node.js", "go", "rust", "java",
+    "spring", "c++", "c#", "sql", "agile", "scrum", "product management", "figma",
+]
+REQUIREMENTS = "5+ years of experience in Python, Experience with FastAPI, PostgreSQL and Docker, Knowledge of AWS"
+
+def make_requirements(count: int, seed: int = 2):
+    rng = random.Random(seed)
+    return [
+        (i + 1, f"{rng.randint(1, 8)}+ years of experience in " + ", Experience with ".join(rng.sample(SKILLS, rng.randint(2, 6))))
+        for i in range(count)
+    ]
+
+def make_candidates(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(count):
+        skills = ", ".join(rng.sample(SKILLS, rng.randint(2, 8)))
+        experience = f"{rng.randint(1, 12)} years building services with " + " and ".join(rng.sample(SKILLS, 3))
+        candidates.append((skills, experience))
+    return candidates
+
+def vectorize(ids, candidates):
+    terms = [matching.candidate_terms(skills, experience) for skills, experience in candidates]
+    return matching.CandidateFeatures(
+        np.asarray(ids, np.int64),
+        np.ones(len(ids), np.int64),
+        np.zeros(len(ids), np.int64),
+        np.array([len(term_ids) for term_ids, _ in terms], np.int64),
+        np.array([term for term_ids, _ in terms for term in term_ids], np.int64),
+        np.array([weight for _, weights in terms for weight in weights], np.float32),
+    )
+
+def main(count: int = 100_000, jobs: int = 100_000, repeat: int = 5):
+    candidates = make_candidates(count)
+    requirement = matching.RequirementVector(REQUIREMENTS)
+
+    started = time.perf_counter()
+    features = vectorize(range(1, count + 1), candidates)
+    print(f"vectorize: {(time.perf_counter() - started) * 1000:8.2f} ms (once per candidate version)")
+
+    scores = matching.score_rows(features, requirement)
+    timings = {
+        "score all": lambda: matching.score_rows(features, requirement),
+        "top 20": lambda: matching.top_k(scores, features.ids, 20),
+    }
+
+    changed = np.zeros(count, bool)
+    changed[np.random.default_rng(1).choice(count, count // 100, replace=False)] = True
+    timings["rescore 1%"] = lambda: matching.score_rows(features, requirement, changed)
+
+    for name, func in timings.items():
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name:>9}: {best * 1000:8.2f} ms for {count} candidates")
+
+    best = matching.top_k(scores, features.ids, 3)
+    print(f"     best: {best}")
+
+    index = job_index.JobIndex()
+    started = time.perf_counter()
+    index.load(make_requirements(jobs))
+    print(f"job index: {(time.perf_counter() - started) * 1000:8.2f} ms to build for {jobs} open jobs")
+    term_ids, weights = matching.candidate_terms(*candidates[0])
+    best = min(timeit.repeat(lambda: index.recommend(term_ids, weights, limit=10), number=1, repeat=repeat))
+    print(f"recommend: {best * 1000:8.2f} ms for the 10 best of {jobs} open jobs")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,71 @@
+"""Per-row cost of serializing candidate lists: Pydantic path vs. fast path.
+
+Run from the project root:
+
+    python -m benchmarks.serialization [rows]
+
+"Pydantic" reproduces what FastAPI does for ``response_model=List[schemas.Candidate]``
+(validate ORM-like objects with ``from_attributes``, dump to JSON-compatible
+Python, encode with the stdlib ``json`` module). "Fast" is the
+``app.serializers`` path used by the list endpoints (row tuples -> dicts ->
+orjson). No database is needed; both paths start from the same values.
+"""
+import json
+import sys
+import timeit
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import schemas, serializers
+
+def make_rows(count: int):
+    rows = []
+    for i in range(count):
+        rows.append((
+            f"Candidate {i}",
+            f"candidate{i}@example.com",
+            "+1 555 0100",
+            "BSc Computer Science, State University",
+            "5 years building Python web services with FastAPI and PostgreSQL. " * 4,
+            i % 4,
+            None,
+            bool(i % 2),
+            "python, fastapi, postgresql, docker",
+            3.5,
+            None,
+            bool(i % 3),
+            datetime(2025, 5, 1, 10, 30) if i % 3 else None,
+            "Strong communicator",
+            i + 1,
+            1,
+            date(2025, 4, 1),
+        ))
+    return rows
+
+def main(count: int = 1000, repeat: int = 5):
+    rows = make_rows(count)
+    objects = [SimpleNamespace(**dict(zip(serializers.CANDIDATE_FIELDS, row))) for row in rows]
+    adapter = TypeAdapter(List[schemas.Candidate])
+
+    def pydantic_path():
+        validated = adapter.validate_python(objects, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+    def fast_path():
+        return serializers.rows_response(serializers.CANDIDATE_FIELDS, rows).body
+
+    assert json.loads(pydantic_path()) == json.loads(fast_path()), "outputs differ"
+
+    results = {}
+    for name, func in (("pydantic", pydantic_path), ("fast", fast_path)):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        results[name] = best
+        print(f"{name:>9}: {best * 1000:8.2f} ms total, {best / count * 1e6:6.2f} us/row")
+
+    print(f"  speedup: {results['pydantic'] / results['fast']:.1f}x for {count} rows")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,24 @@
+"""Script to pick the bcrypt cost (BCRYPT_ROUNDS) that meets a target verify time on this machine."""
+import argparse
+import logging
+
+from app import auth
+from app.config import PASSWORD_HASH_TARGET_MS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def calibrate_password_hashing(target_ms=PASSWORD_HASH_TARGET_MS, min_rounds=auth.MIN_BCRYPT_ROUNDS):
+    """Print the BCRYPT_ROUNDS setting to put in the environment of this deployment tier."""
+    rounds = auth.calibrate_bcrypt_rounds(target_ms, min_rounds=min_rounds)
+    print(f"BCRYPT_ROUNDS={rounds}")
+    return rounds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=PASSWORD_HASH_TARGET_MS,
+                        help="Longest acceptable password verify time in milliseconds")
+    parser.add_argument("--min-rounds", type=int, default=auth.MIN_BCRYPT_ROUNDS,
+                        help="Never go below this cost, however slow the machine")
+    args = parser.parse_args()
+    calibrate_password_hashing(target_ms=args.target_ms, min_rounds=args.min_rounds)
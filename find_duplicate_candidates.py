@@ -0,0 +1,52 @@
+"""Script to index existing candidates for duplicate detection and flag likely duplicates."""
+import argparse
+import logging
+
+from app import dedup, models
+from app.config import DEDUP_MAX_BLOCK_SIZE
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def find_duplicate_candidates(batch_size=1000, max_block_size=DEDUP_MAX_BLOCK_SIZE, skip_backfill=False, dry_run=False):
+    """Backfill blocking keys for unindexed candidates, then compare candidates sharing a key."""
+    # Make sure the tables exist on databases created before them
+    models.CandidateDedupKey.__table__.create(bind=engine, checkfirst=True)
+    models.CandidateDuplicate.__table__.create(bind=engine, checkfirst=True)
+    
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    try:
+        if not skip_backfill:
+            indexed = dedup.backfill_keys(write_db, batch_size=batch_size)
+            logger.info(f"Indexed {indexed} candidates")
+        
+        stats = dedup.find_duplicates_in_batches(
+            read_db, write_db, max_block_size=max_block_size, batch_size=batch_size, dry_run=dry_run
+        )
+        action = "would be flagged" if dry_run else "flagged"
+        logger.info(
+            f"Compared {stats['pairs_compared']} candidate pairs: "
+            f"{stats['duplicates_found']} likely duplicates {action}"
+        )
+    except Exception as e:
+        write_db.rollback()
+        logger.error(f"Error finding duplicate candidates: {e}")
+    finally:
+        read_db.close()
+        write_db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Candidates indexed, and pairs compared, per transaction")
+    parser.add_argument("--max-block-size", type=int, default=DEDUP_MAX_BLOCK_SIZE, help="Skip keys shared by more candidates than this")
+    parser.add_argument("--skip-backfill", action="store_true", help="Don't index candidates without keys first")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the duplicates that would be flagged (keys are still backfilled)")
+    args = parser.parse_args()
+    find_duplicate_candidates(
+        batch_size=args.batch_size,
+        max_block_size=args.max_block_size,
+        skip_backfill=args.skip_backfill,
+        dry_run=args.dry_run
+    )
@@ -0,0 +1,71 @@
+"""Production server configuration.
+
+Run with:
+
+    gunicorn -c gunicorn.conf.py
+
+Starts a gunicorn master managing uvicorn workers for ``app.main:app``.
+All values come from ``app.config`` and can be overridden via environment
+variables.
+"""
+import os
+
+from app.config import (
+    BIND,
+    WEB_CONCURRENCY,
+    MAX_WORKERS,
+    PRELOAD_APP,
+    MAX_REQUESTS,
+    MAX_REQUESTS_JITTER,
+    WORKER_TIMEOUT,
+    GRACEFUL_TIMEOUT,
+    KEEPALIVE,
+)
+
+def available_cpus():
+    """CPUs this process may run on (respects container/affinity limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        return os.cpu_count() or 1
+
+def worker_count():
+    """Explicit WEB_CONCURRENCY wins; otherwise one worker per usable CPU."""
+    if WEB_CONCURRENCY > 0:
+        return WEB_CONCURRENCY
+    return max(1, min(available_cpus(), MAX_WORKERS))
+
+wsgi_app = "app.main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = BIND
+workers = worker_count()
+
+# Import the app once in the master so workers share its memory copy-on-write
+preload_app = PRELOAD_APP
+
+# Recycle workers periodically (jittered so they don't all restart at once)
+max_requests = MAX_REQUESTS
+max_requests_jitter = MAX_REQUESTS_JITTER
+
+timeout = WORKER_TIMEOUT
+graceful_timeout = GRACEFUL_TIMEOUT
+keepalive = KEEPALIVE
+
+accesslog = "-"
+errorlog = "-"
+
+def on_starting(server):
+    """Create tables and seed once, in the master, before forking workers."""
+    from app.startup import run_startup_tasks
+
+    run_startup_tasks()
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master.
+
+    A forked worker must never reuse the master's sockets; ``close=False``
+    leaves them for the master while the worker starts with a fresh pool.
+    """
+    from app.database import engine
+
+    engine.dispose(close=False)
@@ -0,0 +1,37 @@
+"""Script to rebuild the job_pipeline_stats rollup from the candidates table."""
+import argparse
+import logging
+
+from app import models, pipeline_stats
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def rebuild_pipeline_stats(job_id=None):
+    """Recompute pipeline counts for one job, or for all jobs."""
+    # Make sure the rollup table and its supporting index exist on databases created before them
+    models.JobPipelineStats.__table__.create(bind=engine, checkfirst=True)
+    for index in models.Candidate.__table__.indexes:
+        if index.name == "ix_candidates_job_id_applied_date":
+            index.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        pipeline_stats.rebuild(db, job_id=job_id)
+        db.commit()
+        if job_id is None:
+            logger.info("Rebuilt pipeline stats for all jobs")
+        else:
+            logger.info(f"Rebuilt pipeline stats for job_id={job_id}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding pipeline stats: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--job-id", type=int, default=None, help="Only rebuild this job")
+    args = parser.parse_args()
+    rebuild_pipeline_stats(job_id=args.job_id)
@@ -0,0 +1,87 @@
+"""Script to move candidate profile data (name, email, skills, ...) into the people table."""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.sql import text
+from app import models
+from app.database import engine, SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Live table first: its people keep the candidate's ID, archived
+# applications then join the person with the same email
+CANDIDATE_TABLES = ["candidates", "candidates_archive"]
+
+def _split_table(db, inspector, table):
+    columns = {column["name"] for column in inspector.get_columns(table)}
+    if "email" not in columns:
+        logger.info(f"{table} is already split")
+        return
+
+    profile = ", ".join(models.PERSON_FIELDS)
+    if "person_id" not in columns:
+        logger.info(f"Adding person_id column to {table} table")
+        references = " REFERENCES people(id) ON DELETE CASCADE" if table == "candidates" else ""
+        db.execute(text(f"ALTER TABLE {table} ADD COLUMN person_id INTEGER{references}"))
+
+    # One person per email (the oldest row's profile), reusing the row's ID;
+    # rows without an email get a person of their own
+    logger.info(f"Creating people from {table}")
+    db.execute(text(f"""
+        INSERT INTO people (id, {profile})
+        SELECT t.id, {", ".join(f"t.{field}" for field in models.PERSON_FIELDS)}
+        FROM {table} t
+        JOIN (
+            SELECT MIN(id) AS id FROM {table}
+            WHERE person_id IS NULL
+            GROUP BY COALESCE(email, '#' || id)
+        ) oldest ON oldest.id = t.id
+        WHERE NOT EXISTS (SELECT 1 FROM people p WHERE p.email = t.email)
+    """))
+    db.execute(text(f"""
+        UPDATE {table} SET person_id = (SELECT p.id FROM people p WHERE p.email = {table}.email)
+        WHERE person_id IS NULL AND email IS NOT NULL
+    """))
+    db.execute(text(f"UPDATE {table} SET person_id = id WHERE person_id IS NULL"))
+
+    # SQLite can't drop indexed columns, so drop their indexes first
+    for index in inspector.get_indexes(table):
+        if set(index["column_names"]) & set(models.PERSON_FIELDS):
+            db.execute(text(f'DROP INDEX "{index["name"]}"'))
+    for column in models.PERSON_FIELDS:
+        logger.info(f"Dropping {table}.{column}")
+        db.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+
+    if engine.dialect.name == "postgresql":
+        db.execute(text(f"ALTER TABLE {table} ALTER COLUMN person_id SET NOT NULL"))
+
+def split_candidate_people():
+    """Create people from existing candidates and leave only per-job data on candidates."""
+    models.Person.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        inspector = inspect(db.connection())
+        for table in CANDIDATE_TABLES:
+            if inspector.has_table(table):
+                _split_table(db, inspector, table)
+
+        if engine.dialect.name == "postgresql":
+            # People were inserted with explicit IDs
+            db.execute(text(
+                "SELECT setval(pg_get_serial_sequence('people', 'id'), COALESCE((SELECT MAX(id) FROM people), 0) + 1, false)"
+            ))
+
+        for index in models.Candidate.__table__.indexes:
+            if index.name == "ix_candidates_person_id_job_id":
+                index.create(bind=db.connection(), checkfirst=True)
+        db.commit()
+        logger.info("Candidates are split into people and applications")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error splitting candidates: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    split_candidate_people()